@@ -0,0 +1,336 @@
+"""Bezgłowe API HTTP systemu zamówień (tylko biblioteka standardowa)
+
+Endpointy (JSON w treści żądania i odpowiedzi):
+  GET  /health                       stan procesu roboczego
+  GET  /metrics                      metryki procesu roboczego (Prometheus, ?format=json - JSON)
+  POST /classify                     {"text": ...} -> klasyfikacja zapotrzebowania
+  POST /match                        {"product_name", "category"} lub {"text"} -> dostawca z umów
+  POST /orders                       {"text", "order_type", "pdf"} -> zapisane zamówienie
+  POST /orders/<order_id>/delivery   {"status", "delivered_quantity"} -> zmiana statusu dostawy
+  POST /reorder/check                {"create": false} -> produkty do zamówienia (opcjonalnie utworzenie)
+
+Każdy proces roboczy wczytuje dane raz przy starcie i doczytuje je tylko po
+zmianie plików przez inny proces. Procesy dzielą jedno gniazdo nasłuchujące
+(pre-fork); zapisy są szeregowane blokadą pliku w katalogu danych - tą samą,
+którą biorą aplikacja Streamlit i harmonogram zamawiania (DataLoader.write_lock).
+
+Metryki nie są agregowane między procesami: /metrics zwraca rejestr procesu,
+który obsłużył żądanie, z etykietą worker=<PID> przy każdej serii (w JSON -
+pole worker). Liczniki każdej serii rosną monotonicznie, a sumę dla całego API
+liczy Prometheus (sum without (worker) ...).
+
+Uruchomienie:
+  python api.py --port 8080 --workers 4
+  curl -s localhost:8080/classify -d '{"text": "Potrzebuję 2 szt. Siemens Motors 957"}'
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import re
+import signal
+import sys
+import threading
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from modules.data_loader import DataLoader
+from modules.classifier import SimpleClassifier
+from modules.supplier_matcher import SupplierMatcher
+from modules.pdf_generator import PDFGenerator
+from modules.auto_reorder import AutoReorderSystem
+from modules.time_simulator import TimeSimulator
+from modules.metrics import METRICS
+from modules.logging_config import configure_logging
+
+# Pliki, których zmiana przez inny proces wymaga ponownego wczytania danych
+DATA_FILES = ('products.csv', 'inventory.csv', 'suppliers.csv', 'purchase_order_history.csv', 'simulation_state.csv')
+
+logger = logging.getLogger('api')
+
+
+class APIError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class APIContext:
+    """Dane i obiekty modułów jednego procesu roboczego"""
+
+    def __init__(self, data_dir='data', pdf_dir='orders'):
+        self.data_dir = data_dir
+        self.pdf_dir = pdf_dir
+        self._lock = threading.Lock()
+        self._seen = None
+        self.data_loader = DataLoader(data_dir, pdf_dir)
+        self._load()
+
+    def _load(self):
+        if not self.data_loader.load_all_data():
+            raise RuntimeError(f"Nie udało się wczytać danych z {self.data_dir}")
+        data_loader = self.data_loader
+        self.classifier = SimpleClassifier(data_loader.products)
+        self.matcher = SupplierMatcher(data_loader.suppliers, data_loader.purchase_orders)
+        self.pdf_generator = PDFGenerator(self.pdf_dir)
+        # Data symulacji (prognoza) - po przesunięciu czasu w aplikacji dane są wczytywane ponownie
+        self.auto_reorder = AutoReorderSystem(data_loader, self.matcher, self.pdf_generator, TimeSimulator(self.data_dir))
+        self._seen = data_loader.fingerprint(*DATA_FILES)[1:]
+
+    def refresh(self):
+        """Ponowne wczytanie danych, jeśli inny proces zmienił pliki (tylko os.stat)"""
+        with self._lock:
+            self._reload_if_changed()
+
+    def _reload_if_changed(self):
+        if self.data_loader.fingerprint(*DATA_FILES)[1:] != self._seen:
+            logger.info("🔄 Dane zmienione przez inny proces - ponowne wczytanie")
+            self._load()
+
+    @contextlib.contextmanager
+    def write_lock(self):
+        """Zapis na wyłączność: wątki procesu i - przez blokadę loadera - wszystkie procesy piszące"""
+        with self._lock, self.data_loader.write_lock:
+            try:
+                # Loader doczytał już dane zmienione przez inny proces przed uzyskaniem
+                # blokady; klasyfikator, dopasowanie i data symulacji też muszą je widzieć
+                self._reload_if_changed()
+                yield
+            finally:
+                # Własne zapisy nie wymuszają ponownego wczytania
+                self._seen = self.data_loader.fingerprint(*DATA_FILES)[1:]
+
+    # --- operacje ---
+
+    def classify(self, body):
+        return self.classifier.classify_request(self._required(body, 'text'))
+
+    def match(self, body):
+        if body.get('text'):
+            classification = self.classify(body)
+            product_name, category = classification.get('product_name'), classification.get('category')
+        else:
+            product_name, category = self._required(body, 'product_name'), body.get('category')
+        result = self.matcher.find_supplier_in_contracts(product_name, category)
+        if not result.get('found') and product_name:
+            result['similar'] = self.matcher.find_similar_products(product_name, category)
+        return result
+
+    def create_order(self, body):
+        """Ten sam przebieg co zatwierdzenie w zakładce zamówień app.py"""
+        text = self._required(body, 'text')
+        classification = self.classifier.classify_request(text)
+        product_name = classification.get('product_name')
+        if not product_name:
+            raise APIError(422, "Nie można utworzyć zamówienia: brak nazwy produktu")
+        supplier_result = self.matcher.find_supplier_in_contracts(product_name, classification.get('category'))
+
+        order_data = {
+            'order_id': f"ORD-{uuid.uuid4().hex[:8].upper()}",
+            'user_input': text,
+            'product_name': product_name,
+            'category': classification.get('category', 'Inne'),
+            'quantity': body.get('quantity') or classification.get('quantity', 1),
+            'unit': classification.get('unit', 'szt.'),
+            'supplier_name': supplier_result.get('supplier_name', 'Nieznany dostawca'),
+            'price': supplier_result.get('price', 0.0),
+            'contract_type': supplier_result.get('contract_type', 'oferta'),
+            'order_type': body.get('order_type', 'Standardowe'),
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'estimated_delivery': (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d"),
+            'delivery_status': 'ordered'
+        }
+        with self.write_lock():
+            if not self.data_loader.save_order(order_data):
+                raise APIError(500, "Błąd zapisywania zamówienia")
+        pdf_path = self.pdf_generator.generate_order_pdf(order_data) if body.get('pdf') else None
+        return {'order': order_data, 'supplier_found': supplier_result.get('found', False), 'pdf_path': pdf_path}
+
+    def update_delivery(self, order_id, body):
+        status = self._required(body, 'status')
+        if status not in ('ordered', 'in_transit', 'delivered', 'cancelled'):
+            raise APIError(400, f"Nieznany status: {status}")
+        with self.write_lock():
+            if not self.data_loader.update_delivery_status(order_id, status, body.get('delivered_quantity')):
+                raise APIError(404, f"Nie zaktualizowano zamówienia {order_id}")
+        return {'order_id': order_id, 'status': status}
+
+    def check_reorder(self, body):
+        if not body.get('create'):
+            return {'products': self.auto_reorder.check_production_needs(), 'created': []}
+
+        # Sprawdzenie i utworzenie pod jedną blokadą - żaden proces nie zamówi tego samego w międzyczasie
+        created = []
+        with self.write_lock():
+            production_orders = self.auto_reorder.check_production_needs()
+            for product_info in production_orders:
+                if product_info.get('supplier_found'):
+                    success, pdf_path = self.auto_reorder.create_production_order(
+                        product_info, product_info['suggested_quantity'])
+                    if success:
+                        created.append({'product_id': product_info['product_id'], 'pdf_path': pdf_path})
+        return {'products': production_orders, 'created': created}
+
+    @staticmethod
+    def _required(body, field):
+        value = body.get(field)
+        if value in (None, ''):
+            raise APIError(400, f"Brak pola '{field}'")
+        return value
+
+
+def _to_json(value):
+    """Typy NumPy/pandas w odpowiedziach modułów"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    server_version = 'ZamowieniaAPI/1.0'
+
+    _DELIVERY = re.compile(r'^/orders/([^/]+)/delivery$')
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/health':
+            context = self.server.context
+            self._send(200, {
+                'status': 'ok',
+                'worker': os.getpid(),
+                'products': len(context.data_loader.products),
+                'data_version': context.data_loader.data_version
+            })
+        elif url.path == '/metrics':
+            # Rejestr tylko tego procesu roboczego - serie rozróżnia etykieta worker
+            worker = os.getpid()
+            if parse_qs(url.query).get('format') == ['json']:
+                self._send(200, {'worker': worker, **METRICS.snapshot()})
+            else:
+                self._send_text(200, METRICS.to_prometheus({'worker': worker}), 'text/plain; version=0.0.4; charset=utf-8')
+        else:
+            self._send(404, {'error': f"Nieznany adres: {self.path}"})
+
+    def do_POST(self):
+        context = self.server.context
+        routes = {
+            '/classify': context.classify,
+            '/match': context.match,
+            '/orders': context.create_order,
+            '/reorder/check': context.check_reorder
+        }
+        try:
+            body = self._read_body()
+            context.refresh()
+            delivery = self._DELIVERY.match(self.path)
+            if delivery:
+                with METRICS.timer('api.orders.delivery'):
+                    result = context.update_delivery(delivery.group(1), body)
+            elif self.path in routes:
+                with METRICS.timer('api' + self.path.replace('/', '.')):
+                    result = routes[self.path](body)
+            else:
+                raise APIError(404, f"Nieznany adres: {self.path}")
+            self._send(200, result)
+        except APIError as e:
+            self._send(e.status, {'error': str(e)})
+        except Exception as e:
+            logger.exception("❌ Błąd obsługi %s: %s", self.path, e)
+            self._send(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        # Dziennik dostępu tylko przy poziomie DEBUG - bez zapisu na stderr przy każdym żądaniu
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s %s", self.address_string(), format % args)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise APIError(400, "Niepoprawny JSON")
+        if not isinstance(body, dict):
+            raise APIError(400, "Oczekiwano obiektu JSON")
+        return body
+
+    def _send(self, status, payload):
+        self._send_text(status, json.dumps(payload, ensure_ascii=False, default=_to_json),
+                        'application/json; charset=utf-8')
+
+    def _send_text(self, status, text, content_type):
+        data = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def run_worker(server, data_dir, pdf_dir):
+    """Wczytuje dane (raz na proces) i obsługuje żądania"""
+    server.context = APIContext(data_dir, pdf_dir)
+    logger.info("✅ Proces roboczy gotowy")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(host='127.0.0.1', port=8080, workers=1, data_dir='data', pdf_dir='orders'):
+    server = ThreadingHTTPServer((host, port), APIHandler)
+    logger.info("🚀 API na http://%s:%s (%s procesów roboczych)", host, server.server_address[1], workers)
+
+    if workers <= 1 or not hasattr(os, 'fork'):
+        run_worker(server, data_dir, pdf_dir)
+        return
+
+    # Pre-fork: wszystkie procesy akceptują połączenia z tego samego gniazda
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+            try:
+                run_worker(server, data_dir, pdf_dir)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    server.socket.close()
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in children:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+        logger.info("⏹️ Zatrzymano API")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=1, help='liczba procesów roboczych')
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--pdf-dir', default='orders')
+    parser.add_argument('--log-level', default=None, help='poziom logowania (domyślnie LOG_LEVEL lub INFO)')
+    parser.add_argument('--log-format', choices=['text', 'json'], default=None, help='format logów (domyślnie LOG_FORMAT lub text)')
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_format)
+
+    if not os.path.isdir(args.data_dir):
+        logger.error("❌ Brak katalogu danych: %s", args.data_dir)
+        sys.exit(1)
+    serve(args.host, args.port, args.workers, args.data_dir, args.pdf_dir)
+
+
+if __name__ == '__main__':
+    main()
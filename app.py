@@ -6,9 +6,18 @@ from modules.supplier_matcher import SupplierMatcher
 from modules.pdf_generator import PDFGenerator
 from modules.auto_reorder import AutoReorderSystem
 from modules.time_simulator import TimeSimulator
+from modules.reorder_scheduler import AutoReorderScheduler
+from modules.metrics import METRICS
+from modules.profiling import PROFILER
+from modules.logging_config import configure_logging
 import uuid
+import math
+import logging
+import threading
 from datetime import datetime, timedelta
 import os
+# Moduły potrzebne tylko w części ścieżek (symulacja what-if, punkty kontrolne, pula PDF,
+# oferty PDF) są importowane przy pierwszym użyciu - krótszy czas do pierwszego renderowania
 
 # Konfiguracja strony
 st.set_page_config(
@@ -17,6 +26,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Logowanie modułów: LOG_LEVEL (domyślnie INFO), LOG_FORMAT=json dla zbieraczy logów
+configure_logging()
+
 # Inicjalizacja
 @st.cache_resource
 def init_system():
@@ -24,9 +36,10 @@ def init_system():
     if data_loader.load_all_data():
         classifier = SimpleClassifier(data_loader.products)
         matcher = SupplierMatcher(data_loader.suppliers, data_loader.purchase_orders)
-        pdf_generator = PDFGenerator()
-        auto_reorder = AutoReorderSystem(data_loader, matcher, pdf_generator)
+        # PDF_DEFERRED=1 - dokumenty PDF renderowane dopiero przy pobraniu (z wiersza orders.csv)
+        pdf_generator = PDFGenerator(deferred=os.environ.get('PDF_DEFERRED') == '1')
         time_simulator = TimeSimulator('data')
+        auto_reorder = AutoReorderSystem(data_loader, matcher, pdf_generator, time_simulator)
         return data_loader, classifier, matcher, pdf_generator, auto_reorder, time_simulator
     return None, None, None, None, None, None
 
@@ -36,6 +49,120 @@ if data_loader is None:
     st.error("❌ Błąd ładowania danych! Sprawdź pliki CSV w folderze 'data/'")
     st.stop()
 
+# Harmonogram automatycznego zamawiania (wątek w tle, wspólny dla wszystkich sesji)
+@st.cache_resource
+def init_reorder_scheduler(_auto_reorder):
+    return AutoReorderScheduler(_auto_reorder)
+
+reorder_scheduler = init_reorder_scheduler(auto_reorder)
+
+# Generowanie PDF w puli procesów - kliknięcie nie czeka na renderowanie
+@st.cache_resource
+def init_pdf_service(output_dir):
+    from modules.pdf_service import PDFRenderService
+    return PDFRenderService(output_dir)
+
+pdf_service = init_pdf_service(pdf_generator.output_dir)
+
+def queue_order_pdf(order_data):
+    """Zleca PDF w tle; przy pełnej kolejce generuje go od razu"""
+    if pdf_generator.deferred:
+        pdf_generator.generate_order_pdf(order_data)
+        return "do pobrania w historii zamówień"
+    job_id = pdf_service.submit(order_data)
+    if job_id is None:
+        return pdf_generator.generate_order_pdf(order_data)
+    return f"w przygotowaniu (zadanie {job_id})"
+
+# Oferty PDF - ekstrakcja w puli procesów, wyniki cache'owane po skrócie pliku
+@st.cache_resource
+def init_offer_ingestor(_products):
+    from modules.offer_ingest import OfferIngestor
+    return OfferIngestor(_products)
+
+offer_ingestor = init_offer_ingestor(data_loader.products)
+
+# Punkty kontrolne symulacji (w pamięci procesu)
+@st.cache_resource
+def init_checkpoints(_data_loader, _time_simulator):
+    from modules.checkpoints import SimulationCheckpoints
+    return SimulationCheckpoints(_data_loader, _time_simulator)
+
+checkpoints = init_checkpoints(data_loader, time_simulator)
+
+# Widoki danych cache'owane po odcisku plików (mtime, rozmiar, licznik zapisów loadera).
+# Ponowne uruchomienie skryptu bez zmian w danych nie czyta plików - tylko os.stat.
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_orders_views(fingerprint, data_dir):
+    orders_file = f'{data_dir}/orders.csv'
+    if not os.path.exists(orders_file):
+        return None
+    orders_df = pd.read_csv(orders_file)
+    status_counts = orders_df['delivery_status'].value_counts()
+    return {
+        'all': orders_df,
+        'in_delivery': orders_df[orders_df['delivery_status'].isin(['ordered', 'in_transit'])],
+        'deletable': orders_df[orders_df['delivery_status'] == 'ordered'],
+        'status_counts': {status: int(count) for status, count in status_counts.items()}
+    }
+
+def get_orders_views():
+    return load_orders_views(data_loader.fingerprint('orders.csv'), data_loader.data_dir)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def filter_orders(fingerprint, data_dir, view, status, order_type, overdue_only, today):
+    """Zamówienia widoku po filtrach, z liczbą dni do terminu dostawy (wektorowo, bez pętli po wierszach)"""
+    views = load_orders_views(fingerprint, data_dir)
+    if views is None:
+        return pd.DataFrame()
+    orders = views[view]
+    if status != "Wszystkie":
+        orders = orders[orders['delivery_status'] == status]
+    if order_type != "Wszystkie":
+        orders = orders[orders['order_type'] == order_type]
+    delivery_dates = pd.to_datetime(orders['estimated_delivery'], format='%Y-%m-%d', errors='coerce')
+    orders = orders.assign(days_remaining=(delivery_dates - pd.Timestamp(today)).dt.days)
+    if overdue_only:
+        orders = orders[orders['days_remaining'] < 0]
+    return orders
+
+def get_filtered_orders(view, status="Wszystkie", order_type="Wszystkie", overdue_only=False):
+    return filter_orders(data_loader.fingerprint('orders.csv'), data_loader.data_dir, view,
+                         status, order_type, overdue_only, datetime.now().strftime("%Y-%m-%d"))
+
+def paginate(orders, key, page_sizes=(10, 25, 50)):
+    """Tylko bieżąca strona zamówień; rozmiar i numer strony zostają w session_state"""
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Na stronie:", page_sizes, key=f"{key}_page_size")
+    pages = max(1, math.ceil(len(orders) / page_size))
+    # Po zmianie filtrów numer strony może wykraczać poza zakres
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    with col2:
+        page = st.number_input("Strona:", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    with col3:
+        st.caption(f"Zamówienia {min(start + 1, len(orders))}-{min(start + page_size, len(orders))} z {len(orders)} (strona {page}/{pages})")
+    return orders.iloc[start:start + page_size]
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def inventory_view(fingerprint, low_stock_only, sort_by, _inventory):
+    below_min = _inventory['Stock'] <= _inventory['Min_stock_level']
+    inventory_display = _inventory[below_min] if low_stock_only else _inventory
+    return inventory_display.sort_values(by=sort_by)[['Product_ID', 'Product_Name', 'Stock', 'Min_stock_level', 'Unit']]
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def inventory_metrics(fingerprint, _inventory):
+    # Kolumny odczytane raz dla obu progów
+    stock = _inventory['Stock'].to_numpy()
+    min_level = _inventory['Min_stock_level'].to_numpy()
+    return {
+        'total': len(_inventory),
+        'low': int((stock <= min_level).sum()),
+        'critical': int((stock <= min_level * 0.5).sum())
+    }
+
 # Interfejs użytkownika
 st.title("🏢 AI Procurement System")
 st.markdown("### System automatycznego zarządzania zamówieniami")
@@ -54,16 +181,13 @@ st.sidebar.info(f"""
 col1, col2 = st.sidebar.columns(2)
 with col1:
     if st.button("⏩ +1 dzień", use_container_width=True, key="advance_1_day"):
-        new_date = time_simulator.advance_time(1)
-        time_simulator.simulate_daily_operations(data_loader)
+        new_date = time_simulator.advance_days(1, data_loader)
         st.sidebar.success(f"Przesunięto czas o 1 dzień na: {new_date}")
         st.rerun()
 
 with col2:
     if st.button("⏩ +7 dni", use_container_width=True, key="advance_7_days"):
-        new_date = time_simulator.advance_time(7)
-        for _ in range(7):
-            time_simulator.simulate_daily_operations(data_loader)
+        new_date = time_simulator.advance_days(7, data_loader)
         st.sidebar.success(f"Przesunięto czas o 7 dni na: {new_date}")
         st.rerun()
 
@@ -72,6 +196,89 @@ if st.sidebar.button("🔄 Resetuj czas", type="secondary", key="reset_time"):
     st.sidebar.success("Zresetowano czas symulacji")
     st.rerun()
 
+# Punkty kontrolne - rozgałęzienie scenariusza i szybki powrót
+with st.sidebar.expander("💾 Punkty kontrolne"):
+    checkpoint_name = st.text_input("Nazwa punktu:", value=f"punkt-{sim_info['current_simulation_date']}", key="checkpoint_name")
+    if st.button("💾 Zapisz punkt kontrolny", use_container_width=True, key="create_checkpoint"):
+        checkpoints.create(checkpoint_name)
+        st.success(f"Zapisano punkt '{checkpoint_name}'")
+    
+    checkpoint_list = checkpoints.list()
+    if checkpoint_list:
+        selected_checkpoint = st.selectbox(
+            "Przywróć punkt:",
+            [c['name'] for c in checkpoint_list],
+            format_func=lambda name: f"{name} ({next(c['current_date'] for c in checkpoint_list if c['name'] == name)})",
+            key="selected_checkpoint"
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("⏪ Przywróć", use_container_width=True, key="restore_checkpoint"):
+                checkpoints.restore(selected_checkpoint)
+                st.rerun()
+        with col2:
+            if st.button("🗑️ Usuń", use_container_width=True, key="delete_checkpoint"):
+                checkpoints.delete(selected_checkpoint)
+                st.rerun()
+
+# Scenariusz "what-if" na długi horyzont (bez zapisu zmian)
+whatif_days = st.sidebar.number_input("Horyzont scenariusza (dni):", min_value=1, max_value=3650, value=365, step=30, key="whatif_days")
+if st.sidebar.button("🔮 Symuluj scenariusz", use_container_width=True, key="run_whatif"):
+    from modules.event_simulator import EventDrivenSimulator
+    whatif_result = EventDrivenSimulator(time_simulator).run(int(whatif_days), data_loader)
+    st.session_state.whatif_result = whatif_result
+    st.session_state.whatif_summary = EventDrivenSimulator(time_simulator).summarize(whatif_result, data_loader)
+
+if 'whatif_result' in st.session_state:
+    whatif_result = st.session_state.whatif_result
+    whatif_summary = st.session_state.whatif_summary
+    st.sidebar.write(f"**Scenariusz:** {whatif_result['start_date']} → {whatif_result['end_date']}")
+    st.sidebar.write(f"**Dostawy:** {whatif_result['deliveries']}, **zapotrzebowania:** {len(whatif_result['new_requests'])}")
+    st.sidebar.write(f"**Produkty z brakami:** {int((whatif_summary['Stockout_Days'] > 0).sum())}, "
+                     f"**średnio dni bez stanu:** {whatif_summary['Stockout_Days'].mean():.1f}")
+    with st.sidebar.expander("Najdłuższe braki"):
+        st.dataframe(whatif_summary[['Product_Name', 'Stockout_Days', 'Stock_End']].head(10), use_container_width=True)
+
+# Status automatycznego zamawiania w sidebar
+st.sidebar.header("🤖 Automatyczne zamawianie")
+scheduler_status = reorder_scheduler.get_status()
+if scheduler_status['running']:
+    st.sidebar.success("🔄 Aktywne" + (" - sprawdzanie w toku..." if scheduler_status['busy'] else ""))
+else:
+    st.sidebar.info("⏸️ Wyłączone")
+st.sidebar.write(f"**Przebiegi:** {scheduler_status['runs']} (pominięte: {scheduler_status['skipped_runs']})")
+st.sidebar.write(f"**Utworzone zamówienia:** {scheduler_status['orders_created']} (ostatnia godzina: {scheduler_status['orders_last_hour']})")
+st.sidebar.write(f"**Błędy / limit:** {scheduler_status['orders_failed']} / {scheduler_status['rate_limited']}")
+if scheduler_status['last_run_finished']:
+    st.sidebar.write(f"**Ostatni przebieg:** {scheduler_status['last_run_finished']} ({scheduler_status['last_run_duration']} s, {scheduler_status['last_run_orders']} zamówień)")
+if scheduler_status['last_error']:
+    st.sidebar.error(f"Błąd: {scheduler_status['last_error']}")
+
+# Kolejka generowania PDF
+pdf_status = pdf_service.get_status()
+if pdf_status['submitted']:
+    st.sidebar.write(f"**📄 PDF:** w kolejce {pdf_status['pending']}/{pdf_status['max_pending']}, "
+                     f"gotowe {pdf_status['completed']}, błędy {pdf_status['failed']}, anulowane {pdf_status['cancelled']}")
+
+# Profilowanie (cProfile + tracemalloc) - ustawienie wspólne dla całego procesu
+def apply_profiling_settings():
+    """Zmiana ustawień z panelu - wywoływana tylko przy zmianie widżetu, nie przy każdym odświeżeniu"""
+    PROFILER.enabled = st.session_state.profiling_enabled
+    PROFILER.sample_rate = st.session_state.profiling_sample_rate
+
+with st.sidebar.expander("🔬 Profilowanie"):
+    # Widżety pokazują bieżący stan procesu (mógł go zmienić użytkownik innej sesji)
+    st.session_state.profiling_enabled = PROFILER.enabled
+    st.session_state.profiling_sample_rate = float(PROFILER.sample_rate)
+    st.checkbox("Profiluj operacje", key="profiling_enabled", on_change=apply_profiling_settings)
+    st.slider("Część profilowanych wywołań:", 0.0, 1.0, step=0.01, key="profiling_sample_rate",
+              on_change=apply_profiling_settings)
+    st.caption(f"Profilowane: {PROFILER.stats['profiled']} z {PROFILER.stats['calls']} wywołań, raporty w '{PROFILER.output_dir}/'")
+    for report_path in PROFILER.reports(limit=5):
+        with open(report_path, encoding='utf-8') as report_file:
+            st.download_button(f"⬇️ {os.path.basename(report_path)}", data=report_file.read(),
+                               file_name=os.path.basename(report_path), mime="text/plain", key=f"profile_{report_path}")
+
 # Debug info w sidebar
 st.sidebar.header("🔍 Debug Info")
 if st.sidebar.button("Wyczyść debug", key="clear_debug"):
@@ -79,7 +286,7 @@ if st.sidebar.button("Wyczyść debug", key="clear_debug"):
         del st.session_state.debug_info
 
 # Zakładki
-tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["📋 Złóż zapotrzebowanie", "📑 Umowy terminowe", "📊 Stany magazynowe", "🏭 Zamówienia produkcyjne", "🚚 W Dostawie", "📦 Historia zamówień", "🗑️ Zarządzanie zamówieniami"])
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs(["📋 Złóż zapotrzebowanie", "📑 Umowy terminowe", "📊 Stany magazynowe", "🏭 Zamówienia produkcyjne", "🚚 W Dostawie", "📦 Historia zamówień", "🗑️ Zarządzanie zamówieniami", "📈 Metryki"])
 
 with tab1:
     st.header("Złóż nowe zapotrzebowanie")
@@ -200,15 +407,13 @@ with tab1:
                             'delivery_status': 'ordered'
                         }
                         
-                        # Generuj PDF
+                        # Zapisz zamówienie, PDF generowany w tle
                         try:
-                            pdf_path = pdf_generator.generate_order_pdf(order_data)
-                            
-                            # Zapisz zamówienie
                             success = data_loader.save_order(order_data)
                             
                             if success:
-                                st.success(f"📄 Zamówienie zatwierdzone! Wygenerowano: {pdf_path}")
+                                pdf_path = queue_order_pdf(order_data)
+                                st.success(f"📄 Zamówienie zatwierdzone! PDF: {pdf_path}")
                                 st.balloons()
                                 
                                 # Wyczyść stan sesji po udanym zamówieniu
@@ -243,10 +448,42 @@ with tab1:
                 
                 # Tryb ofertowy
                 st.markdown("**📄 Tryb ofertowy:**")
-                uploaded_file = st.file_uploader("Prześlij ofertę PDF", type='pdf')
-                if uploaded_file and st.button("🔄 Utwórz zamówienie z oferty"):
-                    st.info("📝 Tworzę zamówienie na podstawie oferty...")
-                    # Tutaj dodamy parsowanie PDF
+                uploaded_files = st.file_uploader("Prześlij ofertę PDF", type='pdf', accept_multiple_files=True)
+                if uploaded_files and st.button("🔄 Utwórz zamówienie z oferty"):
+                    with st.spinner("📝 Tworzę zamówienie na podstawie oferty..."):
+                        offers = offer_ingestor.ingest([(f.name, f.getvalue()) for f in uploaded_files])
+                        st.session_state.offer_results = offers
+                        st.session_state.offer_drafts = [draft for offer in offers
+                                                         for draft in offer_ingestor.draft_orders(offer, order_type)]
+                
+                if st.session_state.get('offer_results'):
+                    for offer in st.session_state.offer_results:
+                        st.write(f"**{offer['name']}** - dostawca: {offer.get('supplier_name') or 'nie rozpoznano'}, "
+                                 f"pozycje: {len(offer['items'])}" + (" (z pamięci podręcznej)" if offer['cached'] else ""))
+                        if offer.get('error'):
+                            st.error(f"Błąd odczytu oferty: {offer['error']}")
+                        elif not offer['items']:
+                            st.warning("Nie znaleziono pozycji w ofercie")
+                
+                if st.session_state.get('offer_drafts'):
+                    drafts_df = pd.DataFrame(st.session_state.offer_drafts)
+                    st.dataframe(drafts_df[['product_name', 'quantity', 'unit', 'price', 'supplier_name']], use_container_width=True)
+                    if st.button("✅ Zatwierdź zamówienia z oferty", type="primary", key="approve_offer_orders"):
+                        drafts = st.session_state.offer_drafts
+                        # Jeden zapis całej oferty (dopisanie do orders.csv) - wszystkie pozycje albo żadna
+                        saved = data_loader.save_orders(drafts)
+                        if saved == len(drafts):
+                            for draft in drafts:
+                                queue_order_pdf(draft)
+                            st.success(f"📄 Zatwierdzono {saved} zamówień z oferty")
+                        elif saved:
+                            # Pominięte tylko zamówienia, które już były w orders.csv - PDF powstanie przy pobraniu
+                            st.warning(f"⚠️ Zatwierdzono {saved} z {len(drafts)} zamówień z oferty - pozostałe już istniały")
+                        else:
+                            st.error("❌ Nie udało się zapisać zamówień z oferty")
+                        if saved:
+                            del st.session_state.offer_results
+                            del st.session_state.offer_drafts
 
 with tab2:
     st.header("Umowy terminowe")
@@ -271,30 +508,22 @@ with tab3:
         with col2:
             sort_by = st.selectbox("Sortuj według:", ["Product_Name", "Stock", "Min_stock_level"])
         
-        # Filtruj dane
-        inventory_display = data_loader.inventory.copy()
-        if low_stock_only:
-            inventory_display = inventory_display[inventory_display['Stock'] <= inventory_display['Min_stock_level']]
-        
-        # Sortuj dane
-        inventory_display = inventory_display.sort_values(by=sort_by)
-        
-        # Wyświetl stan magazynowy z kolorowaniem
+        # Widok i statystyki przeliczane tylko po zmianie stanów magazynowych
+        inventory_fingerprint = data_loader.fingerprint('inventory.csv')
         st.dataframe(
-            inventory_display[['Product_ID', 'Product_Name', 'Stock', 'Min_stock_level', 'Unit']],
+            inventory_view(inventory_fingerprint, low_stock_only, sort_by, data_loader.inventory),
             use_container_width=True
         )
         
         # Statystyki
+        metrics = inventory_metrics(inventory_fingerprint, data_loader.inventory)
         col1, col2, col3 = st.columns(3)
         with col1:
-            total_products = len(data_loader.inventory)
-            st.metric("Łączna liczba produktów", total_products)
+            st.metric("Łączna liczba produktów", metrics['total'])
         with col2:
-            low_stock_count = len(data_loader.inventory[data_loader.inventory['Stock'] <= data_loader.inventory['Min_stock_level']])
-            st.metric("Produkty z niskim stanem", low_stock_count)
+            st.metric("Produkty z niskim stanem", metrics['low'])
         with col3:
-            critical_count = len(data_loader.inventory[data_loader.inventory['Stock'] <= data_loader.inventory['Min_stock_level'] * 0.5])
+            critical_count = metrics['critical']
             st.metric("Produkty krytyczne", critical_count, delta=f"-{critical_count}", delta_color="inverse")
     else:
         st.info("Brak danych magazynowych")
@@ -313,9 +542,15 @@ with tab4:
                 st.session_state.production_orders = production_orders
     
     with col2:
-        auto_reorder_enabled = st.checkbox("Włącz automatyczne zamawianie", value=False)
+        # Harmonogram jest wspólny dla procesu: pole pokazuje jego stan, a start/stop następuje
+        # tylko przy zmianie pola - sesja z nieaktualnym polem nie zatrzyma go innym użytkownikom
+        st.session_state.auto_reorder_enabled = reorder_scheduler.is_running()
+        auto_reorder_enabled = st.checkbox("Włącz automatyczne zamawianie", key="auto_reorder_enabled",
+                                           on_change=lambda: reorder_scheduler.set_enabled(st.session_state.auto_reorder_enabled))
         if auto_reorder_enabled:
-            st.info("🔄 System automatycznie utworzy zamówienia dla produktów z niskim stanem")
+            st.info(f"🔄 System automatycznie utworzy zamówienia dla produktów z niskim stanem (co {reorder_scheduler.interval_seconds // 60} min)")
+            if st.button("▶️ Sprawdź teraz", key="trigger_auto_reorder"):
+                reorder_scheduler.trigger()
     
     # Wyświetl wyniki jeśli są
     if 'production_orders' in st.session_state:
@@ -361,14 +596,12 @@ with tab4:
                                     'delivery_status': 'ordered'
                                 }
                                 
-                                # Generuj PDF
-                                pdf_path = pdf_generator.generate_order_pdf(order_data)
-                                
-                                # Zapisz zamówienie
+                                # Zapisz zamówienie, PDF generowany w tle
                                 success = data_loader.save_order(order_data)
                                 
                                 if success:
-                                    st.success(f"📄 Zamówienie produkcyjne utworzone! Wygenerowano: {pdf_path}")
+                                    pdf_path = queue_order_pdf(order_data)
+                                    st.success(f"📄 Zamówienie produkcyjne utworzone! PDF: {pdf_path}")
                                     
                                     # Odśwież stronę
                                     st.rerun()
@@ -384,30 +617,23 @@ with tab5:
     st.header("🚚 Zamówienia w Dostawie")
     
     # Pobierz zamówienia w dostawie
-    delivery_orders = data_loader.get_orders_in_delivery()
+    delivery_orders = get_filtered_orders('in_delivery')
     
     if not delivery_orders.empty:
         st.success(f"📦 Znaleziono {len(delivery_orders)} zamówień w dostawie")
         
-        # Filtry
+        # Filtry (stan w session_state - zostaje między odświeżeniami)
         col1, col2 = st.columns(2)
         with col1:
-            show_overdue = st.checkbox("Pokaż tylko przeterminowane", value=False)
+            show_overdue = st.checkbox("Pokaż tylko przeterminowane", value=False, key="delivery_overdue")
         with col2:
-            order_type_filter = st.selectbox("Filtruj typ zamówienia:", ["Wszystkie", "Standardowe", "Produkcyjne"])
+            order_type_filter = st.selectbox("Filtruj typ zamówienia:", ["Wszystkie", "Standardowe", "Produkcyjne"], key="delivery_type")
         
         # Filtruj dane
-        filtered_orders = delivery_orders.copy()
-        
-        if show_overdue:
-            today = datetime.now().strftime("%Y-%m-%d")
-            filtered_orders = filtered_orders[filtered_orders['estimated_delivery'] < today]
+        filtered_orders = get_filtered_orders('in_delivery', order_type=order_type_filter, overdue_only=show_overdue)
         
-        if order_type_filter != "Wszystkie":
-            filtered_orders = filtered_orders[filtered_orders['order_type'] == order_type_filter]
-        
-        # Wyświetl zamówienia
-        for _, order in filtered_orders.iterrows():
+        # Wyświetl zamówienia - tylko bieżąca strona
+        for _, order in paginate(filtered_orders, "delivery").iterrows():
             with st.expander(f"📦 {order['product_name']} - {order['order_id']}"):
                 col1, col2, col3 = st.columns(3)
                 
@@ -422,13 +648,11 @@ with tab5:
                     st.info(f"**Status:** {order['delivery_status']}")
                     st.info(f"**Data zamówienia:** {order['timestamp']}")
                     
-                    # Sprawdź czy dostawa jest przeterminowana
+                    # Sprawdź czy dostawa jest przeterminowana (dni policzone wektorowo w filter_orders)
                     estimated_delivery = order.get('estimated_delivery')
-                    if estimated_delivery:
-                        today = datetime.now().date()
-                        delivery_date = datetime.strptime(estimated_delivery, "%Y-%m-%d").date()
-                        days_remaining = (delivery_date - today).days
-                        
+                    days_remaining = order['days_remaining']
+                    if pd.notna(days_remaining):
+                        days_remaining = int(days_remaining)
                         if days_remaining < 0:
                             st.error(f"**Przewidywana dostawa:** {estimated_delivery} (⏰ {abs(days_remaining)} dni po terminie!)")
                         elif days_remaining == 0:
@@ -467,9 +691,7 @@ with tab5:
             total_in_delivery = len(delivery_orders)
             st.metric("Zamówienia w dostawie", total_in_delivery)
         with col2:
-            overdue_count = len(delivery_orders[
-                delivery_orders['estimated_delivery'] < datetime.now().strftime("%Y-%m-%d")
-            ])
+            overdue_count = int((delivery_orders['days_remaining'] < 0).sum())
             st.metric("Zamówienia przeterminowane", overdue_count, delta=f"+{overdue_count}", delta_color="inverse")
         with col3:
             production_in_delivery = len(delivery_orders[delivery_orders['order_type'] == 'Produkcyjne'])
@@ -480,33 +702,23 @@ with tab5:
 with tab6:
     st.header("📦 Historia zamówień")
     
-    # Sprawdź czy plik orders.csv istnieje
-    orders_file = 'data/orders.csv'
-    if os.path.exists(orders_file):
+    orders_views = get_orders_views()
+    if orders_views is not None:
         try:
-            orders_df = pd.read_csv(orders_file)
+            orders_df = orders_views['all']
             if not orders_df.empty:
                 # Filtry
-                col1, col2, col3 = st.columns(3)
+                col1, col2 = st.columns(2)
                 with col1:
                     filter_type = st.selectbox("Filtruj typ zamówienia:", ["Wszystkie", "Standardowe", "Produkcyjne"], key="history_filter")
                 with col2:
                     filter_status = st.selectbox("Filtruj status:", ["Wszystkie", "ordered", "in_transit", "delivered"], key="status_filter")
-                with col3:
-                    show_last = st.slider("Pokaż ostatnie zamówienia:", 5, 50, 10, key="history_slider")
-                
-                # Filtruj dane
-                orders_display = orders_df.copy()
-                if filter_type != "Wszystkie":
-                    orders_display = orders_display[orders_display['order_type'] == filter_type]
                 
-                if filter_status != "Wszystkie":
-                    orders_display = orders_display[orders_display['delivery_status'] == filter_status]
+                # Filtruj dane, najnowsze zamówienia na pierwszej stronie
+                orders_display = get_filtered_orders('all', status=filter_status, order_type=filter_type).iloc[::-1]
                 
-                orders_display = orders_display.tail(show_last)
-                
-                # Wyświetl z przyciskami usuwania
-                for _, order in orders_display.iterrows():
+                # Wyświetl z przyciskami usuwania - tylko bieżąca strona
+                for _, order in paginate(orders_display, "history").iterrows():
                     with st.expander(f"📦 {order['product_name']} - {order['order_id']}"):
                         col1, col2, col3 = st.columns([3, 1, 1])
                         
@@ -523,6 +735,20 @@ with tab6:
                                 st.write(f"**Przewidywana dostawa:** {order['estimated_delivery']}")
                         
                         with col3:
+                            # PDF renderowany w pamięci dopiero na żądanie (cache po skrócie treści)
+                            pdf_key = f"pdf_ready_{order['order_id']}"
+                            if st.session_state.get(pdf_key):
+                                st.download_button(
+                                    "⬇️ Pobierz PDF",
+                                    data=pdf_generator.get_order_pdf(order.to_dict()),
+                                    file_name=f"Zamowienie_{order['order_id']}.pdf",
+                                    mime="application/pdf",
+                                    key=f"download_hist_{order['order_id']}"
+                                )
+                            elif st.button("📄 PDF", key=f"pdf_hist_{order['order_id']}"):
+                                st.session_state[pdf_key] = True
+                                st.rerun()
+                            
                             # Przycisk usuwania tylko dla zamówień ze statusem 'ordered'
                             if order['delivery_status'] == 'ordered':
                                 if st.button("🗑️ Usuń", key=f"delete_hist_{order['order_id']}", type="secondary"):
@@ -539,7 +765,7 @@ with tab6:
                     total_orders = len(orders_df)
                     st.metric("Łączna liczba zamówień", total_orders)
                 with col2:
-                    delivered_orders = len(orders_df[orders_df['delivery_status'] == 'delivered'])
+                    delivered_orders = orders_views['status_counts'].get('delivered', 0)
                     st.metric("Dostarczone zamówienia", delivered_orders)
                 with col3:
                     if not orders_df.empty:
@@ -560,9 +786,9 @@ with tab7:
     st.subheader("📋 Wszystkie zamówienia w systemie")
     
     try:
-        orders_file = 'data/orders.csv'
-        if os.path.exists(orders_file):
-            all_orders = pd.read_csv(orders_file)
+        orders_views = get_orders_views()
+        if orders_views is not None:
+            all_orders = orders_views['all']
             
             if not all_orders.empty:
                 # Filtry
@@ -582,17 +808,11 @@ with tab7:
                     )
                 
                 # Filtruj zamówienia
-                filtered_orders = all_orders.copy()
-                
-                if status_filter != "Wszystkie":
-                    filtered_orders = filtered_orders[filtered_orders['delivery_status'] == status_filter]
-                
-                if type_filter != "Wszystkie":
-                    filtered_orders = filtered_orders[filtered_orders['order_type'] == type_filter]
+                filtered_orders = get_filtered_orders('all', status=status_filter, order_type=type_filter)
                 
-                # Wyświetl przefiltrowane zamówienia
+                # Wyświetl przefiltrowane zamówienia - tylko bieżąca strona
                 st.dataframe(
-                    filtered_orders[[
+                    paginate(filtered_orders, "management")[[
                         'order_id', 'product_name', 'order_type', 
                         'delivery_status', 'quantity', 'supplier_name',
                         'timestamp'
@@ -618,12 +838,12 @@ with tab7:
     """)
     
     # Pobierz zamówienia które można usunąć
-    deletable_orders = data_loader.get_deletable_orders()
+    deletable_orders = orders_views['deletable'] if orders_views is not None else pd.DataFrame()
     
     if not deletable_orders.empty:
         st.success(f"📋 Znaleziono {len(deletable_orders)} zamówień które można usunąć")
         
-        for _, order in deletable_orders.iterrows():
+        for _, order in paginate(deletable_orders, "deletable").iterrows():
             with st.expander(f"🗑️ {order['order_id']} - {order['product_name']}"):
                 col1, col2, col3 = st.columns([3, 1, 1])
                 
@@ -670,9 +890,10 @@ with tab7:
     # Sekcja 3: Statystyki systemu
     st.subheader("📊 Statystyki systemu")
     
-    if os.path.exists(orders_file):
+    if orders_views is not None:
         try:
-            orders_df = pd.read_csv(orders_file)
+            orders_df = orders_views['all']
+            status_counts = orders_views['status_counts']
             
             if not orders_df.empty:
                 col1, col2, col3, col4 = st.columns(4)
@@ -682,20 +903,66 @@ with tab7:
                     st.metric("Łącznie zamówień", total_orders)
                 
                 with col2:
-                    ordered_count = len(orders_df[orders_df['delivery_status'] == 'ordered'])
-                    st.metric("Do realizacji", ordered_count)
+                    st.metric("Do realizacji", status_counts.get('ordered', 0))
                 
                 with col3:
-                    in_transit_count = len(orders_df[orders_df['delivery_status'] == 'in_transit'])
-                    st.metric("W dostawie", in_transit_count)
+                    st.metric("W dostawie", status_counts.get('in_transit', 0))
                 
                 with col4:
-                    delivered_count = len(orders_df[orders_df['delivery_status'] == 'delivered'])
-                    st.metric("Dostarczone", delivered_count)
+                    st.metric("Dostarczone", status_counts.get('delivered', 0))
                 
         except Exception as e:
             st.error(f"❌ Błąd generowania statystyk: {e}")
 
+with tab8:
+    st.header("📈 Metryki wydajności")
+    
+    metrics_snapshot = METRICS.snapshot()
+    if not metrics_snapshot['enabled']:
+        st.info("Pomiary wyłączone (METRICS_ENABLED=0)")
+    else:
+        st.caption(f"Pomiary od {metrics_snapshot['since']} (proces aplikacji, ostatnie {METRICS.reservoir} wywołań na operację)")
+        if metrics_snapshot['operations']:
+            operations_df = pd.DataFrame.from_dict(metrics_snapshot['operations'], orient='index')
+            operations_df.index.name = 'Operacja'
+            st.dataframe(operations_df.sort_values('total_s', ascending=False), use_container_width=True)
+        else:
+            st.info("Brak pomiarów - wykonaj operację w innej zakładce")
+        
+        if metrics_snapshot['counters']:
+            st.markdown("**Liczniki:**")
+            st.dataframe(pd.Series(metrics_snapshot['counters'], name='Wartość'), use_container_width=True)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button("⬇️ Prometheus", data=METRICS.to_prometheus(), file_name="metrics.prom", mime="text/plain", key="metrics_prometheus")
+        with col2:
+            st.download_button("⬇️ JSON", data=METRICS.to_json(), file_name="metrics.json", mime="application/json", key="metrics_json")
+        with col3:
+            if st.button("🔄 Wyzeruj metryki", key="metrics_reset"):
+                METRICS.reset()
+                st.rerun()
+
+# Rozgrzewka w tle - raz na proces, po wyrenderowaniu całej strony przy pierwszym wejściu:
+# indeks podobieństwa produktów (import scikit-learn), prognoza zapotrzebowania, szablony PDF
+@st.cache_resource
+def start_prewarm(_matcher, _auto_reorder, _pdf_generator):
+    def prewarm():
+        for name, warm in (('supplier_matcher', _matcher.prewarm),
+                           ('demand_forecast', _auto_reorder.forecaster.get_forecast),
+                           ('pdf_generator', _pdf_generator.prewarm)):
+            try:
+                with METRICS.timer(f'app.prewarm.{name}'):
+                    warm()
+            except Exception as e:
+                logging.getLogger('app').warning("⚠️ Rozgrzewka %s nie powiodła się: %s", name, e)
+
+    thread = threading.Thread(target=prewarm, name='prewarm', daemon=True)
+    thread.start()
+    return thread
+
+start_prewarm(matcher, auto_reorder, pdf_generator)
+
 # Uruchomienie
 if __name__ == "__main__":
     st.info("🚀 System gotowy do działania! Wpisz zapytanie w zakładce 'Złóż zapotrzebowanie'")
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""Przetwarzanie wsadowe zapotrzebowań bez interfejsu (np. z crona)
+
+Wejście: JSONL (jedno zapotrzebowanie na linię: {"text": ...} lub {"User_Text": ...},
+opcjonalnie "order_type", "quantity") albo CSV z kolumną User_Text / text.
+Każde zapotrzebowanie przechodzi klasyfikację -> dopasowanie dostawcy -> zamówienie
+(zapis do orders.csv, opcjonalnie PDF). Wyniki są zapisywane na bieżąco, w kolejności
+wejścia; wynik zamówienia (i wyniki po nim) dopiero po zapisie jego paczki do orders.csv -
+status 'ordered' oznacza zamówienie faktycznie zapisane. Paczka jest zapisywana, gdy na
+zapis czeka --save-batch wyników (zamówień lub wyników po nich). Plik wejściowy jest
+czytany strumieniowo, a w przetwarzaniu jest naraz najwyżej --window zapotrzebowań -
+pamięć nie rośnie z rozmiarem wejścia.
+
+Uruchomienie:
+  python batch.py zapotrzebowania.jsonl --dry-run --output wyniki.jsonl
+  python batch.py zapotrzebowania.csv --workers 4 --pdf --output wyniki.csv --format csv
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from modules.data_loader import DataLoader
+from modules.classifier import SimpleClassifier
+from modules.supplier_matcher import SupplierMatcher
+from modules.pdf_generator import PDFGenerator
+from modules.logging_config import configure_logging
+
+OUTPUT_FIELDS = ['line', 'status', 'text', 'order_id', 'product_id', 'product_name', 'category',
+                 'quantity', 'unit', 'supplier_name', 'price', 'contract_type', 'confidence',
+                 'pdf_path', 'error']
+
+# Obiekty procesu roboczego - tworzone raz na proces
+_WORKER = None
+
+
+def _init_worker(data_dir, pdf_dir, log_level='WARNING'):
+    global _WORKER
+    # Procesy 'spawn' nie dziedziczą konfiguracji logowania
+    configure_logging(log_level)
+    data_loader = DataLoader(data_dir)
+    if not data_loader.load_all_data():
+        raise RuntimeError(f"Nie udało się wczytać danych z {data_dir}")
+    _WORKER = {
+        'classifier': SimpleClassifier(data_loader.products),
+        'matcher': SupplierMatcher(data_loader.suppliers, data_loader.purchase_orders),
+        'pdf_generator': PDFGenerator(pdf_dir) if pdf_dir else None
+    }
+
+
+def _process(request):
+    """Jedno zapotrzebowanie -> wynik (ze szkicem zamówienia, jeśli produkt rozpoznano)"""
+    result = {'line': request['line'], 'text': request['text']}
+    try:
+        classification = _WORKER['classifier'].classify_request(request['text'])
+        result.update({
+            'product_id': classification.get('product_id'),
+            'product_name': classification.get('product_name'),
+            'category': classification.get('category'),
+            'quantity': request.get('quantity') or classification.get('quantity', 1),
+            'unit': classification.get('unit', 'szt.'),
+            'confidence': classification.get('confidence')
+        })
+        if not classification.get('product_name'):
+            result['status'] = 'not_found'
+            return result
+
+        supplier_result = _WORKER['matcher'].find_supplier_in_contracts(
+            classification.get('product_name'), classification.get('category'))
+        result.update({
+            'order_id': f"ORD-{uuid.uuid4().hex[:8].upper()}",
+            'supplier_name': supplier_result.get('supplier_name', 'Nieznany dostawca'),
+            'price': supplier_result.get('price', 0.0),
+            'contract_type': supplier_result.get('contract_type', 'oferta'),
+            'order_type': request.get('order_type', 'Standardowe'),
+            'status': 'drafted'
+        })
+        if _WORKER['pdf_generator'] is not None:
+            result['pdf_path'] = _WORKER['pdf_generator'].generate_order_pdf(_order_data(result))
+    except Exception as e:
+        result.update({'status': 'error', 'error': str(e)})
+    return result
+
+
+def _order_data(result):
+    """Zamówienie w formacie DataLoader.save_order"""
+    now = datetime.now()
+    return {
+        'order_id': result['order_id'],
+        'user_input': result['text'],
+        'product_name': result['product_name'],
+        'category': result.get('category') or 'Inne',
+        'quantity': result['quantity'],
+        'unit': result['unit'],
+        'supplier_name': result['supplier_name'],
+        'price': result['price'],
+        'contract_type': result['contract_type'],
+        'order_type': result.get('order_type', 'Standardowe'),
+        'timestamp': now.strftime("%Y-%m-%d %H:%M:%S"),
+        'estimated_delivery': (now + timedelta(days=7)).strftime("%Y-%m-%d"),
+        'delivery_status': 'ordered'
+    }
+
+
+def _quantity(value):
+    """Ilość z wejścia (liczba lub tekst z CSV); None gdy brak lub niepoprawna"""
+    try:
+        quantity = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(quantity) if quantity.is_integer() and quantity > 0 else (quantity if quantity > 0 else None)
+
+
+def _saved_order_ids(data_dir, order_ids):
+    """Które z zamówień są w orders.csv - po niepełnym zapisie paczki (błąd, duplikaty)"""
+    orders_file = os.path.join(data_dir, 'orders.csv')
+    if not os.path.exists(orders_file):
+        return set()
+    wanted = set(order_ids)
+    with open(orders_file, encoding='utf-8', newline='') as f:
+        return {row['order_id'] for row in csv.DictReader(f) if row.get('order_id') in wanted}
+
+
+def iter_requests(path):
+    """Zapotrzebowania z pliku, czytane strumieniowo: {'line', 'text', ...}"""
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.endswith('.jsonl'):
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    print(f"⚠️ Linia {line_number}: niepoprawny JSON - pominięto", file=sys.stderr)
+                    continue
+                if isinstance(item, str):
+                    item = {'text': item}
+                text = item.get('text') or item.get('User_Text')
+                if text:
+                    yield {'line': line_number, 'text': str(text),
+                           'order_type': item.get('order_type', 'Standardowe'), 'quantity': _quantity(item.get('quantity'))}
+        else:
+            for line_number, row in enumerate(csv.DictReader(f), 2):
+                text = row.get('User_Text') or row.get('text')
+                if text:
+                    yield {'line': line_number, 'text': text,
+                           'order_type': row.get('order_type') or 'Standardowe', 'quantity': _quantity(row.get('quantity'))}
+
+
+def run_batch(requests, data_dir, pdf_dir=None, workers=1, window=256, log_level='WARNING'):
+    """Wyniki w kolejności wejścia; w toku najwyżej `window` zapotrzebowań"""
+    if workers <= 1:
+        for request in requests:
+            yield _process(request)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(data_dir, pdf_dir, log_level)) as executor:
+        in_flight = deque()
+        for request in requests:
+            in_flight.append(executor.submit(_process, request))
+            if len(in_flight) >= window:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+class ResultWriter:
+    """Zapis wyników na bieżąco: JSONL albo CSV"""
+
+    def __init__(self, stream, output_format):
+        self.stream = stream
+        self.output_format = output_format
+        self._csv = None
+        if output_format == 'csv':
+            self._csv = csv.DictWriter(stream, fieldnames=OUTPUT_FIELDS, extrasaction='ignore')
+            self._csv.writeheader()
+
+    def write(self, result):
+        if self._csv is not None:
+            self._csv.writerow(result)
+        else:
+            self.stream.write(json.dumps(result, ensure_ascii=False, default=str) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='plik JSONL lub CSV z zapotrzebowaniami')
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--dry-run', action='store_true', help='bez zapisu zamówień i PDF - tylko klasyfikacja i dopasowanie')
+    parser.add_argument('--workers', type=int, default=1, help='liczba procesów roboczych')
+    parser.add_argument('--window', type=int, default=256, help='maksymalna liczba zapotrzebowań w toku')
+    parser.add_argument('--save-batch', type=int, default=1000, help='zamówienia zapisywane do orders.csv paczkami (najwyżej tyle wyników czeka na zapis)')
+    parser.add_argument('--pdf', action='store_true', help='generuj PDF dla zapisanych zamówień')
+    parser.add_argument('--pdf-dir', default='orders')
+    parser.add_argument('--output', default='-', help="plik wyników ('-' = stdout)")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl', help='format wyników')
+    parser.add_argument('--progress-every', type=float, default=2.0, help='co ile sekund raport postępu (stderr)')
+    parser.add_argument('--log-level', default=os.environ.get('LOG_LEVEL', 'WARNING'),
+                        help='poziom logowania modułów na stderr (domyślnie WARNING - bez komunikatu na każde zamówienie)')
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+
+    if not os.path.exists(args.input):
+        print(f"❌ Brak pliku wejściowego: {args.input}", file=sys.stderr)
+        sys.exit(1)
+
+    pdf_dir = args.pdf_dir if args.pdf and not args.dry_run else None
+    if args.workers <= 1:
+        _init_worker(args.data_dir, pdf_dir, args.log_level)
+
+    data_loader = DataLoader(args.data_dir)
+
+    counts = {'drafted': 0, 'not_found': 0, 'error': 0, 'saved': 0}
+    pending_orders = []
+    waiting_results = []    # wyniki od pierwszego niezapisanego zamówienia - kolejność wejścia
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    writer = ResultWriter(output, args.format)
+
+    def flush_orders():
+        """Zapisuje paczkę zamówień, potem czekające wyniki; 'ordered' tylko dla zapisanych"""
+        saved_ids = set()
+        if pending_orders:
+            order_ids = [order['order_id'] for order in pending_orders]
+            saved = data_loader.save_orders(pending_orders)
+            counts['saved'] += saved
+            saved_ids = set(order_ids) if saved == len(order_ids) else _saved_order_ids(args.data_dir, order_ids)
+            pending_orders.clear()
+        for result in waiting_results:
+            if result['status'] == 'drafted':
+                if result['order_id'] in saved_ids:
+                    result['status'] = 'ordered'
+                else:
+                    result['status'] = 'error'
+                    result['error'] = 'Nie zapisano zamówienia w orders.csv'
+            writer.write(result)
+        waiting_results.clear()
+    started = last_report = time.perf_counter()
+    processed = 0
+    try:
+        for result in run_batch(iter_requests(args.input), args.data_dir, pdf_dir, args.workers, args.window,
+                                args.log_level):
+            processed += 1
+            counts[result['status']] += 1
+            if result['status'] == 'drafted' and not args.dry_run:
+                pending_orders.append(_order_data(result))
+            if pending_orders:
+                waiting_results.append(result)
+                # Limit liczy też wyniki bez zamówienia - inaczej jedno zamówienie wstrzymałoby resztę wejścia
+                if len(waiting_results) >= args.save_batch:
+                    flush_orders()
+            else:
+                writer.write(result)
+
+            now = time.perf_counter()
+            if now - last_report >= args.progress_every:
+                last_report = now
+                print(f"⏳ {processed:,} zapotrzebowań, {processed / (now - started):,.0f}/s, "
+                      f"błędy: {counts['error']}", file=sys.stderr)
+    finally:
+        # Także po przerwaniu (Ctrl+C) - rozpoznane zamówienia nie przepadają
+        try:
+            flush_orders()
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+    elapsed = time.perf_counter() - started
+    saved = " (próba, bez zapisu)" if args.dry_run else f", zapisane {counts['saved']}"
+    print(f"✅ Przetworzono {processed:,} zapotrzebowań w {elapsed:.1f} s "
+          f"({processed / elapsed if elapsed > 0 else 0:,.0f}/s): zamówienia {counts['drafted']}{saved}, "
+          f"bez produktu {counts['not_found']}, błędy {counts['error']}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
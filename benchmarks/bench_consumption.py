@@ -0,0 +1,64 @@
+"""Benchmark dziennego zużycia w TimeSimulator (wektorowo vs. pętla iterrows)
+
+Uruchomienie: python -m benchmarks.bench_consumption [--products 1000000] [--days 10]
+"""
+import argparse
+import random
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.time_simulator import TimeSimulator
+
+
+def _legacy_consumption(inventory):
+    """Dawna implementacja (iterrows + .at[]) - punkt odniesienia"""
+    consumption_factor = random.uniform(0.01, 0.10)
+    for idx, product in inventory.iterrows():
+        current_stock = product['Stock']
+        if current_stock > 0:
+            consumption = max(1, int(current_stock * consumption_factor * random.uniform(0.5, 1.5)))
+            new_stock = max(0, current_stock - consumption)
+            inventory.at[idx, 'Stock'] = new_stock
+            inventory.at[idx, 'Closing_Stock'] = new_stock
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=10)
+    parser.add_argument('--legacy-sample', type=int, default=20_000,
+                        help='liczba produktów dla pomiaru starej pętli (ekstrapolowana)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    stock = rng.integers(0, 500, size=args.products)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        simulator = TimeSimulator(tmp, seed=42)
+
+    # Wektorowo: jeden dzień = jedna operacja na tablicach
+    timings = []
+    current = stock
+    for _ in range(args.days):
+        start = time.perf_counter()
+        current, _ = simulator._consume_stock(current)
+        timings.append(time.perf_counter() - start)
+    per_day = float(np.median(timings))
+
+    # Dawna pętla na próbce, ekstrapolowana liniowo
+    sample = pd.DataFrame({'Stock': stock[:args.legacy_sample], 'Closing_Stock': stock[:args.legacy_sample]})
+    start = time.perf_counter()
+    _legacy_consumption(sample)
+    legacy_per_day = (time.perf_counter() - start) * args.products / len(sample)
+
+    print(f"Produkty: {args.products:,}, dni: {args.days}")
+    print(f"Wektorowo:  {per_day * 1000:10.2f} ms / dzień")
+    print(f"iterrows:   {legacy_per_day * 1000:10.2f} ms / dzień (ekstrapolacja z {len(sample):,})")
+    print(f"Przyspieszenie: {legacy_per_day / per_day:,.0f}x")
+
+
+if __name__ == '__main__':
+    main()
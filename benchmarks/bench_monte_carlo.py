@@ -0,0 +1,42 @@
+"""Skalowanie replik Monte Carlo z liczbą procesów
+
+Uruchomienie: python -m benchmarks.bench_monte_carlo [--replicas 64] [--days 365] [--data-dir data]
+"""
+import argparse
+import os
+
+from modules.data_loader import DataLoader
+from modules.logging_config import configure_logging
+from modules.monte_carlo import MonteCarloRunner
+from modules.time_simulator import TimeSimulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--replicas', type=int, default=64)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--policy', default='forecast', choices=MonteCarloRunner.POLICIES)
+    parser.add_argument('--data-dir', default='data')
+    args = parser.parse_args()
+    # Komunikaty INFO modułów nie wchodzą do pomiaru
+    configure_logging('WARNING')
+
+    data_loader = DataLoader(args.data_dir)
+    data_loader.load_all_data()
+    time_simulator = TimeSimulator(args.data_dir)
+
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+
+    baseline = None
+    print(f"Repliki: {args.replicas}, horyzont: {args.days} dni, polityka: {args.policy}, CPU: {cpus}")
+    for workers in worker_counts:
+        summary = MonteCarloRunner(data_loader, time_simulator, max_workers=workers).run(
+            args.replicas, args.days, policy=args.policy)
+        throughput = summary['replicas_per_second']
+        baseline = baseline or throughput
+        print(f"{workers:3d} proc.: {throughput:8.1f} replik/s  (x{throughput / baseline:.2f})")
+
+
+if __name__ == '__main__':
+    main()
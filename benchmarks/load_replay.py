@@ -0,0 +1,223 @@
+"""Odtwarzanie obciążenia: zapotrzebowania przez klasyfikację -> dopasowanie dostawcy -> szkic zamówienia
+
+Źródłem są zapotrzebowania z data/user_requests.csv (kolumna User_Text) albo
+plik JSONL (jedno zapotrzebowanie na linię: {"text": ...}, {"User_Text": ...}
+lub sam tekst w cudzysłowie). Zapytania są wysyłane w otwartej pętli z zadaną
+częstotliwością - opóźnienie liczone jest od planowanego momentu przybycia,
+więc obejmuje też czas oczekiwania w kolejce, gdy system nie nadąża.
+
+Wynik: p50/p95/p99 czasu każdego etapu, opóźnienie całkowite i przepustowość.
+
+Uruchomienie:
+  python -m benchmarks.load_replay --rate 20 --concurrency 4 --limit 500
+  python -m benchmarks.load_replay --input zapytania.jsonl --rate 0 --output wynik.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from modules.classifier import SimpleClassifier
+from modules.data_loader import DataLoader
+from modules.logging_config import configure_logging
+from modules.pdf_generator import PDFGenerator
+from modules.supplier_matcher import SupplierMatcher
+
+STAGES = ['classify', 'match', 'draft']
+
+
+def load_requests(path, limit=None):
+    """Teksty zapotrzebowań z CSV (User_Text) lub JSONL"""
+    if path.endswith('.jsonl'):
+        texts = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                item = json.loads(line)
+                text = item if isinstance(item, str) else item.get('text') or item.get('User_Text')
+                if text:
+                    texts.append(str(text))
+                if limit and len(texts) >= limit:
+                    break
+        return texts
+    requests_df = pd.read_csv(path, usecols=['User_Text'], nrows=limit)
+    return requests_df['User_Text'].dropna().astype(str).tolist()
+
+
+class ReplayPipeline:
+    """Ten sam przebieg co w zakładce zamówień app.py, bez interfejsu"""
+
+    def __init__(self, data_loader, pdf_dir=None):
+        self.classifier = SimpleClassifier(data_loader.products)
+        self.matcher = SupplierMatcher(data_loader.suppliers, data_loader.purchase_orders)
+        self.pdf_generator = PDFGenerator(pdf_dir) if pdf_dir else None
+        self.stages = STAGES + (['pdf'] if self.pdf_generator is not None else [])
+
+    def process(self, text):
+        """Przetwarza jedno zapotrzebowanie; zwraca czasy etapów w ms"""
+        timings = {}
+
+        started = time.perf_counter()
+        classification = self.classifier.classify_request(text)
+        timings['classify'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        supplier_result = self.matcher.find_supplier_in_contracts(
+            classification.get('product_name'), classification.get('category'))
+        if not supplier_result.get('found') and classification.get('product_name'):
+            self.matcher.find_similar_products(classification.get('product_name'), classification.get('category'))
+        timings['match'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        order_data = {
+            'order_id': f"ORD-{uuid.uuid4().hex[:8].upper()}",
+            'user_input': text,
+            'product_name': classification.get('product_name') or 'Nieznany produkt',
+            'category': classification.get('category', 'Inne'),
+            'quantity': classification.get('quantity', 1),
+            'unit': classification.get('unit', 'szt.'),
+            'supplier_name': supplier_result.get('supplier_name', 'Nieznany dostawca'),
+            'price': supplier_result.get('price', 0.0),
+            'contract_type': supplier_result.get('contract_type', 'oferta'),
+            'order_type': 'Standardowe',
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'estimated_delivery': (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d"),
+            'delivery_status': 'ordered'
+        }
+        timings['draft'] = time.perf_counter() - started
+
+        if self.pdf_generator is not None:
+            started = time.perf_counter()
+            self.pdf_generator.generate_order_pdf(order_data)
+            timings['pdf'] = time.perf_counter() - started
+
+        return {stage: seconds * 1000 for stage, seconds in timings.items()}, supplier_result.get('found', False)
+
+
+def replay(pipeline, texts, rate, concurrency, duration=None):
+    """Wysyła zapytania w otwartej pętli (rate/s, 0 = bez limitu) do puli `concurrency` wątków"""
+    records = []
+    records_lock = threading.Lock()
+    errors = []
+
+    def handle(text, scheduled):
+        picked = time.perf_counter()
+        try:
+            timings, found = pipeline.process(text)
+        except Exception as e:
+            with records_lock:
+                errors.append(str(e))
+            return
+        finished = time.perf_counter()
+        with records_lock:
+            records.append({
+                **timings,
+                'queue': (picked - scheduled) * 1000,
+                'total': (finished - scheduled) * 1000,
+                'found': found
+            })
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i, text in enumerate(texts):
+            scheduled = started + i / rate if rate > 0 else time.perf_counter()
+            if duration is not None and scheduled - started > duration:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(handle, text, scheduled)
+    elapsed = time.perf_counter() - started
+    return records, errors, elapsed
+
+
+def summarize(records, errors, elapsed, rate, concurrency, stages=STAGES):
+    def percentiles(values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return None
+        return {
+            'p50_ms': round(float(np.percentile(values, 50)), 3),
+            'p95_ms': round(float(np.percentile(values, 95)), 3),
+            'p99_ms': round(float(np.percentile(values, 99)), 3),
+            'max_ms': round(float(values.max()), 3),
+            'mean_ms': round(float(values.mean()), 3)
+        }
+
+    per_stage = {}
+    for stage in list(stages) + ['queue', 'total']:
+        stats = percentiles([r[stage] for r in records if stage in r])
+        if stats is not None:
+            # Przepustowość samego etapu przy pełnym obciążeniu jednego wątku
+            stats['capacity_per_worker_rps'] = round(1000 / stats['mean_ms'], 2) if stage in stages and stats['mean_ms'] > 0 else None
+            per_stage[stage] = stats
+
+    return {
+        'requests': len(records),
+        'errors': len(errors),
+        'error_samples': errors[:5],
+        'target_rate_rps': rate,
+        'concurrency': concurrency,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(len(records) / elapsed, 2) if elapsed > 0 else None,
+        'supplier_found_ratio': round(float(np.mean([r['found'] for r in records])), 3) if records else None,
+        'stages': per_stage
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--input', default=None, help='CSV z kolumną User_Text lub JSONL (domyślnie user_requests.csv)')
+    parser.add_argument('--limit', type=int, default=None, help='maksymalna liczba zapytań')
+    parser.add_argument('--rate', type=float, default=10.0, help='docelowa liczba zapytań na sekundę (0 = bez limitu)')
+    parser.add_argument('--concurrency', type=int, default=4, help='liczba równoległych wątków obsługi')
+    parser.add_argument('--duration', type=float, default=None, help='maksymalny czas wysyłania (s)')
+    parser.add_argument('--pdf', action='store_true', help='generuj też PDF szkicu zamówienia (do katalogu tymczasowego)')
+    parser.add_argument('--output', default=None, help='plik JSON z podsumowaniem')
+    args = parser.parse_args()
+    # Komunikaty INFO modułów (np. na każde zapytanie) nie wchodzą do pomiaru
+    configure_logging('WARNING')
+
+    data_loader = DataLoader(args.data_dir)
+    if not data_loader.load_all_data():
+        print(f"❌ Nie udało się wczytać danych z {args.data_dir}")
+        sys.exit(1)
+
+    texts = load_requests(args.input or os.path.join(args.data_dir, 'user_requests.csv'), args.limit)
+    if not texts:
+        print("❌ Brak zapytań do odtworzenia")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as pdf_dir:
+        pipeline = ReplayPipeline(data_loader, pdf_dir if args.pdf else None)
+        print(f"🚀 Odtwarzanie {len(texts):,} zapytań: {f'{args.rate}/s' if args.rate else 'bez limitu'}, {args.concurrency} wątków")
+        records, errors, elapsed = replay(pipeline, texts, args.rate, args.concurrency, args.duration)
+
+    summary = summarize(records, errors, elapsed, args.rate, args.concurrency, pipeline.stages)
+
+    print(f"{'etap':10s} {'p50':>10s} {'p95':>10s} {'p99':>10s} {'max':>10s}  [ms]")
+    for stage, stats in summary['stages'].items():
+        print(f"{stage:10s} {stats['p50_ms']:10.2f} {stats['p95_ms']:10.2f} {stats['p99_ms']:10.2f} {stats['max_ms']:10.2f}")
+    print(f"📊 Obsłużono {summary['requests']:,} zapytań w {summary['elapsed_seconds']} s "
+          f"({summary['throughput_rps']} zapytań/s), błędy: {summary['errors']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        print(f"💾 Zapisano podsumowanie: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
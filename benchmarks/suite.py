@@ -0,0 +1,360 @@
+"""Zestaw benchmarków gorących ścieżek wszystkich modułów w kilku skalach danych
+
+Dane dla skal są generowane przez modules.dataset_generator i trzymane w
+katalogu tymczasowym między uruchomieniami. Scenariusze zapisujące pliki
+pracują na kopii danych. Wynik (mediana, p95, min na wywołanie) można zapisać
+do JSON i porównać z zapisanym wcześniej wynikiem bazowym - przy regresji
+powyżej progu proces kończy się kodem 1.
+
+Raport zawiera też profil czasu importu modułów aplikacji (świeży interpreter,
+python -X importtime): łączny czas i najcięższe pakiety. --import-budget-ms
+ustala budżet czasu startu - jego przekroczenie też kończy się kodem 1.
+
+Uruchomienie:
+  python -m benchmarks.suite --scales ref,small --output wyniki.json
+  python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+  python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 1.3
+  python -m benchmarks.suite --scales ref --scenarios classify --import-budget-ms 800
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from modules.auto_reorder import AutoReorderSystem
+from modules.classifier import SimpleClassifier
+from modules.data_loader import DataLoader
+from modules.dataset_generator import DatasetGenerator
+from modules.logging_config import configure_logging
+from modules.pdf_generator import PDFGenerator
+from modules.supplier_matcher import SupplierMatcher
+from modules.time_simulator import TimeSimulator
+
+# Skala -> liczba produktów (None = dane referencyjne z data/ bez zmian)
+SCALES = {
+    'ref': None,
+    'small': 1_000,
+    'medium': 10_000,
+    'large': 100_000
+}
+
+SCENARIOS = {}
+
+# Moduły importowane przez app.py przed pierwszym renderowaniem strony
+STARTUP_MODULES = (
+    'modules.data_loader', 'modules.classifier', 'modules.supplier_matcher', 'modules.pdf_generator',
+    'modules.auto_reorder', 'modules.time_simulator', 'modules.reorder_scheduler', 'modules.metrics',
+    'modules.profiling', 'modules.logging_config'
+)
+
+
+def scenario(name):
+    """Rejestruje scenariusz: funkcja przygotowująca zwraca wywołanie f(i) mierzone w pętli"""
+    def register(setup):
+        SCENARIOS[name] = setup
+        return setup
+    return register
+
+
+class BenchContext:
+    """Dane jednej skali: katalog źródłowy, wczytany DataLoader i próbka zapotrzebowań"""
+
+    def __init__(self, scale, data_dir, work_root):
+        self.scale = scale
+        self.data_dir = data_dir
+        self.work_root = work_root
+        self._requests = None
+
+    def loader(self, data_dir=None):
+        """Świeżo wczytany DataLoader - scenariusze nie dzielą zmienionego stanu"""
+        data_loader = DataLoader(data_dir or self.data_dir)
+        data_loader.load_all_data()
+        return data_loader
+
+    def writable_copy(self, name):
+        """Kopia danych dla scenariusza, który zapisuje pliki"""
+        target = os.path.join(self.work_root, f'{self.scale}-{name}')
+        shutil.rmtree(target, ignore_errors=True)
+        shutil.copytree(self.data_dir, target)
+        return target
+
+    def request_texts(self, count=200):
+        if self._requests is None:
+            requests_df = pd.read_csv(os.path.join(self.data_dir, 'user_requests.csv'), usecols=['User_Text'])
+            texts = requests_df['User_Text'].dropna()
+            self._requests = texts.sample(min(count, len(texts)), random_state=0).tolist()
+        return self._requests
+
+
+@scenario('classifier.classify_request')
+def _classify(ctx):
+    classifier = SimpleClassifier(ctx.loader().products)
+    texts = ctx.request_texts()
+    return lambda i: classifier.classify_request(texts[i % len(texts)])
+
+
+def _matcher(ctx):
+    data_loader = ctx.loader()
+    products = data_loader.purchase_orders['Product_Name'].dropna().sample(200, replace=True, random_state=0)
+    categories = data_loader.purchase_orders.loc[products.index, 'Category1']
+    return SupplierMatcher(data_loader.suppliers, data_loader.purchase_orders), products.tolist(), categories.tolist()
+
+
+@scenario('supplier_matcher.find_supplier_in_contracts')
+def _find_supplier(ctx):
+    matcher, products, categories = _matcher(ctx)
+    # Co drugie zapytanie bez dokładnego trafienia - ścieżka z podobieństwem tekstu
+    queries = [name if i % 2 == 0 else name[:-1] + 'x' for i, name in enumerate(products)]
+    return lambda i: matcher.find_supplier_in_contracts(queries[i % len(queries)], categories[i % len(categories)])
+
+
+@scenario('supplier_matcher.find_similar_products')
+def _find_similar(ctx):
+    matcher, products, categories = _matcher(ctx)
+    return lambda i: matcher.find_similar_products(products[i % len(products)], categories[i % len(categories)])
+
+
+@scenario('data_loader.load_all_data')
+def _load_all(ctx):
+    return lambda i: DataLoader(ctx.data_dir).load_all_data()
+
+
+@scenario('data_loader.save_order')
+def _save_order(ctx):
+    data_loader = ctx.loader(ctx.writable_copy('save_order'))
+    template = pd.read_csv(os.path.join(data_loader.data_dir, 'orders.csv'), nrows=1).iloc[0].to_dict()
+    return lambda i: data_loader.save_order({**template, 'order_id': f'BENCH-{i:08d}'})
+
+
+@scenario('data_loader.update_delivery_status')
+def _update_status(ctx):
+    data_loader = ctx.loader(ctx.writable_copy('update_status'))
+    order_ids = pd.read_csv(os.path.join(data_loader.data_dir, 'orders.csv'), usecols=['order_id'])['order_id']
+    order_ids = order_ids.sample(min(200, len(order_ids)), random_state=0).tolist()
+    return lambda i: data_loader.update_delivery_status(order_ids[i % len(order_ids)], 'in_transit')
+
+
+@scenario('auto_reorder.check_production_needs')
+def _check_needs(ctx):
+    data_loader = ctx.loader()
+    matcher = SupplierMatcher(data_loader.suppliers, data_loader.purchase_orders)
+    pdf_dir = os.path.join(ctx.work_root, f'{ctx.scale}-pdf-reorder')
+    auto_reorder = AutoReorderSystem(data_loader, matcher, PDFGenerator(pdf_dir))
+    return lambda i: auto_reorder.check_production_needs()
+
+
+@scenario('time_simulator.simulate_daily_operations')
+def _simulate_day(ctx):
+    data_dir = ctx.writable_copy('simulate')
+    data_loader = ctx.loader(data_dir)
+    simulator = TimeSimulator(data_dir, seed=0)
+
+    def run(i):
+        simulator.advance_time(1)
+        simulator.simulate_daily_operations(data_loader)
+    return run
+
+
+@scenario('pdf_generator.generate_order_pdf')
+def _generate_pdf(ctx):
+    generator = PDFGenerator(os.path.join(ctx.work_root, f'{ctx.scale}-pdf'))
+    orders = pd.read_csv(os.path.join(ctx.data_dir, 'orders.csv'), nrows=50).to_dict('records')
+    return lambda i: generator.generate_order_pdf(orders[i % len(orders)])
+
+
+@scenario('pdf_generator.render_order_pdf')
+def _render_pdf(ctx):
+    generator = PDFGenerator(os.path.join(ctx.work_root, f'{ctx.scale}-pdf-render'), cache_size=0)
+    orders = pd.read_csv(os.path.join(ctx.data_dir, 'orders.csv'), nrows=50).to_dict('records')
+    # Sam rendering w pamięci, bez zapisu pliku i manifestu; bez cache - każdy dokument rysowany od nowa
+    return lambda i: generator.render_order_pdf(orders[i % len(orders)])
+
+
+def prepare_scale(scale, cache_dir, seed):
+    """Katalog danych dla skali (generowany raz i trzymany w cache)"""
+    products = SCALES[scale]
+    if products is None:
+        return 'data'
+    target = os.path.join(cache_dir, f'{scale}-{products}-{seed}')
+    if not os.path.exists(os.path.join(target, 'orders.csv')):
+        print(f"📦 Generowanie danych '{scale}' ({products:,} produktów)...", file=sys.stderr)
+        DatasetGenerator('data', seed=seed).generate(target, products)
+    return target
+
+
+def measure(call, budget_seconds, min_repeat, max_repeat):
+    """Czasy pojedynczych wywołań (ms): rozgrzewka, potem pętla do wyczerpania budżetu"""
+    call(-1)
+    timings = []
+    deadline = time.perf_counter() + budget_seconds
+    while len(timings) < max_repeat and (len(timings) < min_repeat or time.perf_counter() < deadline):
+        started = time.perf_counter()
+        call(len(timings))
+        timings.append((time.perf_counter() - started) * 1000)
+    timings = np.asarray(timings)
+    return {
+        'repeat': len(timings),
+        'median_ms': round(float(np.median(timings)), 4),
+        'p95_ms': round(float(np.percentile(timings, 95)), 4),
+        'min_ms': round(float(timings.min()), 4),
+        'mean_ms': round(float(timings.mean()), 4)
+    }
+
+
+def import_profile(modules=STARTUP_MODULES, top=10):
+    """Czas importu modułów w świeżym interpreterze: łącznie, na moduł i najcięższe pakiety (ms)"""
+    code = 'import time; s = time.perf_counter()\n'
+    code += ''.join(f'import {name}\n' for name in modules)
+    code += 'print((time.perf_counter() - s) * 1000)'
+    stdout, cumulative = _importtime(code)
+    # Moduły ładowane przy starcie samego interpretera (site, encodings...) pomijamy
+    interpreter = _importtime('pass')[1]
+
+    packages = {name: ms for name, ms in cumulative.items()
+                if '.' not in name and not name.startswith('_') and name not in interpreter}
+    return {
+        'total_ms': round(float(stdout.strip().splitlines()[-1]), 1),
+        'modules': {name: round(cumulative.get(name, 0.0), 1) for name in modules},
+        'heaviest_packages': {name: round(ms, 1) for name, ms in
+                              sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]}
+    }
+
+
+def _importtime(code):
+    """Uruchamia kod z -X importtime; zwraca stdout i skumulowany czas importu każdego modułu (ms)"""
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True,
+                             text=True, timeout=120, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1] if process.stderr.strip() else 'import nieudany')
+
+    cumulative = {}
+    for line in process.stderr.splitlines():
+        # "import time: self [us] | cumulative | nazwa" - wcięcie nazwy to poziom zagnieżdżenia
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, total_us, name = line.split('|')
+        name = name.strip()
+        cumulative[name] = max(cumulative.get(name, 0), int(total_us) / 1000)
+    return process.stdout, cumulative
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__
+    }
+
+
+def compare(results, baseline, threshold):
+    """Porównanie median z wynikiem bazowym; zwraca listę regresji"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get('results', {}).get(key)
+        if previous is None or 'error' in current or 'error' in previous:
+            continue
+        ratio = current['median_ms'] / previous['median_ms'] if previous['median_ms'] > 0 else 1.0
+        current['baseline_median_ms'] = previous['median_ms']
+        current['ratio'] = round(ratio, 3)
+        if ratio > threshold:
+            regressions.append((key, previous['median_ms'], current['median_ms'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default='ref,small,medium', help=f"lista skal: {', '.join(SCALES)}")
+    parser.add_argument('--scenarios', default=None, help='filtr nazw scenariuszy (podciąg, po przecinku)')
+    parser.add_argument('--budget', type=float, default=1.0, help='czas pomiaru na scenariusz (s)')
+    parser.add_argument('--min-repeat', type=int, default=3)
+    parser.add_argument('--max-repeat', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'zamowienia-bench-data'))
+    parser.add_argument('--output', default=None, help='plik JSON z wynikami')
+    parser.add_argument('--baseline', default=None, help='plik JSON z wynikiem bazowym do porównania')
+    parser.add_argument('--threshold', type=float, default=1.3, help='dopuszczalny stosunek median do bazowych')
+    parser.add_argument('--save-baseline', default=None, help='zapisz wynik jako nowy wynik bazowy')
+    parser.add_argument('--import-budget-ms', type=float, default=None, help='budżet czasu importu modułów aplikacji (ms)')
+    args = parser.parse_args()
+    # Komunikaty INFO modułów (np. na każde zapisane zamówienie) nie wchodzą do pomiaru
+    configure_logging('WARNING')
+
+    scales = [s.strip() for s in args.scales.split(',') if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"Nieznane skale: {', '.join(unknown)}")
+    filters = [f.strip() for f in args.scenarios.split(',')] if args.scenarios else None
+    names = [name for name in SCENARIOS if not filters or any(f in name for f in filters)]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_root:
+        for scale in scales:
+            ctx = BenchContext(scale, prepare_scale(scale, args.cache_dir, args.seed), work_root)
+            for name in names:
+                key = f'{name}@{scale}'
+                try:
+                    call = SCENARIOS[name](ctx)
+                    results[key] = measure(call, args.budget, args.min_repeat, args.max_repeat)
+                    row = results[key]
+                    print(f"{key:60s} {row['median_ms']:12.3f} ms  p95 {row['p95_ms']:12.3f} ms  (n={row['repeat']})")
+                except Exception as e:
+                    results[key] = {'error': str(e)}
+                    print(f"{key:60s} ❌ {e}")
+
+    report = {'environment': environment(), 'scales': {s: SCALES[s] for s in scales}, 'results': results}
+
+    over_budget = False
+    try:
+        imports = report['imports'] = import_profile()
+        print(f"⏱️ Import modułów aplikacji: {imports['total_ms']:.1f} ms")
+        for name, ms in imports['heaviest_packages'].items():
+            print(f"   {name:40s} {ms:10.1f} ms")
+        if args.import_budget_ms is not None:
+            report['import_budget_ms'] = args.import_budget_ms
+            over_budget = imports['total_ms'] > args.import_budget_ms
+            if over_budget:
+                print(f"⚠️ Przekroczony budżet importu: {imports['total_ms']:.1f} ms > {args.import_budget_ms:.1f} ms")
+    except Exception as e:
+        report['imports'] = {'error': str(e)}
+        print(f"⏱️ Import modułów aplikacji: ❌ {e}")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        report['baseline'] = args.baseline
+        report['threshold'] = args.threshold
+        report['regressions'] = [key for key, *_ in regressions]
+        for key, before, after, ratio in regressions:
+            print(f"⚠️ Regresja {key}: {before:.3f} ms -> {after:.3f} ms (x{ratio:.2f})")
+        if not regressions:
+            print(f"✅ Brak regresji względem {args.baseline} (próg x{args.threshold})")
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Zapisano wyniki: {path}")
+
+    sys.exit(1 if regressions or over_budget else 0)
+
+
+if __name__ == '__main__':
+    main()
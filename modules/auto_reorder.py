@@ -1,42 +1,66 @@
+import logging
 import pandas as pd
 from datetime import datetime, timedelta
 import os
+import math
+import uuid
+from modules.demand_forecast import DemandForecaster
+from modules.metrics import timed
+from modules.profiling import profiled
+
+logger = logging.getLogger(__name__)
 
 class AutoReorderSystem:
-    def __init__(self, data_loader, supplier_matcher, pdf_generator):
+    def __init__(self, data_loader, supplier_matcher, pdf_generator, time_simulator=None):
         self.data_loader = data_loader
         self.supplier_matcher = supplier_matcher
         self.pdf_generator = pdf_generator
+        # Prognoza liczona dla daty symulacji (sezonowość kwartału), bez symulatora - dla dzisiaj
+        self.time_simulator = time_simulator
+        self.forecaster = DemandForecaster(data_loader)
     
+    @profiled('auto_reorder.check_production_needs')
+    @timed('auto_reorder.check_production_needs')
     def check_production_needs(self):
         """Sprawdza które produkty potrzebują automatycznego zamówienia"""
         production_orders = []
         
         if self.data_loader.inventory is None:
-            print("❌ Brak danych inventory")
+            logger.error("❌ Brak danych inventory")
             return production_orders
         
-        # Debug: sprawdź dostępne kolumny w inventory
-        print("🔍 Kolumny w inventory:", self.data_loader.inventory.columns.tolist())
-        print("🔍 Przykładowe dane inventory:")
-        print(self.data_loader.inventory[['Product_ID', 'Product_Name', 'Stock', 'Min_stock_level']].head())
+        # Debug: kolumny i przykładowe dane - liczone tylko przy poziomie DEBUG
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 Kolumny w inventory: %s", self.data_loader.inventory.columns.tolist())
+            logger.debug("🔍 Przykładowe dane inventory:\n%s",
+                         self.data_loader.inventory[['Product_ID', 'Product_Name', 'Stock', 'Min_stock_level']].head())
         
         # Znajdź produkty z niskim stanem - POPRAWIONE FILTROWANIE
         try:
             # Sprawdź czy kolumny istnieją
             if 'Stock' not in self.data_loader.inventory.columns or 'Min_stock_level' not in self.data_loader.inventory.columns:
-                print("❌ Brak wymaganych kolumn w inventory")
+                logger.error("❌ Brak wymaganych kolumn w inventory")
                 return production_orders
             
-            # Filtruj produkty z niskim stanem
-            low_stock_products = self.data_loader.inventory[
-                self.data_loader.inventory['Stock'] <= self.data_loader.inventory['Min_stock_level']
-            ]
+            # Prognoza zapotrzebowania dla całego katalogu (jedno przeliczenie, potem cache)
+            reference_date = self.time_simulator.current_date if self.time_simulator is not None else None
+            forecast = self.forecaster.get_forecast(reference_date)
+            inventory = self.data_loader.inventory.merge(
+                forecast[['reorder_point', 'target_stock']],
+                left_on='Product_ID', right_index=True, how='left'
+            )
+            inventory[['reorder_point', 'target_stock']] = inventory[['reorder_point', 'target_stock']].fillna(0)
             
-            print(f"🔍 Znaleziono {len(low_stock_products)} produktów z niskim stanem")
+            # Filtruj produkty z niskim stanem (minimalny stan lub prognozowany punkt zamówienia)
+            reorder_level = inventory['reorder_point'].where(
+                inventory['reorder_point'] > inventory['Min_stock_level'], inventory['Min_stock_level']
+            )
+            low_stock_products = inventory[inventory['Stock'] <= reorder_level]
+            
+            logger.debug("🔍 Znaleziono %s produktów z niskim stanem", len(low_stock_products))
             
         except Exception as e:
-            print(f"❌ Błąd podczas filtrowania niskich stanów: {e}")
+            logger.error("❌ Błąd podczas filtrowania niskich stanów: %s", e)
             return production_orders
         
         # Pobierz listę już złożonych zamówień (aby uniknąć duplikatów)
@@ -49,12 +73,12 @@ class AutoReorderSystem:
                 product_name = product.get('Product_Name')
                 
                 if not product_name:
-                    print(f"⚠️ Pominięto produkt bez nazwy: {product_id}")
+                    logger.warning("⚠️ Pominięto produkt bez nazwy: %s", product_id)
                     continue
                 
                 # Sprawdź czy już nie ma aktywnego zamówienia dla tego produktu
                 if self._has_active_order(existing_orders, product_id):
-                    print(f"⚠️ Pominięto produkt {product_name} - już ma aktywne zamówienie")
+                    logger.debug("⚠️ Pominięto produkt %s - już ma aktywne zamówienie", product_name)
                     continue
                 
                 # Pobierz szczegóły produktu z bazy produktów
@@ -68,7 +92,9 @@ class AutoReorderSystem:
                 
                 # Oblicz sugerowaną ilość do zamówienia
                 suggested_quantity = self._calculate_suggested_quantity(
-                    current_stock, min_stock, lead_time
+                    current_stock, min_stock, lead_time,
+                    reorder_point=product.get('reorder_point'),
+                    target_stock=product.get('target_stock')
                 )
                 
                 # Oblicz przewidywaną datę dostawy - POPRAWIONE: konwersja na int
@@ -88,6 +114,7 @@ class AutoReorderSystem:
                     'min_stock': min_stock,
                     'unit': unit,
                     'suggested_quantity': suggested_quantity,
+                    'reorder_point': product.get('reorder_point'),
                     'lead_time_days': lead_time,
                     'estimated_delivery': estimated_delivery
                 }
@@ -108,13 +135,13 @@ class AutoReorderSystem:
                     })
                 
                 production_orders.append(order_info)
-                print(f"✅ Dodano produkt do zamówienia: {product_name} (stan: {current_stock}/{min_stock})")
+                logger.debug("✅ Dodano produkt do zamówienia: %s (stan: %s/%s)", product_name, current_stock, min_stock)
                 
             except Exception as e:
-                print(f"❌ Błąd przetwarzania produktu {product.get('Product_ID', 'Unknown')}: {e}")
+                logger.error("❌ Błąd przetwarzania produktu %s: %s", product.get('Product_ID', 'Unknown'), e)
                 continue
         
-        print(f"🎯 Łącznie znaleziono {len(production_orders)} produktów do zamówienia")
+        logger.info("🎯 Łącznie znaleziono %s produktów do zamówienia", len(production_orders))
         return production_orders
     
     def _get_product_details(self, product_id):
@@ -143,7 +170,7 @@ class AutoReorderSystem:
                     'lead_time': lead_time
                 }
         except Exception as e:
-            print(f"❌ Błąd pobierania szczegółów produktu {product_id}: {e}")
+            logger.error("❌ Błąd pobierania szczegółów produktu %s: %s", product_id, e)
         
         return {'category': 'Unknown', 'unit': 'szt.', 'lead_time': 7}
     
@@ -161,7 +188,7 @@ class AutoReorderSystem:
                     ]
                     return production_orders
         except Exception as e:
-            print(f"❌ Błąd ładowania istniejących zamówień: {e}")
+            logger.error("❌ Błąd ładowania istniejących zamówień: %s", e)
         
         return pd.DataFrame()
     
@@ -179,10 +206,17 @@ class AutoReorderSystem:
         
         return False
     
-    def _calculate_suggested_quantity(self, current_stock, min_stock, lead_time_days):
+    def _calculate_suggested_quantity(self, current_stock, min_stock, lead_time_days,
+                                      reorder_point=None, target_stock=None):
         """Oblicza sugerowaną ilość do zamówienia"""
         try:
-            # Prosta heurystyka: zamów 2x minimalny stan minus aktualny stan
+            # Jeśli jest prognoza z historii - uzupełnij do stanu docelowego
+            if target_stock is not None and not pd.isna(target_stock) and target_stock > 0:
+                target = max(min_stock, reorder_point or 0) + (target_stock - (reorder_point or 0))
+                suggested = math.ceil(target - current_stock)
+                return max(int(suggested), min_stock, 1)
+            
+            # Brak historii - prosta heurystyka: zamów 2x minimalny stan minus aktualny stan
             # + zapas na czas dostawy
             safety_stock = max(min_stock * 0.5, 10)  # Zapas bezpieczeństwa
             suggested = (min_stock * 2) - current_stock + safety_stock
@@ -192,10 +226,11 @@ class AutoReorderSystem:
         except:
             return min_stock * 2
     
+    @timed('auto_reorder.create_production_order')
     def create_production_order(self, product_info, quantity):
         """Tworzy zamówienie produkcyjne"""
         order_data = {
-            'order_id': f"PROD-{datetime.now().strftime('%Y%m%d%H%M%S')}",
+            'order_id': f"PROD-{uuid.uuid4().hex[:8].upper()}",
             'user_input': f"Automatyczne zamówienie produkcyjne - {product_info['product_name']}",
             'product_name': product_info['product_name'],
             'product_id': product_info['product_id'],
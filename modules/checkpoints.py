@@ -0,0 +1,197 @@
+import logging
+import os
+import zlib
+import pickle
+import hashlib
+import time
+import pandas as pd
+import numpy as np
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class SimulationCheckpoints:
+    """Nazwane punkty kontrolne symulacji (inventory, zamówienia, zapotrzebowania, data)
+
+    Kolumny są przechowywane binarnie (tablice NumPy, tekst jako kody + słownik)
+    i adresowane skrótem zawartości - niezmienione kolumny są współdzielone
+    między punktami kontrolnymi zamiast kopiowane.
+    """
+
+    TABLES = {
+        'orders': 'orders.csv',
+        'user_requests': 'user_requests.csv'
+    }
+
+    def __init__(self, data_loader, time_simulator):
+        self.data_loader = data_loader
+        self.time_simulator = time_simulator
+        self._blobs = {}          # skrót -> zakodowana kolumna (tylko do odczytu)
+        self._checkpoints = {}    # nazwa -> opis punktu kontrolnego
+        self._on_disk = {}        # plik -> (skróty kolumn, odcisk pliku) ostatnio zapisanych/odczytanych
+
+    def create(self, name):
+        """Zapisuje bieżący stan symulacji pod podaną nazwą"""
+        started = time.perf_counter()
+        data_dir = self.data_loader.data_dir
+
+        # Spójny stan: inventory, pliki i data z tej samej chwili (bez zapisu w trakcie)
+        with self.data_loader.write_lock:
+            tables = {}
+            if self.data_loader.inventory is not None:
+                tables['inventory'] = self._encode_table(self.data_loader.inventory)
+
+            for table, filename in self.TABLES.items():
+                path = f'{data_dir}/{filename}'
+                if os.path.exists(path):
+                    tables[table] = self._encode_table(pd.read_csv(path))
+                    self._on_disk[filename] = (tables[table]['columns'], self._fingerprint(path))
+
+            self._checkpoints[name] = {
+                'current_date': self.time_simulator.current_date,
+                'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'tables': tables
+            }
+            self._collect_garbage()
+
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.info("💾 Utworzono punkt kontrolny '%s' (%s, %.1f ms)", name, self.time_simulator.current_date, elapsed)
+        return self.info(name)
+
+    def restore(self, name, persist=True):
+        """Przywraca stan z punktu kontrolnego; pliki CSV zapisywane są tylko, gdy się różnią"""
+        if name not in self._checkpoints:
+            logger.error("❌ Brak punktu kontrolnego '%s'", name)
+            return False
+
+        started = time.perf_counter()
+        checkpoint = self._checkpoints[name]
+        data_dir = self.data_loader.data_dir
+        tables = checkpoint['tables']
+
+        # Scheduler, symulator i API zapisują te same dane - podmiana stanu na wyłączność
+        with self.data_loader.write_lock:
+            if 'inventory' in tables:
+                self.data_loader.inventory = self._decode_table(tables['inventory'])
+                if persist:
+                    self.data_loader.inventory.to_csv(f'{data_dir}/inventory.csv', index=False)
+
+            for table, filename in self.TABLES.items():
+                if table not in tables or not persist:
+                    continue
+                path = f'{data_dir}/{filename}'
+                # Plik nie zmienił się od zapisu/odczytu tej samej zawartości - pomijamy zapis
+                if self._on_disk.get(filename) == (tables[table]['columns'], self._fingerprint(path)):
+                    continue
+                self._decode_table(tables[table]).to_csv(path, index=False)
+                self._on_disk[filename] = (tables[table]['columns'], self._fingerprint(path))
+
+            self.time_simulator.current_date = checkpoint['current_date']
+            if persist:
+                self.time_simulator.save_simulation_state()
+
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.info("⏪ Przywrócono punkt kontrolny '%s' (%s, %.1f ms)", name, checkpoint['current_date'], elapsed)
+        return True
+
+    def delete(self, name):
+        """Usuwa punkt kontrolny (i kolumny, do których nic już nie odwołuje się)"""
+        if self._checkpoints.pop(name, None) is None:
+            return False
+        self._collect_garbage()
+        return True
+
+    def list(self):
+        """Lista punktów kontrolnych"""
+        return [self.info(name) for name in self._checkpoints]
+
+    def info(self, name):
+        """Opis punktu kontrolnego wraz z rozmiarem danych własnych i współdzielonych"""
+        checkpoint = self._checkpoints[name]
+        keys = {key for table in checkpoint['tables'].values() for _, key in table['columns']}
+        shared = {key for other, data in self._checkpoints.items() if other != name
+                  for table in data['tables'].values() for _, key in table['columns']}
+        return {
+            'name': name,
+            'current_date': checkpoint['current_date'],
+            'created': checkpoint['created'],
+            'rows': {table: data['length'] for table, data in checkpoint['tables'].items()},
+            'bytes_total': sum(self._blob_size(self._blobs[key]) for key in keys),
+            'bytes_unique': sum(self._blob_size(self._blobs[key]) for key in keys - shared)
+        }
+
+    def save(self, path):
+        """Zapisuje wszystkie punkty kontrolne do jednego pliku binarnego"""
+        payload = pickle.dumps({'blobs': self._blobs, 'checkpoints': self._checkpoints}, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(path, 'wb') as f:
+            f.write(zlib.compress(payload, 1))
+
+    def load(self, path):
+        """Wczytuje punkty kontrolne zapisane metodą save"""
+        if not os.path.exists(path):
+            return False
+        with open(path, 'rb') as f:
+            stored = pickle.loads(zlib.decompress(f.read()))
+        self._blobs.update(stored['blobs'])
+        self._checkpoints.update(stored['checkpoints'])
+        return True
+
+    def _fingerprint(self, path):
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _encode_table(self, df):
+        """Tabela -> lista (kolumna, skrót) + liczba wierszy"""
+        return {
+            'columns': [(column, self._store_column(df[column])) for column in df.columns],
+            'length': len(df)
+        }
+
+    def _decode_table(self, table):
+        return pd.DataFrame({column: self._decode_column(self._blobs[key]) for column, key in table['columns']})
+
+    def _store_column(self, series):
+        """Koduje kolumnę i zapisuje ją raz na zawartość (współdzielenie strukturalne)"""
+        values = series.to_numpy()
+        if values.dtype == object:
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            codes = codes.astype(np.int32 if len(uniques) < 2 ** 31 else np.int64)
+            uniques = np.asarray(uniques, dtype=object)
+            digest = hashlib.blake2b(codes.tobytes(), digest_size=16)
+            digest.update(pickle.dumps(uniques.tolist(), protocol=pickle.HIGHEST_PROTOCOL))
+            blob = ('factorized', codes, uniques)
+        else:
+            values = np.array(values, copy=True)
+            digest = hashlib.blake2b(values.tobytes(), digest_size=16)
+            digest.update(str(values.dtype).encode())
+            blob = ('array', values)
+
+        key = digest.hexdigest()
+        if key not in self._blobs:
+            for part in blob[1:]:
+                part.setflags(write=False)
+            self._blobs[key] = blob
+        return key
+
+    def _decode_column(self, blob):
+        if blob[0] == 'factorized':
+            _, codes, uniques = blob
+            if len(uniques) == 0:
+                return np.full(len(codes), np.nan, dtype=object)
+            values = uniques.take(np.maximum(codes, 0))
+            values[codes < 0] = np.nan
+            return values
+        return blob[1].copy()
+
+    def _blob_size(self, blob):
+        return sum(part.nbytes for part in blob[1:])
+
+    def _collect_garbage(self):
+        """Usuwa kolumny nieużywane przez żaden punkt kontrolny"""
+        used = {key for data in self._checkpoints.values()
+                for table in data['tables'].values() for _, key in table['columns']}
+        for key in set(self._blobs) - used:
+            del self._blobs[key]
@@ -1,10 +1,12 @@
 import re
 from difflib import SequenceMatcher
+from modules.metrics import timed
 
 class SimpleClassifier:
     def __init__(self, products_df):
         self.products_df = products_df
 
+    @timed('classifier.classify_request')
     def classify_request(self, user_text):
         user_text_lower = user_text.lower()
         
@@ -1,26 +1,122 @@
+import logging
+import functools
+import threading
 import pandas as pd
 import os
 from datetime import datetime, timedelta
-import glob
+from modules.pdf_manifest import PDFManifest
+from modules.metrics import timed
+from modules.profiling import profiled
+
+try:
+    import fcntl
+except ImportError:
+    # Windows - jeden proces piszący, wystarcza blokada wątków
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class _WriteLock:
+    """Blokada zapisu katalogu danych: wątki procesu (RLock) i inne procesy (flock na .write.lock)
+
+    Aplikacja Streamlit z harmonogramem zamawiania i procesy robocze API mają
+    osobne loadery, ale piszą do tych samych plików - każdy zapis bierze tę samą
+    blokadę pliku. Przy pierwszym wejściu loader doczytuje dane zmienione przez
+    inny proces, więc odczyt -> zmiana -> zapis zawsze startuje z aktualnego stanu.
+    Zagnieżdżone wejścia tego samego wątku tylko zwiększają licznik.
+    """
+    
+    FILENAME = '.write.lock'
+    
+    def __init__(self, data_loader):
+        self._data_loader = data_loader
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+    
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                self._acquire_file()
+                self._data_loader.reload_if_changed()
+            except BaseException:
+                self._release_file()
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        try:
+            if self._depth == 0:
+                # Własne zapisy nie wymuszają ponownego wczytania
+                self._data_loader._remember_files()
+                self._release_file()
+        finally:
+            self._lock.release()
+        return False
+    
+    def _acquire_file(self):
+        try:
+            self._file = open(os.path.join(self._data_loader.data_dir, self.FILENAME), 'a')
+        except OSError:
+            # Brak katalogu danych - nie ma też czego chronić przed innymi procesami
+            return
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+    
+    def _release_file(self):
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+def _locked(method):
+    """Metoda zapisu wykonywana pod wspólną blokadą zapisu loadera"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class DataLoader:
-    def __init__(self, data_dir='data'):
+    # Pliki wczytywane przez load_all_data - ich zmiana przez inny proces wymaga ponownego wczytania
+    LOADED_FILES = ('products.csv', 'inventory.csv', 'suppliers.csv', 'purchase_order_history.csv', 'user_requests.csv')
+
+    def __init__(self, data_dir='data', pdf_dir='orders'):
         self.data_dir = data_dir
+        self.pdf_dir = pdf_dir
+        self._pdf_manifest = None
+        # Licznik zapisów loadera - część odcisku danych dla widoków cache'owanych w app.py
+        self.data_version = 0
+        # Wspólna blokada zapisu sesji Streamlit, harmonogramu zamawiania i procesów API.
+        # Odczyt -> zmiana -> zapis plików CSV i inventory w pamięci wykonuje się pod nią
+        # w całości; wielowejściowa - wywołujący może trzymać ją przez kilka operacji.
+        self.write_lock = _WriteLock(self)
+        self._seen_files = None
         self.products = None
         self.inventory = None
         self.suppliers = None
         self.purchase_orders = None
         self.user_requests = None
     
+    @profiled('data_loader.load_all_data')
+    @timed('data_loader.load_all_data')
     def load_all_data(self):
         """Ładuje wszystkie pliki CSV"""
         try:
             # Ładuj produkty
             if os.path.exists(f'{self.data_dir}/products.csv'):
                 self.products = pd.read_csv(f'{self.data_dir}/products.csv')
-                print(f"✅ Załadowano produkty: {len(self.products)} rekordów")
+                logger.info("✅ Załadowano produkty: %s rekordów", len(self.products))
             else:
-                print("❌ Brak pliku products.csv")
+                logger.error("❌ Brak pliku products.csv")
                 return False
             
             # Ładuj inventory i agreguj dane
@@ -30,48 +126,46 @@ class DataLoader:
                 # Agreguj dane inventory - suma Stock i Closing_Stock dla każdego produktu
                 if not inventory_raw.empty:
                     self.inventory = self._aggregate_inventory_data(inventory_raw)
-                    print(f"✅ Załadowano i zagregowano inventory: {len(self.inventory)} unikalnych produktów")
+                    logger.info("✅ Załadowano i zagregowano inventory: %s unikalnych produktów", len(self.inventory))
                 else:
                     self.inventory = pd.DataFrame()
-                    print("⚠️ Plik inventory.csv jest pusty")
+                    logger.warning("⚠️ Plik inventory.csv jest pusty")
             else:
-                print("⚠️ Brak pliku inventory.csv")
+                logger.warning("⚠️ Brak pliku inventory.csv")
             
             # Ładuj suppliers
             if os.path.exists(f'{self.data_dir}/suppliers.csv'):
                 self.suppliers = pd.read_csv(f'{self.data_dir}/suppliers.csv')
-                print(f"✅ Załadowano suppliers: {len(self.suppliers)} rekordów")
+                logger.info("✅ Załadowano suppliers: %s rekordów", len(self.suppliers))
             else:
-                print("❌ Brak pliku suppliers.csv")
+                logger.error("❌ Brak pliku suppliers.csv")
                 return False
             
             # Ładuj purchase_order_history
             if os.path.exists(f'{self.data_dir}/purchase_order_history.csv'):
                 self.purchase_orders = pd.read_csv(f'{self.data_dir}/purchase_order_history.csv')
-                print(f"✅ Załadowano purchase orders: {len(self.purchase_orders)} rekordów")
+                logger.info("✅ Załadowano purchase orders: %s rekordów", len(self.purchase_orders))
             else:
-                print("❌ Brak pliku purchase_order_history.csv")
+                logger.error("❌ Brak pliku purchase_order_history.csv")
                 return False
             
             # Ładuj user_requests (opcjonalnie)
             if os.path.exists(f'{self.data_dir}/user_requests.csv'):
                 self.user_requests = pd.read_csv(f'{self.data_dir}/user_requests.csv')
-                print(f"✅ Załadowano user requests: {len(self.user_requests)} rekordów")
+                logger.info("✅ Załadowano user requests: %s rekordów", len(self.user_requests))
             else:
-                print("⚠️ Brak pliku user_requests.csv")
+                logger.warning("⚠️ Brak pliku user_requests.csv")
             
+            self._remember_files()
             return True
             
         except Exception as e:
-            print(f"❌ Błąd ładowania danych: {e}")
+            logger.error("❌ Błąd ładowania danych: %s", e)
             return False
 
     def _aggregate_inventory_data(self, inventory_raw):
         """Agreguje dane inventory - sumuje stany dla każdego produktu"""
         try:
-            # Sprawdź dostępne kolumny
-            print("🔍 Kolumny w inventory_raw:", inventory_raw.columns.tolist())
-            
             # Grupuj po Product_ID i sumuj ilości
             aggregation_rules = {
                 'Stock': 'sum',
@@ -88,25 +182,49 @@ class DataLoader:
             # Wykonaj agregację
             inventory_aggregated = inventory_raw.groupby('Product_ID').agg(aggregation_rules).reset_index()
             
-            print(f"🔍 Przed agregacją: {len(inventory_raw)} wierszy")
-            print(f"🔍 Po agregacji: {len(inventory_aggregated)} unikalnych produktów")
-            
-            # Debug: pokaż przykładowe dane przed i po agregacji
-            if not inventory_raw.empty:
+            # Debug: kolumny i przykład agregacji - dodatkowe filtrowanie tylko przy poziomie DEBUG
+            if logger.isEnabledFor(logging.DEBUG) and not inventory_raw.empty:
+                logger.debug("🔍 Kolumny w inventory_raw: %s", inventory_raw.columns.tolist())
+                logger.debug("🔍 Przed agregacją: %s wierszy, po agregacji: %s unikalnych produktów",
+                             len(inventory_raw), len(inventory_aggregated))
                 sample_product = inventory_raw['Product_ID'].iloc[0]
-                print(f"🔍 Przykład agregacji dla produktu {sample_product}:")
-                before_agg = inventory_raw[inventory_raw['Product_ID'] == sample_product][['Product_ID', 'Stock', 'Closing_Stock']]
-                after_agg = inventory_aggregated[inventory_aggregated['Product_ID'] == sample_product][['Product_ID', 'Stock', 'Closing_Stock']]
-                print(f"   Przed: {len(before_agg)} wierszy, suma Stock: {before_agg['Stock'].sum()}")
-                print(f"   Po: {len(after_agg)} wierszy, Stock: {after_agg['Stock'].iloc[0]}")
+                before_agg = inventory_raw[inventory_raw['Product_ID'] == sample_product]
+                after_agg = inventory_aggregated[inventory_aggregated['Product_ID'] == sample_product]
+                logger.debug("🔍 Przykład agregacji dla produktu %s: przed %s wierszy (suma Stock: %s), po Stock: %s",
+                             sample_product, len(before_agg), before_agg['Stock'].sum(), after_agg['Stock'].iloc[0])
             
             return inventory_aggregated
             
         except Exception as e:
-            print(f"❌ Błąd agregacji danych inventory: {e}")
+            logger.error("❌ Błąd agregacji danych inventory: %s", e)
             # W razie błędu zwróć oryginalne dane
             return inventory_raw
     
+    def fingerprint(self, *filenames):
+        """Odcisk danych: licznik zapisów loadera oraz (mtime, rozmiar) podanych plików
+
+        Zmienia się po każdym zapisie loadera i po zmianie pliku przez inny moduł
+        (symulator czasu, punkty kontrolne). Wymaga tylko os.stat - bez czytania plików.
+        """
+        stats = []
+        for filename in filenames:
+            try:
+                stat = os.stat(f'{self.data_dir}/{filename}')
+                stats.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stats.append(None)
+        return (self.data_version, *stats)
+
+    def reload_if_changed(self):
+        """Ponowne wczytanie danych, jeśli inny proces zmienił pliki od ostatniego odczytu lub zapisu"""
+        if self._seen_files is None or self.fingerprint(*self.LOADED_FILES)[1:] == self._seen_files:
+            return False
+        logger.info("🔄 Dane zmienione przez inny proces - ponowne wczytanie")
+        return self.load_all_data()
+    
+    def _remember_files(self):
+        self._seen_files = self.fingerprint(*self.LOADED_FILES)[1:]
+    
     def get_contracts(self):
         """Zwraca umowy terminowe"""
         if self.purchase_orders is not None and 'Umowa_ramowa' in self.purchase_orders.columns:
@@ -114,6 +232,9 @@ class DataLoader:
             return contracts
         return pd.DataFrame()
     
+    @profiled('data_loader.save_order')
+    @timed('data_loader.save_order')
+    @_locked
     def save_order(self, order_data):
         """Zapisuje nowe zamówienie do pliku CSV"""
         orders_file = f'{self.data_dir}/orders.csv'
@@ -144,29 +265,84 @@ class DataLoader:
             # Tworzy plik jeśli nie istnieje z nagłówkami
             if not os.path.exists(orders_file):
                 pd.DataFrame([complete_order]).to_csv(orders_file, index=False)
-                print(f"✅ Utworzono nowy plik zamówień: {orders_file}")
+                self.data_version += 1
+                logger.info("✅ Utworzono nowy plik zamówień: %s", orders_file)
             else:
                 # Wczytaj istniejące zamówienia
                 existing_orders = pd.read_csv(orders_file)
                 
                 # Sprawdź czy order_id już istnieje (zapobieganie duplikatom)
                 if complete_order['order_id'] in existing_orders['order_id'].values:
-                    print(f"⚠️ Zamówienie {complete_order['order_id']} już istnieje!")
+                    logger.warning("⚠️ Zamówienie %s już istnieje!", complete_order['order_id'])
                     return False
                     
                 # Dodaj nowe zamówienie
                 updated_orders = pd.concat([existing_orders, pd.DataFrame([complete_order])], ignore_index=True)
                 updated_orders.to_csv(orders_file, index=False)
-                print(f"✅ Zapisano zamówienie {complete_order['order_id']} do {orders_file}")
+                self.data_version += 1
+                logger.info("✅ Zapisano zamówienie %s do %s", complete_order['order_id'], orders_file,
+                            extra={'order_id': complete_order['order_id']})
             
             return True
             
         except Exception as e:
-            print(f"❌ Błąd zapisu zamówienia: {e}")
-            import traceback
-            print(f"Szczegóły błędu: {traceback.format_exc()}")
+            logger.exception("❌ Błąd zapisu zamówienia: %s", e)
             return False
 
+    @profiled('data_loader.save_orders')
+    @timed('data_loader.save_orders')
+    @_locked
+    def save_orders(self, orders):
+        """Dopisuje wiele zamówień na koniec pliku (bez przepisywania całej historii)
+
+        Zwraca liczbę zapisanych zamówień; zamówienia o istniejącym order_id są pomijane.
+        """
+        orders_file = f'{self.data_dir}/orders.csv'
+        if not orders:
+            return 0
+        
+        try:
+            default_order = {
+                'category': 'Inne',
+                'quantity': 1,
+                'supplier_name': 'Nieznany dostawca',
+                'price': 0.0,
+                'contract_type': 'oferta',
+                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'delivery_status': 'ordered',
+                'estimated_delivery': (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
+            }
+            new_df = pd.DataFrame([{**default_order, **order} for order in orders])
+            new_df = new_df.drop_duplicates(subset='order_id')
+            
+            if os.path.exists(orders_file) and os.path.getsize(orders_file) > 0:
+                # Tylko nagłówek i kolumna order_id - do kontroli duplikatów
+                existing_ids = pd.read_csv(orders_file, usecols=['order_id'])['order_id']
+                duplicates = new_df['order_id'].isin(existing_ids)
+                if duplicates.any():
+                    logger.warning("⚠️ Pominięto %s zamówień, które już istnieją", int(duplicates.sum()))
+                    new_df = new_df[~duplicates]
+                
+                columns = pd.read_csv(orders_file, nrows=0).columns
+                if set(new_df.columns) - set(columns):
+                    # Nowe kolumny - plik trzeba przepisać z pełnym nagłówkiem
+                    pd.concat([pd.read_csv(orders_file), new_df], ignore_index=True).to_csv(orders_file, index=False)
+                else:
+                    new_df.reindex(columns=columns).to_csv(orders_file, mode='a', header=False, index=False)
+            else:
+                new_df.to_csv(orders_file, index=False)
+            self.data_version += 1
+            
+            logger.info("✅ Zapisano %s zamówień do %s", len(new_df), orders_file)
+            return len(new_df)
+            
+        except Exception as e:
+            logger.error("❌ Błąd zapisu zamówień: %s", e)
+            return 0
+
+    @profiled('data_loader.update_delivery_status')
+    @timed('data_loader.update_delivery_status')
+    @_locked
     def update_delivery_status(self, order_id, status, delivered_quantity=None):
         """Aktualizuje status dostawy zamówienia"""
         try:
@@ -179,7 +355,7 @@ class DataLoader:
             # Znajdź zamówienie
             order_mask = orders_df['order_id'] == order_id
             if not order_mask.any():
-                print(f"❌ Nie znaleziono zamówienia {order_id}")
+                logger.error("❌ Nie znaleziono zamówienia %s", order_id)
                 return False
             
             # Aktualizuj status
@@ -194,15 +370,17 @@ class DataLoader:
             
             # Zapisz zmiany
             orders_df.to_csv(orders_file, index=False)
-            print(f"✅ Zaktualizowano status zamówienia {order_id} na: {status}")
+            self.data_version += 1
+            logger.info("✅ Zaktualizowano status zamówienia %s na: %s", order_id, status,
+                        extra={'order_id': order_id, 'status': status})
             
             return True
             
         except Exception as e:
-            print(f"❌ Błąd aktualizacji statusu dostawy: {e}")
+            logger.error("❌ Błąd aktualizacji statusu dostawy: %s", e)
             return False
 
-    def _update_inventory_on_delivery(self, product_name, quantity):
+    def _update_inventory_on_delivery(self, product_name, quantity, persist=True):
         """Aktualizuje stan magazynowy po dostawie"""
         try:
             if self.inventory is None:
@@ -211,21 +389,51 @@ class DataLoader:
             # Znajdź produkt w inventory
             product_mask = self.inventory['Product_Name'] == product_name
             if not product_mask.any():
-                print(f"❌ Nie znaleziono produktu '{product_name}' w inventory")
+                logger.error("❌ Nie znaleziono produktu '%s' w inventory", product_name)
                 return False
             
             # Aktualizuj stan magazynowy
             self.inventory.loc[product_mask, 'Stock'] += quantity
             self.inventory.loc[product_mask, 'Closing_Stock'] += quantity
             
-            # Zapisz zmiany do pliku
-            self.inventory.to_csv(f'{self.data_dir}/inventory.csv', index=False)
-            print(f"✅ Zaktualizowano stan magazynowy po dostawie: {product_name} +{quantity}")
+            # Zapisz zmiany do pliku (symulator zapisuje raz po całym przebiegu)
+            if persist:
+                self.inventory.to_csv(f'{self.data_dir}/inventory.csv', index=False)
+                self.data_version += 1
+            logger.info("✅ Zaktualizowano stan magazynowy po dostawie: %s +%s", product_name, quantity)
             
             return True
             
         except Exception as e:
-            print(f"❌ Błąd aktualizacji inventory po dostawie: {e}")
+            logger.error("❌ Błąd aktualizacji inventory po dostawie: %s", e)
+            return False
+
+    def _update_inventory_on_deliveries(self, quantities_by_name, persist=True):
+        """Aktualizuje stan magazynowy dla wielu dostaw naraz (nazwa produktu -> ilość)"""
+        try:
+            if self.inventory is None or len(quantities_by_name) == 0:
+                return False
+            
+            added = self.inventory['Product_Name'].map(quantities_by_name)
+            matched = added.notna()
+            
+            # Aktualizuj stan magazynowy jednym przypisaniem
+            self.inventory.loc[matched, 'Stock'] += added[matched]
+            self.inventory.loc[matched, 'Closing_Stock'] += added[matched]
+            
+            missing = set(quantities_by_name.index) - set(self.inventory.loc[matched, 'Product_Name'])
+            if missing:
+                logger.error("❌ Nie znaleziono %s produktów w inventory: %s", len(missing), ', '.join(map(str, list(missing)[:5])))
+            
+            if persist:
+                self.inventory.to_csv(f'{self.data_dir}/inventory.csv', index=False)
+                self.data_version += 1
+            logger.info("✅ Zaktualizowano stan magazynowy po %s dostawach", len(quantities_by_name))
+            
+            return True
+            
+        except Exception as e:
+            logger.error("❌ Błąd aktualizacji inventory po dostawach: %s", e)
             return False
 
     def get_orders_in_delivery(self):
@@ -246,7 +454,7 @@ class DataLoader:
             return delivery_orders
             
         except Exception as e:
-            print(f"❌ Błąd ładowania zamówień w dostawie: {e}")
+            logger.error("❌ Błąd ładowania zamówień w dostawie: %s", e)
             return pd.DataFrame()
 
     def get_inventory_status(self):
@@ -260,6 +468,9 @@ class DataLoader:
 
         return pd.DataFrame()
 
+    @profiled('data_loader.delete_order')
+    @timed('data_loader.delete_order')
+    @_locked
     def delete_order(self, order_id):
         """Usuwa zamówienie z systemu"""
         try:
@@ -282,25 +493,35 @@ class DataLoader:
             
             # Zapisz zmiany
             orders_df.to_csv(orders_file, index=False)
+            self.data_version += 1
             
-            # Spróbuj usunąć plik PDF
-            pdf_pattern = f"orders/Zamowienie_{order_id}_*.pdf"
-            pdf_files = glob.glob(pdf_pattern)
-            for pdf_file in pdf_files:
+            # Spróbuj usunąć pliki PDF (z manifestu - bez przeszukiwania katalogu)
+            for pdf_file in self.pdf_manifest.remove(order_id):
                 try:
                     os.remove(pdf_file)
-                    print(f"✅ Usunięto plik PDF: {pdf_file}")
+                    logger.info("✅ Usunięto plik PDF: %s", pdf_file)
                 except Exception as e:
-                    print(f"⚠️ Nie udało się usunąć pliku PDF {pdf_file}: {e}")
+                    logger.warning("⚠️ Nie udało się usunąć pliku PDF %s: %s", pdf_file, e)
             
-            print(f"✅ Usunięto zamówienie {order_id} - {order_info.get('product_name', 'Nieznany produkt')}")
+            logger.info("✅ Usunięto zamówienie %s - %s", order_id, order_info.get('product_name', 'Nieznany produkt'))
             return True, f"Zamówienie {order_id} zostało usunięte"
             
         except Exception as e:
             error_msg = f"❌ Błąd podczas usuwania zamówienia {order_id}: {e}"
-            print(error_msg)
+            logger.error(error_msg)
             return False, error_msg
 
+    @property
+    def pdf_manifest(self):
+        """Indeks plików PDF zamówień (tworzony przy pierwszym użyciu)"""
+        if self._pdf_manifest is None:
+            self._pdf_manifest = PDFManifest(self.pdf_dir)
+        return self._pdf_manifest
+
+    def get_order_pdf(self, order_id):
+        """Zapisany PDF zamówienia - z luźnego pliku albo z segmentu archiwum; None gdy brak"""
+        return self.pdf_manifest.read(order_id)
+
     def get_deletable_orders(self):
         """Zwraca zamówienia które można usunąć"""
         try:
@@ -321,5 +542,5 @@ class DataLoader:
             return deletable_orders
             
         except Exception as e:
-            print(f"❌ Błąd pobierania zamówień do usunięcia: {e}")
+            logger.error("❌ Błąd pobierania zamówień do usunięcia: %s", e)
             return pd.DataFrame()
\ No newline at end of file
@@ -0,0 +1,381 @@
+"""Generator syntetycznych danych do testów obciążeniowych
+
+Tworzy products.csv, inventory.csv, suppliers.csv, purchase_order_history.csv,
+user_requests.csv i orders.csv w dowolnej skali, z tymi samymi kolumnami i
+rozkładami wartości co pliki referencyjne w data/. Wiersze są generowane i
+zapisywane partiami - pamięć zależy od wielkości partii, nie od skali.
+
+Uruchomienie: python -m modules.dataset_generator --products 100000 --output data_100k
+"""
+import argparse
+import csv
+import logging
+import os
+import time
+import pandas as pd
+import numpy as np
+from modules.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _mix(seed, index, salt):
+    """Deterministyczny skrót (splitmix64) - atrybuty wiersza zależą tylko od jego numeru"""
+    with np.errstate(over='ignore'):
+        z = (np.asarray(index, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+             + np.uint64((seed * 0x632BE59BD9B4E019 + salt * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF)) & _MASK64
+        z = ((z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)) & _MASK64
+        z = ((z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)) & _MASK64
+        return z ^ (z >> np.uint64(31))
+
+
+class DatasetGenerator:
+    """Generuje statystycznie podobne dane w zadanej skali"""
+
+    # Tabele w kolejności generowania: plik, czy wszystkie pola w cudzysłowie (jak w data/)
+    TABLES = {
+        'products': ('products.csv', True),
+        'inventory': ('inventory.csv', False),
+        'suppliers': ('suppliers.csv', True),
+        'purchase_order_history': ('purchase_order_history.csv', True),
+        'user_requests': ('user_requests.csv', False),
+        'orders': ('orders.csv', False)
+    }
+
+    def __init__(self, reference_dir='data', seed=0, chunk_size=100_000):
+        self.reference_dir = reference_dir
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self._load_reference()
+
+    def _load_reference(self):
+        """Wczytuje pliki referencyjne i przygotowuje rozkłady empiryczne"""
+        ref = {name: pd.read_csv(os.path.join(self.reference_dir, filename))
+               for name, (filename, _) in self.TABLES.items()}
+        self.ref = ref
+        self.columns = {name: list(df.columns) for name, df in ref.items()}
+
+        # Nazwy produktów: "<prefiks> <numer>[ <sufiks>]", np. "Navigator Paper 643 op.", "Castrol Oils 773 L";
+        # numer to ostatnia liczba w nazwie - marki z cyframi (np. "3M") zostają w prefiksie
+        parts = ref['products']['Product_Name'].astype(str).str.extract(r'^(.*?)\s*\d+\s*(\D*)$')
+        self.name_prefix = parts[0].fillna(ref['products']['Product_Name'].astype(str)).to_numpy(dtype=object)
+        suffix = parts[1].fillna('').str.strip()
+        self.name_suffix = (' ' + suffix).where(suffix != '', '').to_numpy(dtype=object)
+
+        unit_cost = pd.to_numeric(ref['products']['Unit_Cost'], errors='coerce')
+        self.unit_cost = unit_cost.fillna(unit_cost.median()).to_numpy()
+
+        # Dostawcy: "<marka> <forma prawna>"
+        supplier_parts = ref['suppliers']['Supplier_Name'].astype(str).str.split(' ', n=1, expand=True)
+        self.supplier_base = supplier_parts[0].to_numpy(dtype=object)
+        self.supplier_legal = supplier_parts[1].fillna('').to_numpy(dtype=object) if supplier_parts.shape[1] > 1 \
+            else np.full(len(supplier_parts), '', dtype=object)
+
+        history = ref['purchase_order_history']
+        dates = pd.to_datetime(history['Date'], format='%m/%d/%Y', errors='coerce').dropna()
+        self.history_start = dates.min()
+        self.history_span = max((dates.max() - dates.min()).days, 1)
+
+        requests_ts = pd.to_datetime(ref['user_requests']['Timestamp'], format='%m/%d/%Y %H:%M', errors='coerce').dropna()
+        self.requests_start = requests_ts.min()
+        self.requests_span = max((requests_ts.max() - requests_ts.min()).total_seconds(), 1)
+
+    def default_sizes(self, products):
+        """Liczności tabel proporcjonalne do danych referencyjnych"""
+        scale = products / max(len(self.ref['products']), 1)
+        return {
+            'products': products,
+            'inventory': products,
+            'suppliers': max(int(len(self.ref['suppliers']) * scale), 1),
+            'purchase_order_history': int(len(self.ref['purchase_order_history']) * scale),
+            'user_requests': int(len(self.ref['user_requests']) * scale),
+            'orders': int(len(self.ref['orders']) * scale)
+        }
+
+    def generate(self, output_dir, products, sizes=None, initial_stock='reference'):
+        """Zapisuje wszystkie tabele do output_dir; zwraca liczby wierszy"""
+        if os.path.abspath(output_dir) == os.path.abspath(self.reference_dir):
+            raise ValueError("Katalog wyjściowy nie może być katalogiem danych referencyjnych")
+        os.makedirs(output_dir, exist_ok=True)
+
+        sizes = {**self.default_sizes(products), **(sizes or {})}
+        sizes['inventory'] = sizes['products']
+        self.sizes = sizes
+        self.initial_stock = initial_stock
+        self.id_width = max(4, len(str(sizes['products'])))
+
+        builders = {
+            'products': self._products_chunk,
+            'inventory': self._inventory_chunk,
+            'suppliers': self._suppliers_chunk,
+            'purchase_order_history': self._history_chunk,
+            'user_requests': self._requests_chunk,
+            'orders': self._orders_chunk
+        }
+
+        for name, (filename, quote_all) in self.TABLES.items():
+            started = time.perf_counter()
+            path = os.path.join(output_dir, filename)
+            self._write_table(path, sizes[name], builders[name], self.columns[name], quote_all)
+            elapsed = time.perf_counter() - started
+            logger.info("✅ %s: %s wierszy (%.1f s)", filename, f"{sizes[name]:,}", elapsed)
+
+        return sizes
+
+    def _write_table(self, path, total, build_chunk, columns, quote_all):
+        """Zapis partiami - w pamięci jest tylko bieżąca partia"""
+        quoting = csv.QUOTE_ALL if quote_all else csv.QUOTE_MINIMAL
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            pd.DataFrame(columns=columns).to_csv(f, index=False, quoting=quoting)
+            for start in range(0, total, self.chunk_size):
+                index = np.arange(start, min(start + self.chunk_size, total), dtype=np.uint64)
+                build_chunk(index)[columns].to_csv(f, index=False, header=False, quoting=quoting)
+
+    # Pomocnicze losowanie zależne od numeru wiersza
+
+    def _uniform(self, index, salt):
+        return (_mix(self.seed, index, salt) >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+    def _choice(self, index, salt, n):
+        return (_mix(self.seed, index, salt) % np.uint64(n)).astype(np.int64)
+
+    def _sample(self, table, column, index, salt, dropna=False):
+        """Wartości z rozkładu empirycznego kolumny referencyjnej"""
+        values = self.ref[table][column]
+        values = (values.dropna() if dropna else values).to_numpy(dtype=object)
+        if len(values) == 0:
+            return np.full(len(index), np.nan, dtype=object)
+        return values[self._choice(index, salt, len(values))]
+
+    def _format_dates(self, timestamps, with_time=False):
+        """Format dat jak w plikach referencyjnych: m/d/YYYY [H:MM]"""
+        ts = pd.DatetimeIndex(timestamps)
+        text = (pd.Series(ts.month, dtype=str) + '/' + pd.Series(ts.day, dtype=str) + '/' + pd.Series(ts.year, dtype=str))
+        if with_time:
+            text = text + ' ' + pd.Series(ts.hour, dtype=str) + ':' + pd.Series(ts.minute, dtype=str).str.zfill(2)
+        return text.to_numpy(dtype=object)
+
+    # Atrybuty produktów i dostawców - wyliczane z numeru, więc bez trzymania katalogu w pamięci
+
+    def _product_template(self, product_index):
+        return self._choice(product_index, 1, len(self.ref['products']))
+
+    def _product_ids(self, product_index):
+        numbers = pd.Series(product_index + np.uint64(1), dtype=np.uint64).astype(str).str.zfill(self.id_width)
+        return ('P-' + numbers).to_numpy(dtype=object)
+
+    def _product_names(self, product_index):
+        template = self._product_template(product_index)
+        numbers = pd.Series(product_index + np.uint64(1), dtype=np.uint64).astype(str).to_numpy(dtype=object)
+        return self.name_prefix[template] + ' ' + numbers + self.name_suffix[template]
+
+    def _product_costs(self, product_index):
+        template = self._product_template(product_index)
+        return np.round(self.unit_cost[template] * (0.8 + 0.4 * self._uniform(product_index, 5)), 2)
+
+    def _product_lead_times(self, product_index):
+        return self.ref['products']['Average_Lead_Time_Days'].to_numpy()[self._choice(product_index, 4, len(self.ref['products']))]
+
+    def _product_min_stock(self, product_index):
+        template = self._product_template(product_index)
+        base = self.ref['products']['Min_Stock_Level'].to_numpy()[template]
+        return np.maximum(1, np.round(base * (0.7 + 0.6 * self._uniform(product_index, 3)))).astype(np.int64)
+
+    def _product_column(self, column, product_index):
+        return self.ref['products'][column].to_numpy(dtype=object)[self._product_template(product_index)]
+
+    def _supplier_names(self, supplier_index):
+        template = self._choice(supplier_index, 11, len(self.ref['suppliers']))
+        base = self.supplier_base[template]
+        # Powyżej skali referencyjnej marki dostają numer, żeby nazwy się nie powtarzały
+        numbers = np.where(supplier_index >= np.uint64(len(self.ref['suppliers'])),
+                           pd.Series(supplier_index + np.uint64(1), dtype=np.uint64).astype(str).to_numpy(dtype=object), '')
+        return base + numbers, self.supplier_legal[template], template
+
+    # Budowanie partii poszczególnych tabel
+
+    def _products_chunk(self, index):
+        return pd.DataFrame({
+            'Product_ID': self._product_ids(index),
+            'Product_Name': self._product_names(index),
+            'Category': self._product_column('Category', index),
+            'Subcategory': self._product_column('Subcategory', index),
+            'Unit': self._product_column('Unit', index),
+            'Min_Stock_Level': self._product_min_stock(index),
+            'Average_Lead_Time_Days': self._product_lead_times(index),
+            'Unit_Cost': self._product_costs(index),
+            'Currency': self._product_column('Currency', index)
+        })
+
+    def _inventory_chunk(self, index):
+        min_stock = self._product_min_stock(index)
+        if self.initial_stock == 'random':
+            stock = np.floor(min_stock * 3 * self._uniform(index, 21)).astype(np.int64)
+        else:
+            # Stosunek stanu do minimum z danych referencyjnych
+            ref = self.ref['inventory']
+            ratio = (ref['Stock'] / ref['Min_stock_level'].replace(0, np.nan)).fillna(0).to_numpy()
+            stock = np.round(min_stock * ratio[self._choice(index, 21, len(ratio))]).astype(np.int64)
+        return pd.DataFrame({
+            'Product_ID': self._product_ids(index),
+            'Stock': stock,
+            'Closing_Stock': stock,
+            'Min_stock_level': min_stock,
+            'Unit': self._product_column('Unit', index),
+            'Product_Name': self._product_names(index),
+            'Date': self._sample('inventory', 'Date', index, 22)
+        })
+
+    def _suppliers_chunk(self, index):
+        base, legal, template = self._supplier_names(index)
+        ref = self.ref['suppliers']
+
+        def jitter(column, salt, low=0.0, high=1.0):
+            values = ref[column].to_numpy(dtype=np.float64)[self._choice(index, salt, len(ref))]
+            return np.clip(np.round(values + (self._uniform(index, salt + 100) - 0.5) * 0.1, 2), low, high)
+
+        return pd.DataFrame({
+            'Supplier_ID': ('S-' + pd.Series(index + np.uint64(1), dtype=np.uint64).astype(str).str.zfill(3)).to_numpy(dtype=object),
+            'Supplier_Name': np.where(legal != '', base + ' ' + legal, base),
+            'Category': self._sample('suppliers', 'Category', index, 12),
+            'Reliability_Score': jitter('Reliability_Score', 13),
+            'Avg_Delivery_Days': self._sample('suppliers', 'Avg_Delivery_Days', index, 14),
+            'Price_Score': jitter('Price_Score', 15),
+            'Quality_Score': jitter('Quality_Score', 16),
+            'Contact_Email': 'kontakt@' + pd.Series(base, dtype=str).str.lower().to_numpy(dtype=object) + '.com',
+            'Country': ref['Country'].to_numpy(dtype=object)[template],
+            'Currency': ref['Currency'].to_numpy(dtype=object)[template]
+        })
+
+    def _history_chunk(self, index):
+        n_products = self.sizes['products']
+        product = self._choice(index, 31, n_products).astype(np.uint64)
+        supplier = self._choice(index, 32, max(self.sizes['suppliers'], 1)).astype(np.uint64)
+
+        dates = self.history_start + pd.to_timedelta(np.floor(self._uniform(index, 33) * (self.history_span + 1)), unit='D')
+        quantity = self._sample('purchase_order_history', 'Quantity', index, 34).astype(np.int64)
+        price = np.round(self._product_costs(product) * (0.9 + 0.2 * self._uniform(index, 35)), 2)
+        expected = dates + pd.to_timedelta(self._product_lead_times(product), unit='D')
+        timeliness = self._sample('purchase_order_history', 'Timeliness', index, 36).astype(np.int64)
+        reality = expected + pd.to_timedelta(timeliness, unit='D')
+        base, legal, _ = self._supplier_names(supplier)
+
+        return pd.DataFrame({
+            'Date': self._format_dates(dates),
+            'Purchase_order_ID': ('PO-' + pd.Series(index + np.uint64(1), dtype=np.uint64).astype(str).str.zfill(6)).to_numpy(dtype=object),
+            'Product_ID': self._product_ids(product),
+            'Product_Name': self._product_names(product),
+            'Category1': self._product_column('Category', product),
+            'Category2': self._product_column('Subcategory', product),
+            'Quantity': quantity,
+            'Unit_of_Measure': self._product_column('Unit', product),
+            'Unit_Price': price,
+            'Value': np.round(price * quantity, 2),
+            'Supplier': np.where(legal != '', base + ' ' + legal, base),
+            'Rabat': self._sample('purchase_order_history', 'Rabat', index, 37),
+            'Type_order': self._sample('purchase_order_history', 'Type_order', index, 38),
+            'Seasonality': ('Q' + pd.Series(pd.DatetimeIndex(dates).quarter, dtype=str)).to_numpy(dtype=object),
+            'Transport_Cost': self._sample('purchase_order_history', 'Transport_Cost', index, 39),
+            'Delivery_Expected': self._format_dates(expected),
+            'Delivery_Reality': self._format_dates(reality),
+            'Timeliness': timeliness,
+            'Currency': self._product_column('Currency', product),
+            'Umowa_ramowa': self._sample('purchase_order_history', 'Umowa_ramowa', index, 40),
+            'Notes': self._sample('purchase_order_history', 'Notes', index, 41)
+        })
+
+    def _requests_chunk(self, index):
+        ref = self.ref['user_requests']
+        template = self._choice(index, 51, len(ref))
+        product = self._choice(index, 52, self.sizes['products']).astype(np.uint64)
+
+        texts = ref['User_Text'].to_numpy(dtype=object)[template]
+        detected = ref['Detected_Product'].to_numpy(dtype=object)[template]
+        has_product = pd.notna(detected)
+
+        # Zapotrzebowania z rozpoznanym produktem wskazują na produkt z wygenerowanego katalogu
+        names = self._product_names(product)
+        texts = np.array([text.replace(old, new) if found else text
+                          for text, old, new, found in zip(texts, detected, names, has_product)], dtype=object)
+        timestamps = self.requests_start + pd.to_timedelta(self._uniform(index, 53) * self.requests_span, unit='s')
+
+        return pd.DataFrame({
+            'Request_ID': ('REQ-' + pd.Series(index + np.uint64(1), dtype=np.uint64).astype(str).str.zfill(6)).to_numpy(dtype=object),
+            'User_Text': texts,
+            'Detected_Product': np.where(has_product, names, np.nan),
+            'Detected_Category': np.where(has_product, self._product_column('Category', product), np.nan),
+            'Timestamp': self._format_dates(timestamps, with_time=True)
+        })
+
+    def _orders_chunk(self, index):
+        product = self._choice(index, 61, self.sizes['products']).astype(np.uint64)
+        supplier = self._choice(index, 62, max(self.sizes['suppliers'], 1)).astype(np.uint64)
+        base, legal, _ = self._supplier_names(supplier)
+
+        # Udział zamówień standardowych jak w danych referencyjnych, ale nie mniej niż 10%
+        types = self.ref['orders']['order_type'].dropna()
+        standard_share = max((types == 'Standardowe').mean() if len(types) else 0.0, 0.1)
+        order_type = np.where(self._uniform(index, 63) < standard_share, 'Standardowe', 'Produkcyjne')
+        prefix = np.where(order_type == 'Produkcyjne', 'PROD-', 'ORD-')
+        status_draw = self._uniform(index, 64)
+        status = np.select([status_draw < 0.2, status_draw < 0.4], ['ordered', 'in_transit'], 'delivered')
+
+        timestamps = self.history_start + pd.to_timedelta(self._uniform(index, 65) * self.history_span * 86400, unit='s')
+        estimated = pd.DatetimeIndex(timestamps).normalize() + pd.to_timedelta(self._product_lead_times(product), unit='D')
+        estimated_text = estimated.strftime('%Y-%m-%d').to_numpy(dtype=object)
+        names = self._product_names(product)
+
+        return pd.DataFrame({
+            'order_id': prefix + pd.Series(index + np.uint64(1), dtype=np.uint64).map('{:08X}'.format).to_numpy(dtype=object),
+            'user_input': np.where(order_type == 'Produkcyjne',
+                                   'Automatyczne zamówienie produkcyjne - ' + names,
+                                   'potrzebuje ' + names),
+            'product_name': names,
+            'category': self._product_column('Category', product),
+            'quantity': self._sample('purchase_order_history', 'Quantity', index, 67).astype(np.int64),
+            'supplier_name': np.where(legal != '', base + ' ' + legal, base),
+            'price': np.round(self._product_costs(product) * (0.9 + 0.2 * self._uniform(index, 68)), 2),
+            'contract_type': self._sample('orders', 'contract_type', index, 69, dropna=True),
+            'timestamp': pd.DatetimeIndex(timestamps).strftime('%Y-%m-%d %H:%M:%S').to_numpy(dtype=object),
+            'unit': self._product_column('Unit', product),
+            'order_type': order_type,
+            'delivery_status': status,
+            'estimated_delivery': estimated_text,
+            'product_id': self._product_ids(product),
+            'delivery_date': np.where(status == 'delivered', estimated_text, np.nan)
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, required=True, help='liczba produktów (skala pozostałych tabel)')
+    parser.add_argument('--output', required=True, help='katalog wyjściowy')
+    parser.add_argument('--reference', default='data', help='katalog z danymi referencyjnymi')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--initial-stock', choices=['reference', 'random'], default='reference',
+                        help="'reference' - stany jak w data/, 'random' - losowo 0-3x minimum")
+    for table in ['suppliers', 'history', 'requests', 'orders']:
+        parser.add_argument(f'--{table}', type=int, default=None, help=f'liczba wierszy ({table}), domyślnie proporcjonalnie')
+    args = parser.parse_args()
+    # Postęp generowania (logger modułu) na stderr
+    configure_logging(os.environ.get('LOG_LEVEL'))
+
+    overrides = {
+        'suppliers': args.suppliers,
+        'purchase_order_history': args.history,
+        'user_requests': args.requests,
+        'orders': args.orders
+    }
+    generator = DatasetGenerator(args.reference, seed=args.seed, chunk_size=args.chunk_size)
+    started = time.perf_counter()
+    sizes = generator.generate(args.output, args.products,
+                               sizes={k: v for k, v in overrides.items() if v is not None},
+                               initial_stock=args.initial_stock)
+    print(f"🎯 Wygenerowano {sum(sizes.values()):,} wierszy w {time.perf_counter() - started:.1f} s -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
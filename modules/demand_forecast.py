@@ -0,0 +1,131 @@
+import logging
+import threading
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from modules.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+class DemandForecaster:
+    """Prognozuje zapotrzebowanie na podstawie historii zamówień (purchase_order_history.csv)"""
+
+    # Kwartał -> oznaczenie w kolumnie Seasonality
+    QUARTERS = ['Q1', 'Q2', 'Q3', 'Q4']
+
+    def __init__(self, data_loader, service_level_z=1.65, review_period_days=14, min_window_days=30):
+        self.data_loader = data_loader
+        self.service_level_z = service_level_z      # ~95% poziomu obsługi
+        self.review_period_days = review_period_days
+        self.min_window_days = min_window_days
+        # Prognozę czytają harmonogram, interfejs i wątek prewarm - cache i klucz zmieniane razem pod blokadą
+        self._lock = threading.Lock()
+        self._cache = None
+        self._cache_key = None
+
+    @timed('demand_forecast.get_forecast')
+    def get_forecast(self, reference_date=None):
+        """Zwraca prognozę dla całego katalogu (z cache, jeśli historia się nie zmieniła)"""
+        reference_date = reference_date or datetime.now().date()
+        quarter = self.QUARTERS[(reference_date.month - 1) // 3]
+        key = (self._history_fingerprint(), self._products_fingerprint(), quarter)
+
+        with self._lock:
+            if self._cache is not None and self._cache_key == key:
+                return self._cache
+
+            forecast = self._compute_forecast(quarter)
+            self._cache, self._cache_key = forecast, key
+        logger.info("📈 Przeliczono prognozę zapotrzebowania dla %s produktów (%s)", len(forecast), quarter)
+        return forecast
+
+    def invalidate(self):
+        """Wymusza ponowne przeliczenie prognozy"""
+        with self._lock:
+            self._cache = None
+            self._cache_key = None
+
+    def _history_fingerprint(self):
+        """Klucz cache - zmienia się po dopisaniu nowych wierszy do historii"""
+        history = self.data_loader.purchase_orders
+        if history is None or history.empty:
+            return (id(history), 0, None)
+        last_id = history['Purchase_order_ID'].iloc[-1] if 'Purchase_order_ID' in history.columns else None
+        return (id(history), len(history), last_id)
+
+    def _products_fingerprint(self):
+        products = self.data_loader.products
+        return (id(products), 0 if products is None else len(products))
+
+    def _compute_forecast(self, quarter):
+        """Liczy tempo zużycia, zmienność i punkt zamówienia dla wszystkich produktów naraz"""
+        products = self.data_loader.products
+        history = self.data_loader.purchase_orders
+
+        if products is None or products.empty:
+            return pd.DataFrame(columns=['daily_demand', 'demand_std', 'seasonal_factor',
+                                         'lead_time', 'reorder_point', 'target_stock'])
+
+        forecast = pd.DataFrame(index=pd.Index(products['Product_ID'].values, name='Product_ID'))
+        lead_time = pd.to_numeric(products['Average_Lead_Time_Days'], errors='coerce') if 'Average_Lead_Time_Days' in products.columns else None
+        forecast['lead_time'] = (lead_time.fillna(7).clip(lower=1).values if lead_time is not None else 7)
+
+        if history is None or history.empty or not {'Product_ID', 'Quantity', 'Date'}.issubset(history.columns):
+            forecast['daily_demand'] = 0.0
+            forecast['demand_std'] = 0.0
+            forecast['seasonal_factor'] = 1.0
+        else:
+            dates = pd.to_datetime(history['Date'], format='%m/%d/%Y', errors='coerce')
+            quantity = pd.to_numeric(history['Quantity'], errors='coerce').fillna(0)
+            valid = dates.notna()
+            frame = pd.DataFrame({
+                'Product_ID': history['Product_ID'].values[valid.values],
+                'Quantity': quantity.values[valid.values],
+                'Month': dates[valid].dt.to_period('M').values
+            })
+
+            # Okno obserwacji wspólne dla wszystkich produktów
+            window_days = max((dates[valid].max() - dates[valid].min()).days + 1, self.min_window_days) if valid.any() else self.min_window_days
+
+            # Średnie dzienne zużycie
+            totals = frame.groupby('Product_ID')['Quantity'].sum()
+            forecast['daily_demand'] = (totals / window_days).reindex(forecast.index).fillna(0.0).values
+
+            # Zmienność - odchylenie miesięcznego zużycia (z miesiącami bez zamówień) przeliczone na dzień
+            monthly = frame.pivot_table(index='Product_ID', columns='Month', values='Quantity',
+                                        aggfunc='sum', fill_value=0)
+            all_months = pd.period_range(monthly.columns.min(), monthly.columns.max(), freq='M') if len(monthly.columns) else monthly.columns
+            monthly = monthly.reindex(columns=all_months, fill_value=0)
+            monthly_std = pd.Series(monthly.values.std(axis=1, ddof=1) if monthly.shape[1] > 1 else 0.0,
+                                    index=monthly.index)
+            forecast['demand_std'] = (monthly_std / np.sqrt(30.4)).reindex(forecast.index).fillna(0.0).values
+
+            forecast['seasonal_factor'] = self._seasonal_factors(history, products, quarter).reindex(forecast.index).fillna(1.0).values
+
+        # Punkt zamówienia: zużycie w czasie dostawy + zapas bezpieczeństwa
+        lead = forecast['lead_time'].astype(float)
+        demand = forecast['daily_demand'] * forecast['seasonal_factor']
+        safety_stock = self.service_level_z * forecast['demand_std'] * np.sqrt(lead)
+        forecast['reorder_point'] = np.ceil(demand * lead + safety_stock)
+        # Stan docelowy: punkt zamówienia + zużycie do następnego przeglądu
+        forecast['target_stock'] = np.ceil(forecast['reorder_point'] + demand * self.review_period_days)
+
+        return forecast
+
+    def _seasonal_factors(self, history, products, quarter):
+        """Indeks sezonowy bieżącego kwartału liczony dla kategorii produktu"""
+        if 'Seasonality' not in history.columns or 'Category' not in products.columns:
+            return pd.Series(1.0, index=products['Product_ID'].values)
+
+        category_by_product = products.set_index('Product_ID')['Category']
+        frame = pd.DataFrame({
+            'Category': history['Product_ID'].map(category_by_product).values,
+            'Seasonality': history['Seasonality'].values,
+            'Quantity': pd.to_numeric(history['Quantity'], errors='coerce').fillna(0).values
+        })
+        by_quarter = frame.pivot_table(index='Category', columns='Seasonality', values='Quantity',
+                                       aggfunc='sum', fill_value=0).reindex(columns=self.QUARTERS, fill_value=0)
+        quarter_mean = by_quarter.mean(axis=1).replace(0, np.nan)
+        index = (by_quarter[quarter] / quarter_mean).fillna(1.0)
+
+        return pd.Series(category_by_product.map(index).fillna(1.0).values, index=category_by_product.index)
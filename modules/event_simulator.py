@@ -0,0 +1,218 @@
+import contextlib
+import heapq
+import logging
+import pandas as pd
+import numpy as np
+from datetime import date
+from modules.metrics import timed
+from modules.time_simulator import TimeSimulator
+
+logger = logging.getLogger(__name__)
+
+class EventDrivenSimulator:
+    """Symulacja zdarzeniowa - przeskakuje między dostawami, wyczerpaniami stanów i zapotrzebowaniami"""
+
+    def __init__(self, time_simulator):
+        # Daty, ziarno i strumienie losowe są wspólne z symulacją dzień po dniu,
+        # dzięki czemu oba tryby dają ten sam stan końcowy
+        self.time_simulator = time_simulator
+
+    @timed('event_simulator.run')
+    def run(self, days, data_loader, apply=False, orders_df=None, reorder_policy=None):
+        """Symuluje `days` dni od bieżącej daty symulacji
+
+        Przy apply=True wynik jest zapisywany tak jak w TimeSimulator.advance_days,
+        w przeciwnym razie to scenariusz "what-if" bez zmian w danych.
+        `orders_df` pozwala podać gotową migawkę zamówień zamiast czytać plik.
+        `reorder_policy` (słownik tablic zgodnych z inventory: reorder_point,
+        order_quantity, lead_time, unit_price) składa zamówienia w trakcie
+        symulacji - wtedy wynik nie odpowiada już przebiegowi dzień po dniu.
+        """
+        # Zapis wyniku (apply=True) pod wspólną blokadą zapisu - stan wejściowy nie zmieni się w trakcie
+        with (data_loader.write_lock if apply else contextlib.nullcontext()):
+            # Kroki na osobnej instancji: data symulacji aplikacji (czytana przez inne sesje,
+            # harmonogram i prognozę) nie zmienia się w trakcie - przesuwa ją dopiero zapis wyniku
+            simulator = TimeSimulator(self.time_simulator.data_dir, seed=self.time_simulator.seed,
+                                      current_date=self.time_simulator.current_date)
+            start_date = simulator.current_date
+            end_ordinal = start_date.toordinal() + days
+
+            inventory = data_loader.inventory
+            if inventory is not None and not inventory.empty:
+                stock = inventory['Stock'].to_numpy(dtype=np.float64, copy=True)
+                product_index = self._index_products(inventory)
+            else:
+                stock = np.zeros(0)
+                product_index = {}
+
+            if orders_df is None:
+                orders_df = simulator._load_orders()
+            orders_df = orders_df.copy() if orders_df is not None else None
+            delivery_queue = simulator._build_delivery_queue(orders_df)
+            order_prices = (pd.to_numeric(orders_df['price'], errors='coerce').fillna(0).to_numpy()
+                            if orders_df is not None and 'price' in orders_df.columns else None)
+
+            # Zamówienia składane przez politykę: kolejka (termin, pozycja produktu, ilość)
+            policy_queue = []
+            policy_pending = np.zeros(len(stock), dtype=bool)
+            policy_orders = 0
+            spend = 0.0
+
+            # Produkty bez stanu od początku liczą się jako wyczerpane
+            zero_since = np.where(stock > 0, -1, start_date.toordinal() + 1)
+            stockout_days = np.zeros(len(stock), dtype=np.int64)
+            events = []
+            new_requests = []
+            delivered_rows = []
+
+            day = start_date.toordinal()
+            active = int((stock > 0).sum())
+
+            while day < end_ordinal:
+                if active > 0:
+                    # Zużycie zmienia stan codziennie - krok o jeden dzień
+                    day += 1
+                else:
+                    # Nic się nie zużywa - skok do najbliższego zdarzenia
+                    next_delivery = min(delivery_queue[0][0] if delivery_queue else end_ordinal,
+                                        policy_queue[0][0] if policy_queue else end_ordinal)
+                    next_request = self._next_request_day(day + 1, min(next_delivery, end_ordinal))
+                    day = max(min(next_delivery, next_request, end_ordinal), day + 1)
+                current = date.fromordinal(day)
+                simulator.current_date = current
+
+                # 1. Zużycie (tylko gdy jakiś produkt jest na stanie)
+                if active > 0:
+                    previous = stock
+                    stock, _ = simulator._consume_stock(stock)
+                    crossed = np.flatnonzero((previous > 0) & (stock <= 0))
+                    if len(crossed):
+                        zero_since[crossed] = day
+                        events.extend(('stockout', current, int(i)) for i in crossed)
+
+                # 2. Dostawy z terminem do dziś
+                while delivery_queue and delivery_queue[0][0] <= day:
+                    _, row = heapq.heappop(delivery_queue)
+                    delivered_rows.append((row, current))
+                    positions = product_index.get(orders_df.at[row, 'product_name'])
+                    if positions is None:
+                        continue
+                    was_empty = stock[positions] <= 0
+                    stock[positions] += orders_df.at[row, 'quantity']
+                    restocked = positions[was_empty & (stock[positions] > 0)]
+                    if len(restocked):
+                        stockout_days[restocked] += day - zero_since[restocked]
+                        zero_since[restocked] = -1
+                    spend += orders_df.at[row, 'quantity'] * order_prices[row] if order_prices is not None else 0
+                    events.append(('delivery', current, orders_df.at[row, 'order_id']))
+
+                if reorder_policy is not None:
+                    day_spend, placed = self._apply_policy(reorder_policy, stock, policy_queue, policy_pending,
+                                                           zero_since, stockout_days, day, current, events)
+                    spend += day_spend
+                    policy_orders += placed
+
+                # 3. Nowe zapotrzebowanie
+                new_request = simulator._generate_user_request()
+                if new_request is not None:
+                    new_requests.append(new_request)
+                    events.append(('request', current, new_request['Request_ID']))
+
+                active = int((stock > 0).sum())
+
+            still_empty = zero_since >= 0
+            stockout_days[still_empty] += end_ordinal + 1 - zero_since[still_empty]
+
+            if orders_df is not None:
+                for row, delivered_on in delivered_rows:
+                    orders_df.at[row, 'delivery_status'] = 'delivered'
+                    orders_df.at[row, 'delivery_date'] = delivered_on.strftime('%Y-%m-%d')
+
+            result = {
+                'start_date': start_date,
+                'end_date': date.fromordinal(end_ordinal),
+                'stock': stock,
+                'orders': orders_df,
+                'new_requests': new_requests,
+                'events': events,
+                'stockout_days': stockout_days,
+                'deliveries': len(delivered_rows),
+                'policy_orders': policy_orders,
+                'spend': float(spend)
+            }
+
+            if apply:
+                self._apply(result, data_loader)
+
+            logger.info("⚡ Symulacja zdarzeniowa %s -> %s: %s zdarzeń, dostawy: %s, zapotrzebowania: %s",
+                        start_date, result['end_date'], len(events), result['deliveries'], len(new_requests))
+            return result
+
+    def _apply_policy(self, policy, stock, policy_queue, policy_pending, zero_since, stockout_days, day, current, events):
+        """Przyjmuje dostawy polityki i składa nowe zamówienia dla produktów poniżej punktu zamówienia"""
+        spend = 0.0
+
+        while policy_queue and policy_queue[0][0] <= day:
+            _, position, quantity = heapq.heappop(policy_queue)
+            policy_pending[position] = False
+            if stock[position] <= 0 < stock[position] + quantity:
+                stockout_days[position] += day - zero_since[position]
+                zero_since[position] = -1
+            stock[position] += quantity
+            spend += quantity * policy['unit_price'][position]
+            events.append(('policy_delivery', current, int(position)))
+
+        to_order = np.flatnonzero((stock <= policy['reorder_point']) & ~policy_pending & (policy['order_quantity'] > 0))
+        for position in to_order:
+            due = day + max(int(policy['lead_time'][position]), 1)
+            heapq.heappush(policy_queue, (due, int(position), float(policy['order_quantity'][position])))
+            policy_pending[position] = True
+            events.append(('policy_order', current, int(position)))
+
+        return spend, len(to_order)
+
+    def summarize(self, result, data_loader):
+        """Podsumowanie wyniku dla produktów (dni bez stanu, stan końcowy)"""
+        inventory = data_loader.inventory
+        summary = pd.DataFrame({
+            'Product_ID': inventory['Product_ID'].values,
+            'Product_Name': inventory['Product_Name'].values,
+            'Stock_Start': inventory['Stock'].values,
+            'Stock_End': result['stock'],
+            'Stockout_Days': result['stockout_days']
+        })
+        return summary.sort_values('Stockout_Days', ascending=False)
+
+    def _apply(self, result, data_loader):
+        """Zapisuje wynik tak jak zrobiłby to przebieg dzień po dniu"""
+        simulator = self.time_simulator
+        inventory = data_loader.inventory
+
+        if inventory is not None and not inventory.empty:
+            new_stock = result['stock']
+            if np.issubdtype(inventory['Stock'].dtype, np.integer):
+                new_stock = new_stock.astype(inventory['Stock'].dtype)
+            inventory['Stock'] = new_stock
+            inventory['Closing_Stock'] = new_stock
+            inventory.to_csv(f'{simulator.data_dir}/inventory.csv', index=False)
+
+        if result['deliveries'] > 0:
+            result['orders'].to_csv(f'{simulator.data_dir}/orders.csv', index=False)
+        simulator._append_user_requests(result['new_requests'])
+
+        simulator.current_date = result['end_date']
+        simulator.save_simulation_state()
+
+    def _index_products(self, inventory):
+        """Nazwa produktu -> pozycje w inventory (dostawy księgowane po nazwie)"""
+        return {name: np.asarray(positions) for name, positions in
+                inventory.groupby('Product_Name', sort=False).indices.items()}
+
+    def _next_request_day(self, first_day, last_day):
+        """Pierwszy dzień w [first_day, last_day] z nowym zapotrzebowaniem"""
+        simulator = self.time_simulator
+        for day in range(first_day, last_day + 1):
+            rng = simulator.day_rng(date.fromordinal(day), simulator.REQUESTS_STREAM)
+            if rng.random() <= 0.3:
+                return day
+        return last_day + 1
@@ -0,0 +1,49 @@
+import os
+import json
+import logging
+
+# Atrybuty każdego LogRecord - pozostałe pola pochodzą z extra={...}
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+TEXT_FORMAT = '%(asctime)s %(levelname)-7s [%(process)d] %(name)s: %(message)s'
+
+
+class JSONFormatter(logging.Formatter):
+    """Jeden obiekt JSON na linię: czas, poziom, moduł, komunikat i pola z extra"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'pid': record.process,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level=None, fmt=None, stream=None):
+    """Konfiguruje logowanie procesu: jeden handler na loggerze głównym
+
+    Poziom i format domyślnie ze zmiennych LOG_LEVEL (INFO) i LOG_FORMAT
+    (text/json). Przy poziomie INFO komunikaty diagnostyczne (DEBUG) nie są
+    nawet formatowane. Wielokrotne wywołanie tylko zmienia poziom - Streamlit
+    wykonuje skrypt aplikacji przy każdej interakcji.
+    """
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    fmt = fmt or os.environ.get('LOG_FORMAT', 'text')
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    handler = next((h for h in root.handlers if getattr(h, '_zamowienia', False)), None)
+    if handler is None:
+        handler = logging.StreamHandler(stream)
+        handler._zamowienia = True
+        root.addHandler(handler)
+    handler.setFormatter(JSONFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT, '%H:%M:%S'))
+    return root
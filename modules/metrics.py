@@ -0,0 +1,160 @@
+import os
+import bisect
+import functools
+import json
+import threading
+import time
+from collections import deque
+
+class Histogram:
+    """Rozkład czasów operacji: kubełki (eksport Prometheus) + ostatnie pomiary (p50/p95 na żywo)"""
+
+    BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+    def __init__(self, reservoir=1024):
+        self.bucket_counts = [0] * len(self.BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=reservoir)
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+        self.recent.append(value)
+
+    def percentile(self, q):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Timer:
+    """Kontekst mierzący czas bloku (klasa zamiast @contextmanager - mniejszy narzut)"""
+
+    __slots__ = ('registry', 'name', 'started')
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter() if self.registry.enabled else None
+        return self
+
+    def __exit__(self, *exc):
+        if self.started is not None:
+            self.registry.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class MetricsRegistry:
+    """Liczniki i histogramy czasów operacji w pamięci procesu
+
+    Gdy wyłączony (METRICS_ENABLED=0), opakowane funkcje kosztują jedno
+    sprawdzenie flagi na wywołanie.
+    """
+
+    def __init__(self, enabled=True, reservoir=1024):
+        self.enabled = enabled
+        self.reservoir = reservoir
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self.started = time.time()
+
+    def inc(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(self.reservoir)
+            histogram.observe(seconds)
+
+    def timer(self, name):
+        """with METRICS.timer('nazwa'): ... - czas bloku trafia do histogramu"""
+        return _Timer(self, name)
+
+    def timed(self, name):
+        """Dekorator mierzący czas każdego wywołania funkcji"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def snapshot(self):
+        """Stan metryk: operacje (liczba, p50/p95/max w ms) i liczniki"""
+        with self._lock:
+            operations = {}
+            for name, histogram in sorted(self._histograms.items()):
+                p50, p95 = histogram.percentile(0.5), histogram.percentile(0.95)
+                operations[name] = {
+                    'count': histogram.count,
+                    'p50_ms': round(p50 * 1000, 3) if p50 is not None else None,
+                    'p95_ms': round(p95 * 1000, 3) if p95 is not None else None,
+                    'max_ms': round(histogram.max * 1000, 3),
+                    'total_s': round(histogram.sum, 3)
+                }
+            return {
+                'enabled': self.enabled,
+                'since': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started)),
+                'operations': operations,
+                'counters': dict(sorted(self._counters.items()))
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+
+    def to_prometheus(self, labels=None):
+        """Format tekstowy Prometheus: histogram czasów operacji i liczniki zdarzeń
+
+        labels - etykiety dodawane do każdej serii, np. {'worker': pid}, gdy
+        kilka procesów eksportuje własne rejestry pod tymi samymi nazwami.
+        """
+        common = ''.join(f'{key}="{value}",' for key, value in (labels or {}).items())
+        lines = ['# HELP zamowienia_operation_seconds Czas operacji systemu zamówień',
+                 '# TYPE zamowienia_operation_seconds histogram']
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(Histogram.BUCKETS, histogram.bucket_counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'zamowienia_operation_seconds_bucket{{{common}operation="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'zamowienia_operation_seconds_sum{{{common}operation="{name}"}} {histogram.sum:.6f}')
+                lines.append(f'zamowienia_operation_seconds_count{{{common}operation="{name}"}} {histogram.count}')
+            lines += ['# HELP zamowienia_events_total Liczniki zdarzeń systemu zamówień',
+                      '# TYPE zamowienia_events_total counter']
+            for name, value in sorted(self._counters.items()):
+                lines.append(f'zamowienia_events_total{{{common}event="{name}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started = time.time()
+
+
+# Rejestr procesu - METRICS_ENABLED=0 wyłącza pomiary
+METRICS = MetricsRegistry(enabled=os.environ.get('METRICS_ENABLED', '1') != '0')
+timed = METRICS.timed
@@ -0,0 +1,178 @@
+import logging
+import os
+import time
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from modules.data_loader import DataLoader
+from modules.demand_forecast import DemandForecaster
+from modules.event_simulator import EventDrivenSimulator
+from modules.time_simulator import TimeSimulator
+
+logger = logging.getLogger(__name__)
+
+# Migawka danych wejściowych - przekazywana raz do każdego procesu roboczego
+_SNAPSHOT = None
+
+def _init_worker(snapshot):
+    global _SNAPSHOT
+    _SNAPSHOT = snapshot
+    # Repliki nie logują komunikatów symulatora (tylko ostrzeżenia i błędy)
+    for name in ('modules.event_simulator', 'modules.time_simulator'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+def _run_replica(seed, snapshot=None):
+    """Jedna replika symulacji zdarzeniowej na wspólnej migawce"""
+    snapshot = snapshot if snapshot is not None else _SNAPSHOT
+    data_loader = DataLoader(snapshot['data_dir'])
+    data_loader.inventory = snapshot['inventory']
+
+    simulator = TimeSimulator(snapshot['data_dir'], seed=seed, current_date=snapshot['start_date'])
+    result = EventDrivenSimulator(simulator).run(
+        snapshot['days'], data_loader,
+        orders_df=snapshot['orders'],
+        reorder_policy=snapshot['policy']
+    )
+    return {
+        'seed': seed,
+        'stockout_days': result['stockout_days'],
+        'spend': result['spend'],
+        'deliveries': result['deliveries'],
+        'policy_orders': result['policy_orders'],
+        'requests': len(result['new_requests'])
+    }
+
+
+class MonteCarloRunner:
+    """Uruchamia wiele niezależnie losowanych replik symulacji w puli procesów"""
+
+    POLICIES = ['none', 'min_stock', 'forecast']
+
+    def __init__(self, data_loader, time_simulator, max_workers=None):
+        self.data_loader = data_loader
+        self.time_simulator = time_simulator
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def run(self, replicas, days, policy='none', seed=0):
+        """Uruchamia `replicas` replik na horyzoncie `days` dni i agreguje rozkłady wyników"""
+        snapshot = self._build_snapshot(days, policy)
+        seeds = [int(s) for s in np.random.SeedSequence(seed).generate_state(replicas, dtype=np.uint64)]
+
+        started = time.perf_counter()
+        workers = min(self.max_workers, replicas)
+        chunksize = max(1, replicas // (workers * 4))
+
+        if workers <= 1:
+            results = [_run_replica(s, snapshot) for s in seeds]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(snapshot,)) as executor:
+                results = list(executor.map(_run_replica, seeds, chunksize=chunksize))
+
+        elapsed = time.perf_counter() - started
+        summary = self._aggregate(results, snapshot)
+        summary.update({
+            'replicas': replicas,
+            'days': days,
+            'policy': policy,
+            'workers': workers,
+            'elapsed_seconds': round(elapsed, 3),
+            'replicas_per_second': round(replicas / elapsed, 2) if elapsed > 0 else None
+        })
+        logger.info("🎲 Monte Carlo: %s replik x %s dni (%s) w %.2f s na %s procesach", replicas, days, policy, elapsed, workers)
+        return summary
+
+    def compare_policies(self, replicas, days, policies=None, seed=0):
+        """Porównuje polityki zamawiania na tych samych ziarnach replik"""
+        policies = policies or self.POLICIES
+        rows = []
+        for policy in policies:
+            summary = self.run(replicas, days, policy=policy, seed=seed)
+            rows.append({
+                'policy': policy,
+                'stockout_days_mean': summary['stockout_days_total']['mean'],
+                'stockout_days_p95': summary['stockout_days_total']['p95'],
+                'spend_mean': summary['spend']['mean'],
+                'spend_p95': summary['spend']['p95'],
+                'deliveries_mean': summary['deliveries']['mean']
+            })
+        return pd.DataFrame(rows)
+
+    def _build_snapshot(self, days, policy):
+        """Wspólna, tylko do odczytu migawka inventory i zamówień"""
+        inventory = self.data_loader.inventory[['Product_ID', 'Product_Name', 'Stock']].copy()
+        orders_df = self.time_simulator._load_orders()
+        return {
+            'data_dir': self.data_loader.data_dir,
+            'start_date': self.time_simulator.current_date,
+            'days': days,
+            'inventory': inventory,
+            'orders': orders_df,
+            'policy': self._build_policy(policy, inventory)
+        }
+
+    def _build_policy(self, policy, inventory):
+        """Tablice polityki zamawiania w kolejności wierszy inventory"""
+        if policy == 'none':
+            return None
+        if policy not in self.POLICIES:
+            raise ValueError(f"Nieznana polityka zamawiania: {policy}")
+
+        products = self.data_loader.products.set_index('Product_ID')
+        lead_time = pd.to_numeric(products['Average_Lead_Time_Days'], errors='coerce').reindex(inventory['Product_ID']).fillna(7)
+        unit_price = pd.to_numeric(products['Unit_Cost'], errors='coerce').reindex(inventory['Product_ID']).fillna(0)
+        min_stock = pd.to_numeric(self.data_loader.inventory['Min_stock_level'], errors='coerce').fillna(0).to_numpy()
+
+        if policy == 'min_stock':
+            # Ta sama heurystyka co dotychczasowe AutoReorderSystem: 2x minimum + zapas
+            reorder_point = min_stock
+            order_quantity = np.maximum(min_stock * 2 + np.maximum(min_stock * 0.5, 10), min_stock)
+        else:
+            forecast = DemandForecaster(self.data_loader).get_forecast(self.time_simulator.current_date)
+            forecast = forecast.reindex(inventory['Product_ID'])
+            reorder_point = np.maximum(min_stock, forecast['reorder_point'].fillna(0).to_numpy())
+            order_quantity = np.maximum(forecast['target_stock'].fillna(0).to_numpy() - forecast['reorder_point'].fillna(0).to_numpy()
+                                        + reorder_point, min_stock)
+
+        return {
+            'reorder_point': np.asarray(reorder_point, dtype=np.float64),
+            'order_quantity': np.ceil(np.asarray(order_quantity, dtype=np.float64)),
+            'lead_time': lead_time.to_numpy(),
+            'unit_price': unit_price.to_numpy()
+        }
+
+    def _aggregate(self, results, snapshot):
+        """Rozkłady wyników: dni bez stanu na produkt, wydatki, liczba dostaw"""
+        stockout = np.vstack([r['stockout_days'] for r in results])
+        inventory = snapshot['inventory']
+
+        per_product = pd.DataFrame({
+            'Product_ID': inventory['Product_ID'].values,
+            'Product_Name': inventory['Product_Name'].values,
+            'stockout_days_mean': stockout.mean(axis=0),
+            'stockout_days_p50': np.percentile(stockout, 50, axis=0),
+            'stockout_days_p95': np.percentile(stockout, 95, axis=0),
+            'stockout_probability': (stockout > 0).mean(axis=0)
+        }).sort_values('stockout_days_mean', ascending=False)
+
+        return {
+            'stockout_days_per_product': per_product,
+            'stockout_days_total': self._distribution(stockout.sum(axis=1)),
+            'spend': self._distribution([r['spend'] for r in results]),
+            'deliveries': self._distribution([r['deliveries'] for r in results]),
+            'policy_orders': self._distribution([r['policy_orders'] for r in results]),
+            'requests': self._distribution([r['requests'] for r in results])
+        }
+
+    def _distribution(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        return {
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+            'p5': float(np.percentile(values, 5)),
+            'p50': float(np.percentile(values, 50)),
+            'p95': float(np.percentile(values, 95)),
+            'min': float(values.min()),
+            'max': float(values.max())
+        }
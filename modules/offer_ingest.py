@@ -0,0 +1,278 @@
+import logging
+import re
+import zlib
+import uuid
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+from modules.classifier import SimpleClassifier
+
+logger = logging.getLogger(__name__)
+
+_STREAM = re.compile(rb'stream\r?\n(.*?)\r?\nendstream', re.S)
+# Operatory treści strony istotne dla tekstu: łańcuchy, tablice TJ, liczby i nazwy operatorów
+_TOKEN = re.compile(rb'\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>|\[|\]|/[^\s/\[\]()<>]+|-?\d*\.?\d+|[A-Za-z\'"*]+', re.S)
+_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+
+# Pozycja oferty: [Lp.] nazwa  ilość jednostka  cena [PLN]
+_LINE_ITEM = re.compile(
+    r'^(?:\d+[.)]\s+)?(?P<description>.+?)\s+(?P<quantity>\d+(?:[.,]\d+)?)\s*'
+    r'(?P<unit>szt\.?|sztuk|op\.?|opak\.?|kpl\.?|kg|m|l)\s+'
+    r'(?P<price>\d[\d ]*[.,]\d{2})\s*(?:PLN|zł|zl)?',
+    re.IGNORECASE
+)
+_SUPPLIER = re.compile(r'^(?:Dostawca|Sprzedawca|Oferent|Firma)\s*:\s*(?P<name>.+)$', re.IGNORECASE)
+
+
+def _unescape(literal):
+    """Treść łańcucha PDF (...) bez nawiasów i sekwencji ucieczki"""
+    out = bytearray()
+    i = 0
+    while i < len(literal):
+        char = literal[i:i + 1]
+        if char != b'\\':
+            out += char
+            i += 1
+            continue
+        following = literal[i + 1:i + 2]
+        octal = re.match(rb'[0-7]{1,3}', literal[i + 1:i + 4])
+        if octal:
+            out.append(int(octal.group(0), 8) & 0xFF)
+            i += 1 + len(octal.group(0))
+        else:
+            out += _ESCAPES.get(following, following)
+            i += 2
+    return bytes(out)
+
+
+def _decode_string(token):
+    if token.startswith(b'('):
+        return _unescape(token[1:-1]).decode('latin-1')
+    hex_digits = re.sub(rb'\s', b'', token[1:-1])
+    return bytes.fromhex(hex_digits.decode('ascii') + ('0' if len(hex_digits) % 2 else '')).decode('latin-1')
+
+
+def extract_pdf_text(pdf_bytes):
+    """Tekst dokumentu PDF, linia po linii (według położenia na stronie)
+
+    Obsługuje tekst zapisany łańcuchami w strumieniach treści (bez kompresji lub
+    FlateDecode) - tak zapisują oferty typowe generatory. Skany i czcionki
+    z kodowaniem CID nie są rozpoznawane.
+    """
+    lines = []
+    for stream in _STREAM.findall(pdf_bytes):
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        if b'BT' not in stream:
+            continue
+
+        fragments = []     # (y, x, tekst)
+        operands = []
+        x = y = 0.0
+        for token in _TOKEN.findall(stream):
+            if token[:1] in (b'(', b'<', b'[', b']', b'/') or re.match(rb'-?\d*\.?\d+$', token):
+                operands.append(token)
+                continue
+            if token == b'BT':
+                x = y = 0.0
+            elif token in (b'Td', b'TD') and len(operands) >= 2:
+                x += float(operands[-2])
+                y += float(operands[-1])
+            elif token == b'Tm' and len(operands) >= 6:
+                x, y = float(operands[-2]), float(operands[-1])
+            elif token in (b'T*', b"'", b'"'):
+                y -= 1.0
+            if token in (b'Tj', b"'", b'"', b'TJ'):
+                text = ''.join(_decode_string(t) for t in operands if t[:1] in (b'(', b'<'))
+                if text.strip():
+                    fragments.append((round(y, 1), x, text))
+            operands = []
+
+        # Fragmenty o tej samej wysokości tworzą jedną linię, od góry strony
+        page_lines = OrderedDict()
+        for y_pos, x_pos, text in sorted(fragments, key=lambda f: (-f[0], f[1])):
+            page_lines.setdefault(y_pos, []).append(text.strip())
+        lines.extend(' '.join(parts) for parts in page_lines.values())
+    return '\n'.join(lines)
+
+
+def _parse_number(value):
+    return float(value.replace(' ', '').replace(',', '.'))
+
+
+def extract_line_items(text):
+    """Dostawca i pozycje oferty (opis, ilość, jednostka, cena) z tekstu dokumentu"""
+    supplier_name = None
+    items = []
+    for line in text.splitlines():
+        line = ' '.join(line.split())
+        if supplier_name is None:
+            supplier_match = _SUPPLIER.match(line)
+            if supplier_match:
+                supplier_name = supplier_match.group('name').strip()
+                continue
+        item_match = _LINE_ITEM.match(line)
+        if item_match:
+            quantity = _parse_number(item_match.group('quantity'))
+            items.append({
+                'description': item_match.group('description').strip(),
+                'quantity': int(quantity) if quantity.is_integer() else quantity,
+                'unit': item_match.group('unit'),
+                'price': _parse_number(item_match.group('price'))
+            })
+    return {'supplier_name': supplier_name, 'items': items}
+
+
+def _extract(pdf_bytes):
+    """Ekstrakcja jednej oferty (w procesie roboczym)"""
+    text = extract_pdf_text(pdf_bytes)
+    return {'text': text, **extract_line_items(text)}
+
+
+class OfferIngestor:
+    """Oferty PDF -> pozycje dopasowane do katalogu -> szkice zamówień
+
+    Ekstrakcja tekstu z wielu plików działa w puli procesów, wyniki są
+    cache'owane po skrócie zawartości pliku - ponowne przesłanie tej samej
+    oferty nie jest przetwarzane drugi raz.
+    """
+
+    def __init__(self, products_df, max_workers=None, cache_size=512):
+        self.classifier = SimpleClassifier(products_df)
+        self.max_workers = max_workers or multiprocessing.cpu_count() or 1
+        self.cache_size = cache_size
+        self._cache = OrderedDict()     # skrót zawartości -> wynik przetworzenia oferty
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @staticmethod
+    def content_hash(pdf_bytes):
+        return hashlib.blake2b(pdf_bytes, digest_size=16).hexdigest()
+
+    def ingest(self, files):
+        """Przetwarza oferty [(nazwa, bajty), ...]; zwraca wyniki w tej samej kolejności"""
+        keys = [self.content_hash(pdf_bytes) for _, pdf_bytes in files]
+        results = {}
+        pending = OrderedDict()
+        with self._lock:
+            for key, (_, pdf_bytes) in zip(keys, files):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    results[key] = self._cache[key]
+                else:
+                    pending.setdefault(key, pdf_bytes)
+
+        for key, extracted in zip(pending, self._extract_all(list(pending.values()))):
+            results[key] = self._match(extracted)
+            if 'error' in extracted:
+                # Błąd mógł być przejściowy (np. awaria procesu roboczego) - ponowne przesłanie spróbuje jeszcze raz
+                continue
+            with self._lock:
+                self._cache[key] = results[key]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return [{**results[key], 'name': name, 'content_hash': key, 'cached': key not in pending}
+                for key, (name, _) in zip(keys, files)]
+
+    def _extract_all(self, documents):
+        # Pojedynczy plik szybciej przetworzyć od razu niż czekać na start procesów
+        if len(documents) <= 1 or self.max_workers <= 1:
+            return [self._safe_extract(pdf_bytes) for pdf_bytes in documents]
+        submitted = [self._submit(pdf_bytes) for pdf_bytes in documents]
+        results = []
+        for executor, future in submitted:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    # Proces roboczy zginął - kolejne oferty trafią już do nowej puli
+                    self._discard_executor(executor)
+                logger.error("❌ Błąd odczytu oferty PDF: %s", e)
+                results.append({'text': '', 'supplier_name': None, 'items': [], 'error': str(e)})
+        return results
+
+    def _safe_extract(self, pdf_bytes):
+        try:
+            return _extract(pdf_bytes)
+        except Exception as e:
+            logger.error("❌ Błąd odczytu oferty PDF: %s", e)
+            return {'text': '', 'supplier_name': None, 'items': [], 'error': str(e)}
+
+    def _submit(self, pdf_bytes):
+        """Zleca ekstrakcję; zwraca (pula, future)"""
+        executor = self._get_executor()
+        try:
+            return executor, executor.submit(_extract, pdf_bytes)
+        except BrokenProcessPool:
+            # Proces roboczy zginął - nowa pula i jedna ponowna próba
+            self._discard_executor(executor)
+            executor = self._get_executor()
+            return executor, executor.submit(_extract, pdf_bytes)
+
+    def _discard_executor(self, executor):
+        """Porzuca zepsutą pulę (tylko tę - inny wątek mógł już utworzyć nową)"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn - procesy nie dziedziczą wątków aplikacji (Streamlit, harmonogram)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _match(self, extracted):
+        """Dopasowanie pozycji oferty do produktów z katalogu"""
+        items = []
+        for item in extracted['items']:
+            classification = self.classifier.classify_request(item['description'])
+            items.append({
+                **item,
+                'product_id': classification.get('product_id'),
+                'product_name': classification.get('product_name'),
+                'category': classification.get('category', 'Inne'),
+                'confidence': round(float(classification.get('confidence', 0)), 3),
+                'found_in_catalog': classification.get('found_in_catalog', False)
+            })
+        return {**extracted, 'items': items}
+
+    def draft_orders(self, result, order_type='Standardowe'):
+        """Szkice zamówień (format save_order) dla pozycji oferty"""
+        now = datetime.now()
+        drafts = []
+        for item in result['items']:
+            drafts.append({
+                'order_id': f"ORD-{uuid.uuid4().hex[:8].upper()}",
+                'user_input': f"Oferta {result.get('name', '')}: {item['description']}",
+                'product_name': item['product_name'] or item['description'],
+                'category': item['category'],
+                'quantity': item['quantity'],
+                'unit': item['unit'],
+                'supplier_name': result.get('supplier_name') or 'Nieznany dostawca',
+                'price': item['price'],
+                'contract_type': 'oferta',
+                'order_type': order_type,
+                'timestamp': now.strftime("%Y-%m-%d %H:%M:%S"),
+                'estimated_delivery': (now + timedelta(days=7)).strftime("%Y-%m-%d"),
+                'delivery_status': 'ordered'
+            })
+        return drafts
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,154 @@
+"""Pakowanie starych PDF zamówień do segmentów archiwum
+
+Pliki z katalogu zamówień starsze niż zadany wiek trafiają do segmentów
+{output_dir}/archive/segment_NNNNN.zip (bez kompresji - PDF jest już
+skompresowany, a dane pliku leżą w segmencie w jednym ciągłym kawałku).
+Przesunięcie i długość danych każdego pliku są zapisywane w manifeście PDF,
+więc odczyt z archiwum to jedno seek + read, bez parsowania katalogu ZIP.
+
+Uruchomienie:
+  python -m modules.pdf_archive --max-age-days 30
+  python -m modules.pdf_archive --output-dir orders --max-age-days 0 --dry-run
+"""
+import argparse
+import logging
+import os
+import re
+import time
+import warnings
+import zipfile
+import zlib
+
+from modules.pdf_manifest import PDFManifest
+from modules.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+class PDFArchiver:
+    """Przenosi luźne pliki PDF starsze niż max_age_days do segmentów ZIP"""
+
+    _SEGMENT = re.compile(r'^segment_(\d+)\.zip$')
+
+    def __init__(self, output_dir='orders', max_age_days=30, segment_max_bytes=64 * 1024 * 1024):
+        self.output_dir = output_dir
+        self.max_age_days = max_age_days
+        self.segment_max_bytes = segment_max_bytes
+        self.archive_dir = os.path.join(output_dir, PDFManifest.ARCHIVE_DIR)
+        self.manifest = PDFManifest(output_dir)
+
+    def candidates(self, now=None):
+        """Luźne pliki starsze niż max_age_days: lista (order_id, ścieżka)"""
+        cutoff = (now or time.time()) - self.max_age_days * 86400
+        candidates = []
+        for order_id, path in self.manifest.loose_files():
+            try:
+                if os.path.getmtime(path) <= cutoff:
+                    candidates.append((order_id, path))
+            except OSError:
+                # Plik usunięty poza manifestem - nie ma czego archiwizować
+                continue
+        return candidates
+
+    def archive(self, now=None, dry_run=False):
+        """Pakuje stare pliki; zwraca liczbę zarchiwizowanych plików"""
+        candidates = self.candidates(now)
+        if dry_run or not candidates:
+            logger.info("📦 Plików PDF do archiwizacji: %s", len(candidates))
+            return len(candidates)
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        archived = 0
+        segment = self._current_segment()
+        while candidates:
+            packed, candidates = self._pack_segment(segment, candidates)
+            archived += self._commit(segment, packed)
+            if candidates:
+                segment = self._next_segment(segment)
+
+        logger.info("✅ Zarchiwizowano %s plików PDF w %s", archived, self.archive_dir)
+        return archived
+
+    def _pack_segment(self, segment, candidates):
+        """Dopisuje pliki do segmentu przy jednym otwarciu (katalog centralny zapisywany raz)
+
+        Zwraca spakowane pliki (order_id, ścieżka, ZipInfo) i te, które nie zmieściły się w segmencie.
+        """
+        packed = []
+        with zipfile.ZipFile(segment, 'a', compression=zipfile.ZIP_STORED) as archive:
+            for index, (order_id, path) in enumerate(candidates):
+                # start_dir - koniec danych plików, czyli bieżący rozmiar segmentu bez katalogu
+                if archive.start_dir >= self.segment_max_bytes:
+                    return packed, candidates[index:]
+                try:
+                    packed.append((order_id, path, self._pack(archive, path)))
+                except Exception as e:
+                    logger.warning("⚠️ Nie udało się zarchiwizować %s: %s", path, e)
+        return packed, []
+
+    def _pack(self, archive, path):
+        """Dopisuje plik do otwartego segmentu; zwraca jego ZipInfo"""
+        name = os.path.relpath(path, self.output_dir)
+        with open(path, 'rb') as f:
+            data = f.read()
+        existing = archive.NameToInfo.get(name)
+        if existing is not None and existing.file_size == len(data) and existing.CRC == zlib.crc32(data):
+            # Ten sam plik jest już w segmencie (przerwany poprzedni przebieg) - nie dopisujemy drugi raz
+            return existing
+        with warnings.catch_warnings():
+            # Nowsza wersja pliku o tej samej nazwie - manifest wskaże nowy wpis po jego przesunięciu
+            warnings.simplefilter('ignore', UserWarning)
+            archive.writestr(zipfile.ZipInfo.from_file(path, name), data)
+        return archive.filelist[-1]
+
+    def _commit(self, segment, packed):
+        """Po zamknięciu segmentu: przesunięcia danych -> wpisy w manifeście -> usunięcie plików
+
+        Przerwanie w dowolnym miejscu zostawia dokument dostępny.
+        """
+        if not packed:
+            return 0
+        with open(segment, 'rb') as raw:
+            offsets = [PDFManifest.member_data_offset(raw, info) for _, _, info in packed]
+
+        archived = 0
+        for (order_id, path, info), offset in zip(packed, offsets):
+            try:
+                self.manifest.archive(order_id, path, segment, offset, info.file_size)
+                os.remove(path)
+                archived += 1
+            except Exception as e:
+                logger.warning("⚠️ Nie udało się zarchiwizować %s: %s", path, e)
+        return archived
+
+    def _segments(self):
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(name for name in os.listdir(self.archive_dir) if self._SEGMENT.match(name))
+
+    def _current_segment(self):
+        segments = self._segments()
+        name = segments[-1] if segments else 'segment_00001.zip'
+        return os.path.join(self.archive_dir, name)
+
+    def _next_segment(self, segment):
+        number = int(self._SEGMENT.match(os.path.basename(segment)).group(1)) + 1
+        return os.path.join(self.archive_dir, f'segment_{number:05d}.zip')
+
+
+def main():
+    # Postęp i błędy archiwizacji (logger modułu) na stderr - także przy uruchomieniu z crona
+    configure_logging(os.environ.get('LOG_LEVEL'))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output-dir', default='orders', help='katalog z plikami PDF zamówień')
+    parser.add_argument('--max-age-days', type=float, default=30, help='archiwizuj pliki starsze niż tyle dni')
+    parser.add_argument('--segment-mb', type=float, default=64, help='maksymalny rozmiar segmentu (MB)')
+    parser.add_argument('--dry-run', action='store_true', help='tylko policz pliki do archiwizacji')
+    args = parser.parse_args()
+
+    archiver = PDFArchiver(args.output_dir, args.max_age_days, int(args.segment_mb * 1024 * 1024))
+    archiver.archive(dry_run=args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,66 @@
-from fpdf import FPDF
 import os
+import json
+import math
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from modules.pdf_manifest import PDFManifest
+from modules.metrics import METRICS, timed
+
+# Transliteracja polskich znaków - jedna tablica dla str.translate
+_TRANSLITERATION = str.maketrans({
+    'ą': 'a', 'ć': 'c', 'ę': 'e', 'ł': 'l', 'ń': 'n',
+    'ó': 'o', 'ś': 's', 'ź': 'z', 'ż': 'z',
+    'Ą': 'A', 'Ć': 'C', 'Ę': 'E', 'Ł': 'L', 'Ń': 'N',
+    'Ó': 'O', 'Ś': 'S', 'Ź': 'Z', 'Ż': 'Z'
+})
+
+# Stałe teksty dokumentu - transliterowane raz, przy imporcie modułu
+_STATIC_TEXT = {text: text.translate(_TRANSLITERATION) for text in [
+    'ZAMÓWIENIE', 'DANE STRON', 'ZAMAWIAJĄCY:', 'DOSTAWCA:',
+    'NAZWA PRODUKTU', 'ILOŚĆ', 'J.M.', 'CENA', 'WARTOŚĆ', 'RAZEM DO ZAPŁATY:',
+    'WARUNKI ZAMÓWIENIA', 'DODATKOWE INFORMACJE:',
+    'Podpis Zamawiającego', 'Podpis Dostawcy',
+    'Dokument wygenerowany automatycznie przez System Procurement AI'
+]}
+
+# Dane zamawiającego (stałe)
+_BUYER_LINES = [line.translate(_TRANSLITERATION) for line in [
+    "FIRMA EXAMPLE SP. Z O.O.",
+    "ul. Przykładowa 123",
+    "00-001 Warszawa",
+    "NIP: 1234567890",
+    "Tel: +48 22 123 45 67"
+]]
+
+_STATIC_TERMS = [term.translate(_TRANSLITERATION) for term in [
+    "Warunki płatności: 14 dni od daty faktury",
+    "Miejsce dostawy: siedziba Zamawiającego",
+    "Uwagi: Prosimy o potwierdzenie realizacji zamówienia"
+]]
 
 class PDFGenerator:
-    def __init__(self, output_dir='orders'):
+    # Pola zamówienia, od których zależy treść dokumentu
+    PDF_FIELDS = ['order_id', 'user_input', 'product_name', 'quantity', 'unit',
+                  'supplier_name', 'price', 'contract_type', 'estimated_delivery', 'timestamp']
+    
+    def __init__(self, output_dir='orders', deferred=False, cache_size=256):
         self.output_dir = output_dir
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
+        # Tryb odroczony: przy zatwierdzeniu nic nie jest renderowane, PDF powstaje przy pierwszym pobraniu
+        self.deferred = deferred
+        self.cache_size = cache_size
+        self._cache = OrderedDict()      # skrót treści -> bajty PDF (LRU)
+        self._cache_lock = threading.Lock()
+        self._manifest = None
     
     def _safe_text(self, text):
         """Zamienia polskie znaki na podstawowe znaki ASCII"""
         if not isinstance(text, str):
             text = str(text)
-        replacements = {
-            'ą': 'a', 'ć': 'c', 'ę': 'e', 'ł': 'l', 'ń': 'n',
-            'ó': 'o', 'ś': 's', 'ź': 'z', 'ż': 'z',
-            'Ą': 'A', 'Ć': 'C', 'Ę': 'E', 'Ł': 'L', 'Ń': 'N',
-            'Ó': 'O', 'Ś': 'S', 'Ź': 'Z', 'Ż': 'Z'
-        }
-        for pol, eng in replacements.items():
-            text = text.replace(pol, eng)
-        return text
+        return text.translate(_TRANSLITERATION)
     
     def _safe_float(self, value):
         """Bezpiecznie konwertuje wartość na float"""
@@ -35,34 +75,163 @@ class PDFGenerator:
         except (ValueError, TypeError):
             return 0.0
     
+    @timed('pdf_generator.generate_order_pdf')
     def generate_order_pdf(self, order_data):
-        """Generuje profesjonalny dokument zamówienia"""
+        """Generuje profesjonalny dokument zamówienia
+        
+        W trybie odroczonym nic nie renderuje i zwraca None - dokument powstanie
+        przy pierwszym wywołaniu get_order_pdf z wiersza zamówienia w orders.csv.
+        Wiersz zawiera wszystkie pola PDF_FIELDS (łącznie z datą zamówienia),
+        więc po restarcie aplikacji powstaje ten sam dokument.
+        """
+        if self.deferred:
+            return None
+        
+        pdf_bytes = self.render_order_pdf(order_data)
+        
+        # Zapisz plik
+        filename = f"Zamowienie_{order_data.get('order_id', 'BRAK')}_{datetime.now().strftime('%Y%m%d')}.pdf"
+        filepath = os.path.join(self.output_dir, filename)
+        with open(filepath, 'wb') as f:
+            f.write(pdf_bytes)
+        self.manifest.add(order_data.get('order_id', 'BRAK'), filepath)
+        
+        return filepath
+    
+    @property
+    def manifest(self):
+        """Indeks zamówienie -> pliki PDF (tworzony przy pierwszym użyciu)"""
+        if self._manifest is None:
+            self._manifest = PDFManifest(self.output_dir)
+        return self._manifest
+    
+    def find_order_pdfs(self, order_id):
+        """Zapisane pliki PDF zamówienia"""
+        return [path for path in self.manifest.paths(order_id) if os.path.exists(path)]
+    
+    def get_order_pdf(self, order_data):
+        """Bajty PDF zamówienia (np. dla st.download_button), renderowane przy pierwszym żądaniu
+        
+        order_data to wiersz zamówienia z orders.csv - w trybie odroczonym jedyne
+        źródło treści dokumentu.
+        """
+        # Dokument wygenerowany wcześniej - oryginał z dysku lub z archiwum
+        pdf_bytes = self.read_order_pdf(order_data.get('order_id'))
+        if pdf_bytes is not None:
+            return pdf_bytes
+        return self.render_order_pdf(order_data)
+    
+    def read_order_pdf(self, order_id):
+        """Zapisany PDF zamówienia (luźny plik lub archiwum) albo None"""
+        return self.manifest.read(order_id)
+    
+    @timed('pdf_generator.render_order_pdf')
+    def render_order_pdf(self, order_data):
+        """Renderuje dokument w pamięci; wynik jest cache'owany po skrócie treści zamówienia"""
+        payload = self._pdf_payload(order_data)
+        key = self.content_hash(payload)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                METRICS.inc('pdf_generator.cache_hit')
+                return cached
+        METRICS.inc('pdf_generator.cache_miss')
+        
+        pdf = self._draw(self._order_fields(payload))
+        pdf_bytes = pdf.output(dest='S').encode('latin-1')
+        
+        with self._cache_lock:
+            self._cache[key] = pdf_bytes
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return pdf_bytes
+    
+    def content_hash(self, order_data):
+        """Skrót pól zamówienia, od których zależy treść PDF"""
+        payload = json.dumps(self._pdf_payload(order_data), sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _pdf_payload(self, order_data):
+        """Pola dokumentu bez pustych wartości (NaN z orders.csv -> wartości domyślne)"""
+        return {field: order_data[field] for field in self.PDF_FIELDS
+                if field in order_data and order_data[field] is not None
+                and not (isinstance(order_data[field], float) and math.isnan(order_data[field]))}
+    
+    def _order_fields(self, order_data):
+        """Teksty zmienne dokumentu (już po transliteracji)
+        
+        Obie daty dokumentu pochodzą z pola timestamp zamówienia, więc ponowne
+        renderowanie (tryb odroczony, cache) daje ten sam dokument. Bez
+        poprawnej daty używany jest bieżący czas.
+        """
+        try:
+            order_time = datetime.strptime(str(order_data['timestamp']), '%Y-%m-%d %H:%M:%S')
+        except (KeyError, ValueError):
+            order_time = datetime.now()
+        quantity = self._safe_float(order_data.get('quantity', 1))
+        price = self._safe_float(order_data.get('price', 0.0))
+        value = quantity * price
+        
+        # Termin dostawy
+        estimated_delivery = order_data.get('estimated_delivery', 'Nieokreślony')
+        if estimated_delivery != 'Nieokreślony':
+            try:
+                delivery_date = datetime.strptime(estimated_delivery, '%Y-%m-%d')
+                estimated_delivery = delivery_date.strftime('%d.%m.%Y')
+            except (ValueError, TypeError):
+                pass
+        
+        fields = {
+            'order_number': f"Numer: {order_data.get('order_id', 'BRAK')}",
+            'order_date': f"Data: {order_time.strftime('%d.%m.%Y')}",
+            'supplier_name': order_data.get('supplier_name', 'Nieznany dostawca'),
+            'product_name': order_data.get('product_name', 'Nieznany produkt'),
+            'quantity': str(int(quantity)),
+            'unit': order_data.get('unit', 'szt.'),
+            'price': f"{price:.2f} PLN",
+            'value': f"{value:.2f} PLN",
+            'delivery': f"Termin dostawy: {estimated_delivery}",
+            'contract_type': f"Forma dostawy: {order_data.get('contract_type', 'oferta')}",
+            'generated': f'Wygenerowano: {order_time.strftime("%d.%m.%Y %H:%M")}'
+        }
+        fields = {name: self._safe_text(text) for name, text in fields.items()}
+        
+        # Długi tekst dzielimy na linie
+        user_input = order_data.get('user_input')
+        fields['user_input'] = [self._safe_text(line) for line in self._split_text(str(user_input), 80)] if user_input else None
+        return fields
+    
+    def prewarm(self):
+        """Import FPDF i metryki czcionek dokumentu z wyprzedzeniem (bez zapisu do cache)"""
+        self._draw(self._order_fields({'user_input': 'prewarm'}))
+    
+    def _draw(self, fields):
+        """Rysuje dokument z przygotowanych tekstów"""
+        # FPDF importowany przy pierwszym renderowaniu - nie spowalnia startu aplikacji
+        from fpdf import FPDF
+        
         pdf = FPDF()
         pdf.add_page()
         
         # Nagłówek dokumentu
-        self._add_header(pdf, order_data)
+        self._add_header(pdf, fields)
         
         # Sekcja danych zamawiającego i dostawcy
-        self._add_company_info(pdf, order_data)
+        self._add_company_info(pdf, fields)
         
         # Tabela z produktami
-        self._add_products_table(pdf, order_data)
+        self._add_products_table(pdf, fields)
         
         # Sekcja warunków zamówienia
-        self._add_terms_section(pdf, order_data)
+        self._add_terms_section(pdf, fields)
         
         # Stopka z podpisami
-        self._add_footer(pdf)
-        
-        # Zapisz plik
-        filename = f"Zamowienie_{order_data.get('order_id', 'BRAK')}_{datetime.now().strftime('%Y%m%d')}.pdf"
-        filepath = os.path.join(self.output_dir, filename)
-        pdf.output(filepath)
+        self._add_footer(pdf, fields)
         
-        return filepath
+        return pdf
     
-    def _add_header(self, pdf, order_data):
+    def _add_header(self, pdf, fields):
         """Dodaje nagłówek dokumentu"""
         # Tło nagłówka
         pdf.set_fill_color(240, 240, 240)
@@ -70,137 +239,102 @@ class PDFGenerator:
         
         # Tytuł
         pdf.set_font('Arial', 'B', 16)
-        pdf.cell(190, 10, self._safe_text('ZAMÓWIENIE'), 0, 1, 'C')
+        pdf.cell(190, 10, _STATIC_TEXT['ZAMÓWIENIE'], 0, 1, 'C')
         
         # Numer zamówienia i data
         pdf.set_font('Arial', 'B', 12)
-        pdf.cell(95, 8, self._safe_text(f"Numer: {order_data.get('order_id', 'BRAK')}"), 0, 0, 'L')
-        pdf.cell(95, 8, self._safe_text(f"Data: {datetime.now().strftime('%d.%m.%Y')}"), 0, 1, 'R')
+        pdf.cell(95, 8, fields['order_number'], 0, 0, 'L')
+        pdf.cell(95, 8, fields['order_date'], 0, 1, 'R')
         
         pdf.ln(5)
     
-    def _add_company_info(self, pdf, order_data):
+    def _add_company_info(self, pdf, fields):
         """Dodaje informacje o firmie i dostawcy"""
         # Nagłówek sekcji
         pdf.set_font('Arial', 'B', 12)
-        pdf.cell(190, 8, self._safe_text('DANE STRON'), 0, 1, 'L')
+        pdf.cell(190, 8, _STATIC_TEXT['DANE STRON'], 0, 1, 'L')
         pdf.line(10, pdf.get_y(), 200, pdf.get_y())
         pdf.ln(3)
         
         # Dwie kolumny: Zamawiający i Dostawca
         pdf.set_font('Arial', 'B', 10)
-        pdf.cell(95, 6, self._safe_text('ZAMAWIAJĄCY:'), 0, 0, 'L')
-        pdf.cell(95, 6, self._safe_text('DOSTAWCA:'), 0, 1, 'L')
+        pdf.cell(95, 6, _STATIC_TEXT['ZAMAWIAJĄCY:'], 0, 0, 'L')
+        pdf.cell(95, 6, _STATIC_TEXT['DOSTAWCA:'], 0, 1, 'L')
         
         pdf.set_font('Arial', '', 10)
         
         # Dane zamawiającego (stałe)
-        zamawiajacy = [
-            "FIRMA EXAMPLE SP. Z O.O.",
-            "ul. Przykładowa 123",
-            "00-001 Warszawa",
-            "NIP: 1234567890",
-            "Tel: +48 22 123 45 67"
-        ]
-        
-        for line in zamawiajacy:
-            pdf.cell(95, 5, self._safe_text(line), 0, 0, 'L')
+        for line in _BUYER_LINES:
+            pdf.cell(95, 5, line, 0, 0, 'L')
             pdf.cell(95, 5, '', 0, 1, 'L')
         
         pdf.ln(2)
         
         # Dane dostawcy
-        dostawca_nazwa = order_data.get('supplier_name', 'Nieznany dostawca')
         pdf.cell(95, 5, '', 0, 0, 'L')
-        pdf.cell(95, 5, self._safe_text(dostawca_nazwa), 0, 1, 'L')
+        pdf.cell(95, 5, fields['supplier_name'], 0, 1, 'L')
         
         pdf.ln(8)
     
-    def _add_products_table(self, pdf, order_data):
+    def _add_products_table(self, pdf, fields):
         """Dodaje tabelę z produktami"""
-        # Bezpieczne pobranie i konwersja wartości liczbowych
-        quantity = self._safe_float(order_data.get('quantity', 1))
-        price = self._safe_float(order_data.get('price', 0.0))
-        value = quantity * price
-        
-        product_name = order_data.get('product_name', 'Nieznany produkt')
-        unit = order_data.get('unit', 'szt.')
-        
         # Nagłówek tabeli
         pdf.set_fill_color(200, 200, 200)
         pdf.set_font('Arial', 'B', 10)
         
-        pdf.cell(100, 8, self._safe_text('NAZWA PRODUKTU'), 1, 0, 'C', True)
-        pdf.cell(20, 8, self._safe_text('ILOŚĆ'), 1, 0, 'C', True)
-        pdf.cell(25, 8, self._safe_text('J.M.'), 1, 0, 'C', True)
-        pdf.cell(25, 8, self._safe_text('CENA'), 1, 0, 'C', True)
-        pdf.cell(20, 8, self._safe_text('WARTOŚĆ'), 1, 1, 'C', True)
+        pdf.cell(100, 8, _STATIC_TEXT['NAZWA PRODUKTU'], 1, 0, 'C', True)
+        pdf.cell(20, 8, _STATIC_TEXT['ILOŚĆ'], 1, 0, 'C', True)
+        pdf.cell(25, 8, _STATIC_TEXT['J.M.'], 1, 0, 'C', True)
+        pdf.cell(25, 8, _STATIC_TEXT['CENA'], 1, 0, 'C', True)
+        pdf.cell(20, 8, _STATIC_TEXT['WARTOŚĆ'], 1, 1, 'C', True)
         
         # Wiersz z produktem
         pdf.set_font('Arial', '', 10)
         
-        pdf.cell(100, 8, self._safe_text(product_name), 1, 0, 'L')
-        pdf.cell(20, 8, self._safe_text(str(int(quantity))), 1, 0, 'C')
-        pdf.cell(25, 8, self._safe_text(unit), 1, 0, 'C')
-        pdf.cell(25, 8, self._safe_text(f"{price:.2f} PLN"), 1, 0, 'R')
-        pdf.cell(20, 8, self._safe_text(f"{value:.2f} PLN"), 1, 1, 'R')
+        pdf.cell(100, 8, fields['product_name'], 1, 0, 'L')
+        pdf.cell(20, 8, fields['quantity'], 1, 0, 'C')
+        pdf.cell(25, 8, fields['unit'], 1, 0, 'C')
+        pdf.cell(25, 8, fields['price'], 1, 0, 'R')
+        pdf.cell(20, 8, fields['value'], 1, 1, 'R')
         
         pdf.ln(5)
         
         # Podsumowanie
         pdf.set_font('Arial', 'B', 10)
-        pdf.cell(145, 8, self._safe_text('RAZEM DO ZAPŁATY:'), 0, 0, 'R')
-        pdf.cell(45, 8, self._safe_text(f"{value:.2f} PLN"), 1, 1, 'R')
+        pdf.cell(145, 8, _STATIC_TEXT['RAZEM DO ZAPŁATY:'], 0, 0, 'R')
+        pdf.cell(45, 8, fields['value'], 1, 1, 'R')
         
         pdf.ln(8)
     
-    def _add_terms_section(self, pdf, order_data):
+    def _add_terms_section(self, pdf, fields):
         """Dodaje sekcję warunków zamówienia"""
         # Nagłówek sekcji
         pdf.set_font('Arial', 'B', 12)
-        pdf.cell(190, 8, self._safe_text('WARUNKI ZAMÓWIENIA'), 0, 1, 'L')
+        pdf.cell(190, 8, _STATIC_TEXT['WARUNKI ZAMÓWIENIA'], 0, 1, 'L')
         pdf.line(10, pdf.get_y(), 200, pdf.get_y())
         pdf.ln(3)
         
         pdf.set_font('Arial', '', 10)
         
-        # Termin dostawy
-        estimated_delivery = order_data.get('estimated_delivery', 'Nieokreślony')
-        if estimated_delivery != 'Nieokreślony':
-            try:
-                delivery_date = datetime.strptime(estimated_delivery, '%Y-%m-%d')
-                estimated_delivery = delivery_date.strftime('%d.%m.%Y')
-            except:
-                pass
-        
-        terms = [
-            f"Termin dostawy: {estimated_delivery}",
-            f"Forma dostawy: {order_data.get('contract_type', 'oferta')}",
-            "Warunki płatności: 14 dni od daty faktury",
-            "Miejsce dostawy: siedziba Zamawiającego",
-            "Uwagi: Prosimy o potwierdzenie realizacji zamówienia"
-        ]
+        terms = [fields['delivery'], fields['contract_type']] + _STATIC_TERMS
         
         for term in terms:
-            pdf.cell(190, 5, self._safe_text(term), 0, 1, 'L')
+            pdf.cell(190, 5, term, 0, 1, 'L')
         
         pdf.ln(5)
         
         # Dodatkowe informacje
-        if order_data.get('user_input'):
+        if fields['user_input'] is not None:
             pdf.set_font('Arial', 'B', 10)
-            pdf.cell(190, 6, self._safe_text('DODATKOWE INFORMACJE:'), 0, 1, 'L')
+            pdf.cell(190, 6, _STATIC_TEXT['DODATKOWE INFORMACJE:'], 0, 1, 'L')
             pdf.set_font('Arial', '', 9)
             
-            # Długi tekst dzielimy na linie
-            user_input = order_data.get('user_input', '')
-            lines = self._split_text(user_input, 80)
-            for line in lines:
-                pdf.cell(190, 4, self._safe_text(line), 0, 1, 'L')
+            for line in fields['user_input']:
+                pdf.cell(190, 4, line, 0, 1, 'L')
             
             pdf.ln(5)
     
-    def _add_footer(self, pdf):
+    def _add_footer(self, pdf, fields):
         """Dodaje stopkę z podpisami"""
         pdf.ln(10)
         
@@ -212,16 +346,16 @@ class PDFGenerator:
         
         # Podpisy
         pdf.set_font('Arial', '', 9)
-        pdf.cell(70, 5, self._safe_text('Podpis Zamawiającego'), 0, 0, 'C')
+        pdf.cell(70, 5, _STATIC_TEXT['Podpis Zamawiającego'], 0, 0, 'C')
         pdf.cell(50, 5, '', 0, 0, 'C')
-        pdf.cell(70, 5, self._safe_text('Podpis Dostawcy'), 0, 1, 'C')
+        pdf.cell(70, 5, _STATIC_TEXT['Podpis Dostawcy'], 0, 1, 'C')
         
         pdf.ln(15)
         
         # Informacja o dokumencie
         pdf.set_font('Arial', 'I', 8)
-        pdf.cell(190, 4, self._safe_text('Dokument wygenerowany automatycznie przez System Procurement AI'), 0, 1, 'C')
-        pdf.cell(190, 4, self._safe_text(f'Wygenerowano: {datetime.now().strftime("%d.%m.%Y %H:%M")}'), 0, 1, 'C')
+        pdf.cell(190, 4, _STATIC_TEXT['Dokument wygenerowany automatycznie przez System Procurement AI'], 0, 1, 'C')
+        pdf.cell(190, 4, fields['generated'], 0, 1, 'C')
     
     def _split_text(self, text, max_length):
         """Dzieli tekst na linie o określonej maksymalnej długości"""
@@ -0,0 +1,241 @@
+import logging
+import os
+import re
+import json
+import zlib
+import zipfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+class PDFManifest:
+    """Indeks zamówienie -> pliki PDF w katalogu zamówień
+
+    Zapisywany jako plik JSONL tylko do dopisywania (manifest.jsonl), więc
+    wyszukanie i usunięcie dokumentów nie wymaga listowania katalogu. Dopiski
+    z innych procesów (np. puli generowania PDF) są doczytywane przyrostowo.
+    Dla plików spakowanych do archiwum manifest przechowuje segment oraz
+    przesunięcie i długość danych w segmencie.
+    """
+
+    FILENAME = 'manifest.jsonl'
+    ARCHIVE_DIR = 'archive'
+
+    # Zamowienie_{order_id}_{RRRRMMDD}.pdf - order_id wprost z nazwy
+    _NAMED_PDF = re.compile(r'^Zamowienie_(.+)_\d{8}\.pdf$')
+    # Starsze pliki order_RRRRMMDD_GGMMSS.pdf - order_id tylko w treści dokumentu
+    _ORDER_NUMBER = re.compile(rb'\(Numer: ([^)]+)\)')
+
+    def __init__(self, output_dir='orders'):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, self.FILENAME)
+        self._lock = threading.Lock()
+        self._entries = {}     # order_id -> lista nazw plików (względem output_dir)
+        self._archived = {}    # nazwa pliku -> (segment, przesunięcie, długość)
+        self._offset = 0       # ile bajtów manifestu już wczytano
+
+        if not os.path.exists(self.path):
+            self.rebuild()
+        self._refresh()
+
+    def add(self, order_id, path):
+        """Rejestruje plik PDF zamówienia"""
+        self._append({'op': 'add', 'order_id': order_id, 'file': os.path.relpath(path, self.output_dir)})
+
+    def archive(self, order_id, path, segment, offset, size):
+        """Rejestruje przeniesienie pliku do segmentu archiwum"""
+        self._append({
+            'op': 'archive',
+            'order_id': order_id,
+            'file': os.path.relpath(path, self.output_dir),
+            'segment': os.path.relpath(segment, self.output_dir),
+            'offset': offset,
+            'size': size
+        })
+
+    def paths(self, order_id):
+        """Ścieżki luźnych (niezarchiwizowanych) plików PDF zamówienia"""
+        return [location['path'] for location in self.locations(order_id) if 'segment' not in location]
+
+    def locations(self, order_id):
+        """Położenie dokumentów zamówienia: plik na dysku albo zakres bajtów w segmencie archiwum"""
+        self._refresh()
+        with self._lock:
+            locations = []
+            for name in self._entries.get(order_id, []):
+                archived = self._archived.get(name)
+                if archived is None:
+                    locations.append({'file': name, 'path': os.path.join(self.output_dir, name)})
+                else:
+                    segment, offset, size = archived
+                    locations.append({'file': name, 'segment': os.path.join(self.output_dir, segment),
+                                      'offset': offset, 'size': size})
+            return locations
+
+    def read(self, order_id):
+        """Bajty PDF zamówienia: cały luźny plik albo tylko jego zakres bajtów w segmencie archiwum
+
+        Przy kilku dokumentach zamówienia zwracany jest najnowszy zarejestrowany.
+        """
+        for location in reversed(self.locations(order_id)):
+            try:
+                if 'segment' not in location:
+                    with open(location['path'], 'rb') as f:
+                        return f.read()
+                with open(location['segment'], 'rb') as f:
+                    f.seek(location['offset'])
+                    return f.read(location['size'])
+            except OSError:
+                continue
+        return None
+
+    def loose_files(self):
+        """Pary (order_id, ścieżka) dla plików, które nie są jeszcze w archiwum"""
+        self._refresh()
+        with self._lock:
+            return [(order_id, os.path.join(self.output_dir, name))
+                    for order_id, names in self._entries.items()
+                    for name in names if name not in self._archived]
+
+    def remove(self, order_id):
+        """Usuwa wpis zamówienia z manifestu; zwraca ścieżki luźnych plików, które do niego należały
+
+        Dane w segmentach archiwum zostają (segmenty są tylko do dopisywania),
+        ale po usunięciu wpisu nie są już dostępne.
+        """
+        locations = self.locations(order_id)
+        if locations:
+            self._append({'op': 'remove', 'order_id': order_id})
+        return [location['path'] for location in locations if 'segment' not in location]
+
+    def rebuild(self):
+        """Jednorazowa migracja: indeksuje istniejące pliki i archiwa, zapisuje zwarty manifest"""
+        records = []
+        # Najpierw archiwa, potem luźne pliki - luźny plik o tej samej nazwie jest nowszy
+        archive_dir = os.path.join(self.output_dir, self.ARCHIVE_DIR)
+        if os.path.isdir(archive_dir):
+            for segment_name in sorted(os.listdir(archive_dir)):
+                if segment_name.endswith('.zip'):
+                    records.extend(self._segment_records(os.path.join(self.ARCHIVE_DIR, segment_name)))
+
+        if os.path.isdir(self.output_dir):
+            for name in sorted(os.listdir(self.output_dir)):
+                if not name.endswith('.pdf'):
+                    continue
+                order_id = self._order_id_for(name)
+                if order_id is None:
+                    logger.warning("⚠️ Nie rozpoznano zamówienia w pliku %s", name)
+                    continue
+                records.append({'op': 'add', 'order_id': order_id, 'file': name})
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(temp_path, self.path)
+
+        with self._lock:
+            self._entries = {}
+            self._archived = {}
+            self._offset = 0
+        indexed = sum(1 for record in records if record['op'] == 'add')
+        logger.info("✅ Zindeksowano %s plików PDF", indexed)
+        return indexed
+
+    def _segment_records(self, segment):
+        """Wpisy dla wszystkich dokumentów segmentu (katalog centralny ZIP + nagłówki lokalne)"""
+        records = []
+        path = os.path.join(self.output_dir, segment)
+        with zipfile.ZipFile(path) as archive, open(path, 'rb') as raw:
+            for info in archive.infolist():
+                offset = self.member_data_offset(raw, info)
+                raw.seek(offset)
+                order_id = self._order_id_for(info.filename, raw.read(info.file_size))
+                if order_id is None:
+                    continue
+                records.append({'op': 'add', 'order_id': order_id, 'file': info.filename})
+                records.append({'op': 'archive', 'order_id': order_id, 'file': info.filename,
+                                'segment': segment, 'offset': offset, 'size': info.file_size})
+        return records
+
+    @staticmethod
+    def member_data_offset(raw, info):
+        """Przesunięcie danych pliku w ZIP: nagłówek lokalny ma zmienną długość nazwy i pola extra"""
+        raw.seek(info.header_offset + 26)
+        header = raw.read(4)
+        name_length = int.from_bytes(header[0:2], 'little')
+        extra_length = int.from_bytes(header[2:4], 'little')
+        return info.header_offset + 30 + name_length + extra_length
+
+    def _order_id_for(self, name, content=None):
+        match = self._NAMED_PDF.match(os.path.basename(name))
+        if match:
+            return match.group(1)
+        if content is None:
+            try:
+                with open(os.path.join(self.output_dir, name), 'rb') as f:
+                    content = f.read()
+            except OSError:
+                return None
+
+        # Numer zamówienia z (zwykle skompresowanej) treści strony
+        for stream in re.findall(rb'stream\r?\n(.*?)\r?\nendstream', content, re.S):
+            try:
+                stream = zlib.decompress(stream)
+            except zlib.error:
+                pass
+            match = self._ORDER_NUMBER.search(stream)
+            if match:
+                return match.group(1).decode('latin-1')
+        return None
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            # Jedno dopisanie na rekord - bezpieczne przy kilku procesach piszących
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        self._refresh()
+
+    def _refresh(self):
+        """Doczytuje rekordy dopisane od ostatniego odczytu"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        with self._lock:
+            if size < self._offset:
+                # Manifest przebudowany - wczytaj od nowa
+                self._entries = {}
+                self._archived = {}
+                self._offset = 0
+            if size == self._offset:
+                return
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+            # Tylko pełne linie - niedokończony dopisek zostanie doczytany później
+            complete = data[:data.rfind(b'\n') + 1]
+            self._offset += len(complete)
+            for line in complete.decode('utf-8').splitlines():
+                if line.strip():
+                    self._apply(json.loads(line))
+
+    def _apply(self, record):
+        order_id = record['order_id']
+        if record['op'] == 'add':
+            # Ponownie wygenerowany plik zastępuje wcześniej zarchiwizowaną wersję i staje się najnowszy
+            files = self._entries.setdefault(order_id, [])
+            if record['file'] in files:
+                files.remove(record['file'])
+            files.append(record['file'])
+            self._archived.pop(record['file'], None)
+        elif record['op'] == 'archive':
+            files = self._entries.setdefault(order_id, [])
+            if record['file'] not in files:
+                files.append(record['file'])
+            self._archived[record['file']] = (record['segment'], record['offset'], record['size'])
+        elif record['op'] == 'remove':
+            for name in self._entries.pop(order_id, []):
+                self._archived.pop(name, None)
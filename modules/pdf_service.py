@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+import uuid
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from modules.pdf_generator import PDFGenerator
+from modules.pdf_manifest import PDFManifest
+from modules.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Generator PDF procesu roboczego - tworzony raz na proces
+_GENERATOR = None
+
+def _init_worker(output_dir):
+    global _GENERATOR
+    _GENERATOR = PDFGenerator(output_dir)
+
+def _render(order_data):
+    """Renderuje jeden dokument w procesie roboczym; zwraca ścieżkę i czas renderowania"""
+    started = time.perf_counter()
+    path = _GENERATOR.generate_order_pdf(order_data)
+    return path, time.perf_counter() - started
+
+
+class PDFRenderService:
+    """Generowanie PDF zamówień w puli procesów z ograniczoną kolejką
+
+    submit() wraca od razu z identyfikatorem zadania. Gdy w kolejce jest już
+    max_pending dokumentów, zgłoszenie jest odrzucane (block=False) albo czeka
+    na wolne miejsce (block=True) - to ogranicza pamięć i opóźnienia przy
+    zalewie zleceń.
+    """
+
+    def __init__(self, output_dir='orders', max_workers=None, max_pending=64, keep_finished=500):
+        self.output_dir = output_dir
+        self.max_workers = max_workers or multiprocessing.cpu_count() or 1
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._jobs = OrderedDict()    # job_id -> opis zadania (ostatnie keep_finished zakończonych)
+
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'rejected': 0,
+            'render_seconds_total': 0.0
+        }
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Manifest PDF powstaje przed startem procesów, które będą do niego dopisywać
+                PDFManifest(self.output_dir)
+                # spawn - procesy nie dziedziczą wątków aplikacji (Streamlit, harmonogram)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.output_dir,)
+                )
+            return self._executor
+
+    def submit(self, order_data, block=False, timeout=None):
+        """Zleca wygenerowanie PDF; zwraca job_id albo None, gdy kolejka jest pełna"""
+        return self._submit_job(order_data, block, timeout)[0]
+
+    def _submit_job(self, order_data, block=False, timeout=None):
+        """(job_id, future) albo (None, None), gdy kolejka jest pełna"""
+        if not self._slots.acquire(blocking=block, timeout=timeout if block else None):
+            with self._lock:
+                self.stats['rejected'] += 1
+            METRICS.inc('pdf_service.rejected')
+            logger.warning("⚠️ Kolejka PDF pełna (%s) - odrzucono zamówienie %s", self.max_pending, order_data.get('order_id'))
+            return None, None
+
+        job_id = uuid.uuid4().hex[:12]
+        try:
+            future = self._submit_future(dict(order_data))
+        except Exception as e:
+            self._slots.release()
+            logger.error("❌ Błąd zlecenia generowania PDF: %s", e)
+            return None, None
+
+        with self._lock:
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'order_id': order_data.get('order_id'),
+                'submitted': time.time(),
+                'future': future
+            }
+            self.stats['submitted'] += 1
+        future.add_done_callback(lambda f, job_id=job_id: self._on_done(job_id, f))
+        return job_id, future
+
+    def _submit_future(self, order_data):
+        try:
+            return self._get_executor().submit(_render, order_data)
+        except BrokenProcessPool:
+            # Proces roboczy zginął - nowa pula i jedna ponowna próba
+            with self._lock:
+                self._executor = None
+            return self._get_executor().submit(_render, order_data)
+
+    def _on_done(self, job_id, future):
+        self._slots.release()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job['finished'] = time.time()
+            if future.cancelled():
+                # Np. zamknięcie puli z zadaniami w kolejce - future.exception() rzuciłby CancelledError
+                job['cancelled'] = True
+                self.stats['cancelled'] += 1
+                logger.warning("⚠️ Anulowano generowanie PDF dla %s", job['order_id'])
+                self._trim_finished()
+                return
+            error = future.exception()
+            if error is None:
+                job['path'], render_seconds = future.result()
+                self.stats['completed'] += 1
+                self.stats['render_seconds_total'] += render_seconds
+                # Renderowanie odbywa się w innym procesie - czas przekazany z wynikiem zadania
+                METRICS.observe('pdf_service.render', render_seconds)
+            else:
+                job['error'] = str(error)
+                self.stats['failed'] += 1
+                logger.error("❌ Błąd generowania PDF dla %s: %s", job['order_id'], error)
+            self._trim_finished()
+
+    def _trim_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if 'finished' in job]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    def future(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job['future'] if job else None
+
+    def status(self, job_id):
+        """Stan zadania: pending / running / done / error / cancelled / unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return {'job_id': job_id, 'status': 'unknown'}
+            future = job['future']
+            if job.get('cancelled'):
+                state = 'cancelled'
+            elif 'error' in job:
+                state = 'error'
+            elif future.done():
+                state = 'done'
+            elif future.running():
+                state = 'running'
+            else:
+                state = 'pending'
+            return {
+                'job_id': job_id,
+                'order_id': job['order_id'],
+                'status': state,
+                'path': job.get('path'),
+                'error': job.get('error')
+            }
+
+    def result(self, job_id, timeout=None):
+        """Czeka na zakończenie zadania i zwraca ścieżkę PDF"""
+        future = self.future(job_id)
+        if future is None:
+            return None
+        path, _ = future.result(timeout=timeout)
+        return path
+
+    def render_many(self, orders, timeout=None):
+        """Generowanie hurtowe na wszystkich rdzeniach; zwraca ścieżki w kolejności zamówień"""
+        # Futures trzymane lokalnie - zakończone zadania mogą już zniknąć z _jobs (keep_finished)
+        futures = [self._submit_job(order_data, block=True)[1] for order_data in orders]
+        paths = []
+        for future in futures:
+            try:
+                paths.append(future.result(timeout=timeout)[0] if future is not None else None)
+            except Exception:
+                paths.append(None)
+        return paths
+
+    def get_status(self):
+        """Metryki usługi: kolejka, liczniki, średni czas renderowania"""
+        with self._lock:
+            status = dict(self.stats)
+            status['pending'] = sum(1 for job in self._jobs.values() if 'finished' not in job)
+        status['max_pending'] = self.max_pending
+        status['workers'] = self.max_workers
+        status['avg_render_ms'] = (round(status['render_seconds_total'] / status['completed'] * 1000, 2)
+                                   if status['completed'] else None)
+        return status
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,133 @@
+import logging
+import os
+import io
+import math
+import time
+import random
+import pstats
+import cProfile
+import functools
+import threading
+import tracemalloc
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class Profiler:
+    """Opcjonalne profilowanie wybranych operacji (cProfile + tracemalloc)
+
+    Włączane zmienną PROFILE_ENABLED=1 albo przełącznikiem w panelu bocznym.
+    Profilowane jest tylko sample_rate wywołań (np. 0.05 = co dwudzieste),
+    naraz najwyżej jedno - można zostawić włączone pod obciążeniem. Każde
+    profilowane wywołanie zapisuje raport tekstowy (najdroższe funkcje,
+    miejsca alokacji pamięci) i plik .prof w output_dir.
+    """
+
+    def __init__(self, output_dir='profiles', enabled=False, sample_rate=1.0, top=25, memory=True):
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.top = top
+        self.memory = memory
+        # Jedno profilowanie naraz: cProfile i tracemalloc nie zagnieżdżają się sensownie
+        self._busy = threading.Lock()
+        self.stats = {'calls': 0, 'profiled': 0, 'skipped_busy': 0}
+
+    def profiled(self, name):
+        """Dekorator: wywołanie jest profilowane, gdy profilowanie jest włączone i wylosowane"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                self.stats['calls'] += 1
+                if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                    return func(*args, **kwargs)
+                if not self._busy.acquire(blocking=False):
+                    self.stats['skipped_busy'] += 1
+                    return func(*args, **kwargs)
+                try:
+                    return self._run(name, func, args, kwargs)
+                finally:
+                    self._busy.release()
+            return wrapper
+        return decorate
+
+    def _run(self, name, func, args, kwargs):
+        started_tracing = False
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        before = tracemalloc.take_snapshot() if self.memory else None
+        if self.memory:
+            tracemalloc.reset_peak()
+
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            after = tracemalloc.take_snapshot() if self.memory else None
+            peak = tracemalloc.get_traced_memory()[1] if self.memory else None
+            if started_tracing:
+                tracemalloc.stop()
+            self.stats['profiled'] += 1
+            try:
+                self._write_report(name, elapsed, profile, before, after, peak)
+            except Exception as e:
+                logger.warning("⚠️ Nie udało się zapisać raportu profilowania %s: %s", name, e)
+
+    def _write_report(self, name, elapsed, profile, before, after, peak):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}_{name}")
+
+        stream = io.StringIO()
+        stream.write(f"Operacja: {name}\n")
+        stream.write(f"Czas: {elapsed * 1000:.1f} ms\n")
+        if peak is not None:
+            stream.write(f"Szczyt pamięci (tracemalloc): {peak / 1024 / 1024:.2f} MB\n")
+
+        stream.write(f"\n=== Najdroższe funkcje (czas łączny, top {self.top}) ===\n")
+        pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(self.top)
+
+        if before is not None and after is not None:
+            stream.write(f"\n=== Miejsca alokacji (przyrost podczas operacji, top {self.top}) ===\n")
+            for stat in after.compare_to(before, 'lineno')[:self.top]:
+                stream.write(f"{stat}\n")
+
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(stream.getvalue())
+        profile.dump_stats(base + '.prof')
+        logger.info("🔬 Raport profilowania: %s.txt", base)
+
+    def reports(self, limit=20):
+        """Najnowsze raporty tekstowe (ścieżki)"""
+        if not os.path.isdir(self.output_dir):
+            return []
+        names = sorted((name for name in os.listdir(self.output_dir) if name.endswith('.txt')), reverse=True)
+        return [os.path.join(self.output_dir, name) for name in names[:limit]]
+
+
+def _sample_rate(value, default=1.0):
+    """Część profilowanych wywołań ze zmiennej środowiskowej (0-1); niepoprawna wartość -> domyślna"""
+    try:
+        rate = float(value)
+    except (TypeError, ValueError):
+        rate = math.nan
+    if math.isnan(rate):
+        logger.warning("⚠️ Niepoprawne PROFILE_SAMPLE_RATE=%r - używam %s", value, default)
+        return default
+    return min(max(rate, 0.0), 1.0)
+
+
+# Profiler procesu - konfiguracja ze zmiennych środowiskowych
+PROFILER = Profiler(
+    output_dir=os.environ.get('PROFILE_DIR', 'profiles'),
+    enabled=os.environ.get('PROFILE_ENABLED') == '1',
+    sample_rate=_sample_rate(os.environ.get('PROFILE_SAMPLE_RATE', '1.0')),
+    memory=os.environ.get('PROFILE_MEMORY', '1') != '0'
+)
+profiled = PROFILER.profiled
@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class AutoReorderScheduler:
+    """Uruchamia automatyczne zamawianie cyklicznie w wątku w tle"""
+
+    def __init__(self, auto_reorder, interval_seconds=300, max_orders_per_run=10, max_orders_per_hour=30):
+        self.auto_reorder = auto_reorder
+        self.interval_seconds = interval_seconds
+        self.max_orders_per_run = max_orders_per_run
+        self.max_orders_per_hour = max_orders_per_hour
+
+        self._run_lock = threading.Lock()      # tylko jedno przebieganie naraz
+        self._state_lock = threading.Lock()    # ochrona statystyk
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+        self._order_times = deque()            # czasy utworzonych zamówień (limit godzinowy)
+
+        self.stats = {
+            'runs': 0,
+            'skipped_runs': 0,
+            'orders_created': 0,
+            'orders_failed': 0,
+            'rate_limited': 0,
+            'last_run_started': None,
+            'last_run_finished': None,
+            'last_run_duration': None,
+            'last_run_orders': 0,
+            'last_error': None
+        }
+
+    def start(self):
+        """Uruchamia wątek harmonogramu (jeśli jeszcze nie działa)"""
+        if self.is_running():
+            return False
+        # Nowe zdarzenie stopu - wątek zatrzymywany w trakcie przebiegu dokończy go i wyjdzie
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = threading.Thread(target=self._loop, args=(self._stop_event, self._wake_event),
+                                        name='auto-reorder-scheduler', daemon=True)
+        self._thread.start()
+        logger.info("🔄 Uruchomiono automatyczne zamawianie (co %s s)", self.interval_seconds)
+        return True
+
+    def stop(self):
+        """Zatrzymuje wątek harmonogramu - nie czeka na zakończenie bieżącego przebiegu"""
+        if not self.is_running():
+            return False
+        self._stop_event.set()
+        self._wake_event.set()
+        logger.info("⏹️ Zatrzymano automatyczne zamawianie")
+        return True
+
+    def set_enabled(self, enabled):
+        """Włącza lub wyłącza harmonogram; stan jest wspólny dla całego procesu, nie dla sesji"""
+        return self.start() if enabled else self.stop()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def is_busy(self):
+        return self._run_lock.locked()
+
+    def trigger(self):
+        """Zleca natychmiastowe sprawdzenie (wykonywane w wątku w tle)"""
+        self._wake_event.set()
+
+    def _loop(self, stop_event, wake_event):
+        while not stop_event.is_set():
+            self.run_once(stop_event)
+            wake_event.wait(self.interval_seconds)
+            wake_event.clear()
+
+    def run_once(self, stop_event=None):
+        """Jedno sprawdzenie potrzeb i utworzenie zamówień; pomija, jeśli poprzednie jeszcze trwa
+
+        stop_event to zdarzenie stopu wątku, który wykonuje przebieg - po stop() i
+        ponownym start() stary wątek nadal widzi swoje (ustawione) zdarzenie.
+        """
+        if not self._run_lock.acquire(blocking=False):
+            with self._state_lock:
+                self.stats['skipped_runs'] += 1
+            return None
+
+        started = time.perf_counter()
+        created = 0
+        with self._state_lock:
+            self.stats['last_run_started'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        try:
+            # Sprawdzenie i zamówienia pod wspólną blokadą zapisu - sesje aplikacji i API
+            # nie zmieniają w tym czasie zamówień ani stanów magazynowych
+            with self.auto_reorder.data_loader.write_lock:
+                production_orders = self.auto_reorder.check_production_needs()
+
+                for product_info in production_orders:
+                    if stop_event is not None and stop_event.is_set():
+                        break
+                    if not product_info.get('supplier_found'):
+                        continue
+                    if created >= self.max_orders_per_run or not self._acquire_order_slot():
+                        with self._state_lock:
+                            self.stats['rate_limited'] += 1
+                        continue
+
+                    try:
+                        success, _ = self.auto_reorder.create_production_order(
+                            product_info, product_info['suggested_quantity']
+                        )
+                    except Exception as e:
+                        success = False
+                        logger.error("❌ Błąd automatycznego zamówienia %s: %s", product_info.get('product_id'), e)
+
+                    with self._state_lock:
+                        if success:
+                            self.stats['orders_created'] += 1
+                            created += 1
+                        else:
+                            self.stats['orders_failed'] += 1
+
+            with self._state_lock:
+                self.stats['last_error'] = None
+            return created
+
+        except Exception as e:
+            with self._state_lock:
+                self.stats['last_error'] = str(e)
+            logger.error("❌ Błąd harmonogramu automatycznego zamawiania: %s", e)
+            return None
+
+        finally:
+            with self._state_lock:
+                self.stats['runs'] += 1
+                self.stats['last_run_orders'] = created
+                self.stats['last_run_duration'] = round(time.perf_counter() - started, 3)
+                self.stats['last_run_finished'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._run_lock.release()
+
+    def _acquire_order_slot(self):
+        """Limit zamówień w oknie przesuwnym jednej godziny"""
+        now = time.monotonic()
+        with self._state_lock:
+            while self._order_times and now - self._order_times[0] > 3600:
+                self._order_times.popleft()
+            if len(self._order_times) >= self.max_orders_per_hour:
+                return False
+            self._order_times.append(now)
+            return True
+
+    def get_status(self):
+        """Zwraca status i metryki harmonogramu"""
+        with self._state_lock:
+            status = dict(self.stats)
+            now = time.monotonic()
+            status['orders_last_hour'] = sum(1 for t in self._order_times if now - t <= 3600)
+        status['running'] = self.is_running()
+        status['busy'] = self.is_busy()
+        status['interval_seconds'] = self.interval_seconds
+        return status
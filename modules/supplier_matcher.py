@@ -1,13 +1,21 @@
+import logging
+import threading
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from difflib import SequenceMatcher
+from modules.metrics import timed
+
+logger = logging.getLogger(__name__)
 
 class SupplierMatcher:
     def __init__(self, suppliers_df, purchase_orders_df):
         self.suppliers_df = suppliers_df
         self.purchase_orders_df = purchase_orders_df
+        # Indeks TF-IDF nazw produktów - budowany przy pierwszym wyszukiwaniu podobnych
+        # (albo wcześniej w tle przez prewarm); scikit-learn importowany dopiero wtedy
+        self._similarity_index = None
+        self._index_lock = threading.Lock()
     
+    @timed('supplier_matcher.find_supplier_in_contracts')
     def find_supplier_in_contracts(self, product_name, category):
         """Szuka dostawcy w umowach terminowych"""
         if self.purchase_orders_df is None or self.purchase_orders_df.empty:
@@ -82,6 +90,7 @@ class SupplierMatcher:
         
         return {'found': False}
     
+    @timed('supplier_matcher.find_similar_products')
     def find_similar_products(self, product_name, category, top_n=3):
         """Znajduje podobne produkty w systemie"""
         if product_name is None or self.purchase_orders_df is None:
@@ -94,10 +103,10 @@ class SupplierMatcher:
         
         # Proste wyszukiwanie po podobieństwie tekstu
         try:
-            vectorizer = TfidfVectorizer()
-            tfidf_matrix = vectorizer.fit_transform(all_products)
+            all_products, vectorizer, tfidf_matrix = self._get_similarity_index()
             query_vec = vectorizer.transform([product_name])
-            similarities = cosine_similarity(query_vec, tfidf_matrix).flatten()
+            # Wiersze TF-IDF są znormalizowane (L2) - iloczyn skalarny to podobieństwo kosinusowe
+            similarities = (tfidf_matrix @ query_vec.T).toarray().ravel()
             
             # Znajdź najbardziej podobne produkty
             similar_indices = similarities.argsort()[-top_n:][::-1]
@@ -112,7 +121,25 @@ class SupplierMatcher:
             
             return similar_products
         except Exception as e:
-            print(f"Błąd w wyszukiwaniu podobnych produktów: {e}")
+            logger.warning("⚠️ Błąd w wyszukiwaniu podobnych produktów: %s", e)
             # Fallback - proste wyszukiwanie
             similar = [p for p in all_products if str(product_name).lower() in str(p).lower()]
-            return [{'product_name': p, 'similarity_score': 0.5} for p in similar[:top_n]]
\ No newline at end of file
+            return [{'product_name': p, 'similarity_score': 0.5} for p in similar[:top_n]]
+
+    def prewarm(self):
+        """Buduje indeks podobieństwa z wyprzedzeniem (np. w wątku w tle po starcie aplikacji)"""
+        if self.purchase_orders_df is not None:
+            self._get_similarity_index()
+
+    def _get_similarity_index(self):
+        """Nazwy produktów, wektoryzator i macierz TF-IDF - przeliczane tylko po podmianie danych"""
+        with self._index_lock:
+            index = self._similarity_index
+            if index is None or index[0] is not self.purchase_orders_df:
+                from sklearn.feature_extraction.text import TfidfVectorizer
+
+                all_products = self.purchase_orders_df['Product_Name'].dropna().unique()
+                vectorizer = TfidfVectorizer()
+                tfidf_matrix = vectorizer.fit_transform(all_products)
+                index = self._similarity_index = (self.purchase_orders_df, all_products, vectorizer, tfidf_matrix)
+            return index[1:]
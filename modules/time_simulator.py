@@ -1,14 +1,43 @@
+import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
-import random
+import heapq
+from modules.metrics import timed
+from modules.profiling import profiled
+
+logger = logging.getLogger(__name__)
 
 class TimeSimulator:
-    def __init__(self, data_dir='data'):
+    # Niezależne strumienie losowe dla każdego dnia symulacji
+    CONSUMPTION_STREAM = 0
+    REQUESTS_STREAM = 1
+    
+    # Przykładowe zapotrzebowania
+    SAMPLE_REQUESTS = [
+        "Potrzebuję 5 laptopów Dell dla nowych pracowników",
+        "Zamów 20 opakowań papieru A4 do drukarki",
+        "Potrzebujemy 3 nowych monitorów 24 cali",
+        "Zamów materiały biurowe: długopisy, notesy, spinacze",
+        "Potrzebuję 2 sztuki Siemens Sensors dla produkcji",
+        "Zamów części zamienne do maszyn produkcyjnych"
+    ]
+    
+    def __init__(self, data_dir='data', seed=None, current_date=None):
         self.data_dir = data_dir
-        self.current_date = None
-        self.load_simulation_state()
+        self.current_date = current_date
+        # Bez ziarna losujemy je raz - przebieg nadal jest powtarzalny w obrębie instancji
+        self.seed = seed if seed is not None else np.random.SeedSequence().entropy
+        # Otwarte dostawy w kolejce wg terminu: (odcisk pliku, zamówienia, kolejka)
+        self._pending_deliveries = None
+        # Podana data startu (np. repliki Monte Carlo) - bez odczytu stanu z pliku
+        if current_date is None:
+            self.load_simulation_state()
+    
+    def day_rng(self, day, stream):
+        """Generator losowy dla danego dnia i strumienia - niezależny od kolejności symulacji"""
+        return np.random.default_rng([self.seed, day.toordinal(), stream])
     
     def load_simulation_state(self):
         """Ładuje stan symulacji z pliku"""
@@ -17,14 +46,14 @@ class TimeSimulator:
             if os.path.exists(state_file):
                 state_df = pd.read_csv(state_file)
                 self.current_date = datetime.strptime(state_df.iloc[0]['current_date'], '%Y-%m-%d').date()
-                print(f"✅ Załadowano datę symulacji: {self.current_date}")
+                logger.info("✅ Załadowano datę symulacji: %s", self.current_date)
             else:
                 # Domyślnie dzisiejsza data
                 self.current_date = datetime.now().date()
                 self.save_simulation_state()
-                print(f"✅ Utworzono nową symulację od: {self.current_date}")
+                logger.info("✅ Utworzono nową symulację od: %s", self.current_date)
         except Exception as e:
-            print(f"❌ Błąd ładowania stanu symulacji: {e}")
+            logger.error("❌ Błąd ładowania stanu symulacji: %s", e)
             self.current_date = datetime.now().date()
     
     def save_simulation_state(self):
@@ -37,135 +66,251 @@ class TimeSimulator:
             })
             state_df.to_csv(state_file, index=False)
         except Exception as e:
-            print(f"❌ Błąd zapisu stanu symulacji: {e}")
+            logger.error("❌ Błąd zapisu stanu symulacji: %s", e)
     
     def advance_time(self, days=1):
         """Przesuwa czas symulacji o określoną liczbę dni"""
         old_date = self.current_date
         self.current_date += timedelta(days=days)
         self.save_simulation_state()
-        print(f"⏰ Czas symulacji: {old_date} -> {self.current_date} (+{days} dni)")
+        logger.info("⏰ Czas symulacji: %s -> %s (+%s dni)", old_date, self.current_date, days)
         return self.current_date
     
+    @profiled('time_simulator.advance_days')
+    @timed('time_simulator.advance_days')
+    def advance_days(self, days, data_loader):
+        """Symuluje kolejne dni w pamięci i zapisuje stan końcowy jednorazowo"""
+        # Pod wspólną blokadą zapisu - harmonogram zamawiania i inne sesje czekają na koniec przebiegu
+        with data_loader.write_lock:
+            old_date = self.current_date
+            orders_df, delivery_queue = self._get_pending_deliveries()
+            new_requests = []
+            delivered_orders = 0
+            
+            for _ in range(days):
+                # Każdy dzień symulowany jest ze swoją datą
+                self.current_date += timedelta(days=1)
+                
+                # 1. Zużycie, 2. dostawy, 3. nowe zapotrzebowania - wszystko w pamięci
+                self._simulate_consumption(data_loader, persist=False)
+                if orders_df is not None:
+                    delivered_orders += self._deliver_due_orders(orders_df, data_loader, delivery_queue)
+                new_request = self._generate_user_request()
+                if new_request is not None:
+                    new_requests.append(new_request)
+            
+            # Jeden zapis na koniec całego przebiegu
+            try:
+                if data_loader.inventory is not None and not data_loader.inventory.empty:
+                    data_loader.inventory.to_csv(f'{self.data_dir}/inventory.csv', index=False)
+                if delivered_orders > 0:
+                    self._save_orders(orders_df, delivery_queue)
+                self._append_user_requests(new_requests)
+            except Exception as e:
+                logger.error("❌ Błąd zapisu stanu po symulacji: %s", e)
+            
+            self.save_simulation_state()
+            logger.info("⏰ Czas symulacji: %s -> %s (+%s dni, dostawy: %s, zapotrzebowania: %s)",
+                        old_date, self.current_date, days, delivered_orders, len(new_requests))
+            return self.current_date
+    
+    @profiled('time_simulator.simulate_daily_operations')
+    @timed('time_simulator.simulate_daily_operations')
     def simulate_daily_operations(self, data_loader):
         """Symuluje codzienne operacje biznesowe"""
-        print(f"🔄 Symulowanie operacji dla {self.current_date}")
-        
-        # 1. Symuluj zużycie produktów
-        self._simulate_consumption(data_loader)
-        
-        # 2. Aktualizuj statusy dostaw
-        self._update_delivery_statuses(data_loader)
-        
-        # 3. Generuj nowe zapotrzebowania użytkowników
-        self._simulate_user_requests(data_loader)
-        
-        print("✅ Symulacja dzienna zakończona")
+        with data_loader.write_lock:
+            logger.info("🔄 Symulowanie operacji dla %s", self.current_date)
+            
+            # 1. Symuluj zużycie produktów
+            self._simulate_consumption(data_loader)
+            
+            # 2. Aktualizuj statusy dostaw
+            self._update_delivery_statuses(data_loader)
+            
+            # 3. Generuj nowe zapotrzebowania użytkowników
+            self._simulate_user_requests(data_loader)
+            
+            logger.info("✅ Symulacja dzienna zakończona")
     
-    def _simulate_consumption(self, data_loader):
+    def _simulate_consumption(self, data_loader, persist=True):
         """Symuluje zużycie produktów"""
-        if data_loader.inventory is None:
+        if data_loader.inventory is None or data_loader.inventory.empty:
             return
         
         try:
-            # Losowe zużycie produktów (1-10% stanu dziennie)
-            consumption_factor = random.uniform(0.01, 0.10)
-            
-            for idx, product in data_loader.inventory.iterrows():
-                current_stock = product['Stock']
-                if current_stock > 0:
-                    # Zużyj losową ilość, ale nie poniżej zera
-                    consumption = max(1, int(current_stock * consumption_factor * random.uniform(0.5, 1.5)))
-                    new_stock = max(0, current_stock - consumption)
-                    
-                    data_loader.inventory.at[idx, 'Stock'] = new_stock
-                    data_loader.inventory.at[idx, 'Closing_Stock'] = new_stock
+            stock = data_loader.inventory['Stock'].to_numpy()
+            new_stock, consumption_factor = self._consume_stock(stock)
+            
+            data_loader.inventory['Stock'] = new_stock
+            data_loader.inventory['Closing_Stock'] = new_stock
             
             # Zapisz zmiany
-            data_loader.inventory.to_csv(f'{self.data_dir}/inventory.csv', index=False)
-            print(f"📉 Symulowano zużycie produktów (współczynnik: {consumption_factor:.2%})")
+            if persist:
+                data_loader.inventory.to_csv(f'{self.data_dir}/inventory.csv', index=False)
+            logger.info("📉 Symulowano zużycie produktów (współczynnik: %.2f%%)", consumption_factor * 100)
             
         except Exception as e:
-            print(f"❌ Błąd symulacji zużycia: {e}")
+            logger.error("❌ Błąd symulacji zużycia: %s", e)
+    
+    def _consume_stock(self, stock, rng=None):
+        """Jeden dzień zużycia dla wszystkich produktów naraz (operacje na tablicach NumPy)"""
+        rng = self.day_rng(self.current_date, self.CONSUMPTION_STREAM) if rng is None else rng
+        
+        # Losowe zużycie produktów (1-10% stanu dziennie), z rozrzutem 0.5-1.5 na produkt
+        consumption_factor = rng.uniform(0.01, 0.10)
+        jitter = rng.uniform(0.5, 1.5, size=len(stock))
+        
+        # Zużyj losową ilość (min. 1 szt.), ale nie poniżej zera - tylko produkty na stanie
+        consumption = np.maximum(1, (stock * consumption_factor * jitter).astype(np.int64))
+        new_stock = np.where(stock > 0, np.maximum(0, stock - consumption), stock)
+        
+        return new_stock.astype(stock.dtype, copy=False), consumption_factor
+    
+    def _load_orders(self):
+        """Wczytuje zamówienia (None jeśli brak pliku)"""
+        orders_file = f'{self.data_dir}/orders.csv'
+        if not os.path.exists(orders_file):
+            return None
+        return pd.read_csv(orders_file)
+    
+    def _orders_fingerprint(self):
+        """Odcisk pliku zamówień - zmienia się po każdym zapisie"""
+        try:
+            stat = os.stat(f'{self.data_dir}/orders.csv')
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    def _get_pending_deliveries(self):
+        """Zamówienia i kolejka otwartych dostaw - przebudowywane tylko po zmianie pliku"""
+        fingerprint = self._orders_fingerprint()
+        if fingerprint is None:
+            self._pending_deliveries = None
+            return None, []
+        
+        if self._pending_deliveries is None or self._pending_deliveries[0] != fingerprint:
+            orders_df = self._load_orders()
+            self._pending_deliveries = (fingerprint, orders_df, self._build_delivery_queue(orders_df))
+        
+        return self._pending_deliveries[1], self._pending_deliveries[2]
+    
+    def _save_orders(self, orders_df, delivery_queue):
+        """Zapisuje zamówienia i zachowuje kolejkę dostaw dla kolejnych dni"""
+        orders_df.to_csv(f'{self.data_dir}/orders.csv', index=False)
+        self._pending_deliveries = (self._orders_fingerprint(), orders_df, delivery_queue)
+    
+    def _build_delivery_queue(self, orders_df):
+        """Kopiec (termin, wiersz) otwartych zamówień - daty parsowane raz, wektorowo"""
+        if orders_df is None or orders_df.empty or 'delivery_status' not in orders_df.columns \
+                or 'estimated_delivery' not in orders_df.columns:
+            return []
+        
+        pending = orders_df['delivery_status'].isin(['ordered', 'in_transit'])
+        due = pd.to_datetime(orders_df['estimated_delivery'], format='%Y-%m-%d', errors='coerce')
+        pending &= due.notna()
+        
+        due_ordinals = due[pending].map(pd.Timestamp.toordinal)
+        queue = list(zip(due_ordinals.tolist(), due_ordinals.index.tolist()))
+        heapq.heapify(queue)
+        return queue
+    
+    def _pop_due_orders(self, delivery_queue, day):
+        """Zdejmuje z kolejki wiersze zamówień z terminem do danego dnia"""
+        day_ordinal = day.toordinal()
+        rows = []
+        while delivery_queue and delivery_queue[0][0] <= day_ordinal:
+            rows.append(heapq.heappop(delivery_queue)[1])
+        return rows
     
     def _update_delivery_statuses(self, data_loader):
         """Aktualizuje statusy dostaw na podstawie czasu symulacji"""
         try:
-            orders_file = f'{self.data_dir}/orders.csv'
-            if not os.path.exists(orders_file):
+            orders_df, delivery_queue = self._get_pending_deliveries()
+            if orders_df is None:
                 return
             
-            orders_df = pd.read_csv(orders_file)
-            updated_orders = 0
-            
-            for idx, order in orders_df.iterrows():
-                if order['delivery_status'] in ['ordered', 'in_transit']:
-                    estimated_delivery = order.get('estimated_delivery')
-                    if estimated_delivery and isinstance(estimated_delivery, str):
-                        try:
-                            delivery_date = datetime.strptime(estimated_delivery, '%Y-%m-%d').date()
-                            
-                            # Jeśli data dostawy minęła, oznacz jako dostarczone
-                            if delivery_date <= self.current_date:
-                                orders_df.at[idx, 'delivery_status'] = 'delivered'
-                                orders_df.at[idx, 'delivery_date'] = self.current_date.strftime('%Y-%m-%d')
-                                
-                                # Aktualizuj stan magazynowy
-                                product_name = order['product_name']
-                                quantity = order['quantity']
-                                data_loader._update_inventory_on_delivery(product_name, quantity)
-                                
-                                updated_orders += 1
-                                
-                        except ValueError:
-                            continue
+            updated_orders = self._deliver_due_orders(orders_df, data_loader, delivery_queue)
             
             if updated_orders > 0:
-                orders_df.to_csv(orders_file, index=False)
-                print(f"📦 Zaktualizowano {updated_orders} zamówień do statusu 'dostarczone'")
+                self._save_orders(orders_df, delivery_queue)
+                data_loader.inventory.to_csv(f'{self.data_dir}/inventory.csv', index=False)
                 
         except Exception as e:
-            print(f"❌ Błąd aktualizacji statusów dostaw: {e}")
+            logger.error("❌ Błąd aktualizacji statusów dostaw: %s", e)
     
-    def _simulate_user_requests(self, data_loader):
-        """Symuluje nowe zapotrzebowania od użytkowników"""
+    def _deliver_due_orders(self, orders_df, data_loader, delivery_queue=None):
+        """Oznacza zamówienia z minionym terminem jako dostarczone (w pamięci)"""
+        if delivery_queue is None:
+            delivery_queue = self._build_delivery_queue(orders_df)
+        
         try:
-            # 30% szans na nowe zapotrzebowanie każdego dnia
-            if random.random() > 0.3:
-                return
+            # Koszt zależy tylko od liczby dostaw na dziś, nie od całej historii
+            rows = self._pop_due_orders(delivery_queue, self.current_date)
+            if not rows:
+                return 0
             
-            requests_file = f'{self.data_dir}/user_requests.csv'
-            
-            # Przykładowe zapotrzebowania
-            sample_requests = [
-                "Potrzebuję 5 laptopów Dell dla nowych pracowników",
-                "Zamów 20 opakowań papieru A4 do drukarki",
-                "Potrzebujemy 3 nowych monitorów 24 cali",
-                "Zamów materiały biurowe: długopisy, notesy, spinacze",
-                "Potrzebuję 2 sztuki Siemens Sensors dla produkcji",
-                "Zamów części zamienne do maszyn produkcyjnych"
-            ]
-            
-            new_request = {
-                'Request_ID': f"REQ-{datetime.now().strftime('%Y%m%d%H%M%S')}",
-                'User_Text': random.choice(sample_requests),
-                'Detected_Product': '',
-                'Detected_Category': '',
-                'Timestamp': self.current_date.strftime('%Y-%m-%d %H:%M')
-            }
-            
-            # Dodaj do pliku
-            if os.path.exists(requests_file):
-                existing_requests = pd.read_csv(requests_file)
-                updated_requests = pd.concat([existing_requests, pd.DataFrame([new_request])], ignore_index=True)
-                updated_requests.to_csv(requests_file, index=False)
-            else:
-                pd.DataFrame([new_request]).to_csv(requests_file, index=False)
+            # Zmiana statusów jednym przypisaniem
+            if 'delivery_date' not in orders_df.columns:
+                orders_df['delivery_date'] = None
+            if orders_df['delivery_date'].dtype != object:
+                orders_df['delivery_date'] = orders_df['delivery_date'].astype(object)
+            orders_df.loc[rows, 'delivery_status'] = 'delivered'
+            orders_df.loc[rows, 'delivery_date'] = self.current_date.strftime('%Y-%m-%d')
+            
+            # Aktualizuj stan magazynowy - suma dostaw na produkt (zapis robi wywołujący)
+            delivered = orders_df.loc[rows, ['product_name', 'quantity']]
+            quantities = delivered.groupby('product_name', sort=False)['quantity'].sum()
+            data_loader._update_inventory_on_deliveries(quantities, persist=False)
             
-            print(f"📝 Wygenerowano nowe zapotrzebowanie: {new_request['User_Text']}")
+            logger.info("📦 Zaktualizowano %s zamówień do statusu 'dostarczone'", len(rows))
+            return len(rows)
             
         except Exception as e:
-            print(f"❌ Błąd symulacji zapotrzebowań: {e}")
+            logger.error("❌ Błąd aktualizacji statusów dostaw: %s", e)
+            return 0
+    
+    def _simulate_user_requests(self, data_loader):
+        """Symuluje nowe zapotrzebowania od użytkowników"""
+        try:
+            new_request = self._generate_user_request()
+            if new_request is not None:
+                self._append_user_requests([new_request])
+        except Exception as e:
+            logger.error("❌ Błąd symulacji zapotrzebowań: %s", e)
+    
+    def _generate_user_request(self, rng=None):
+        """Losuje nowe zapotrzebowanie dla bieżącej daty symulacji (None jeśli brak)"""
+        rng = self.day_rng(self.current_date, self.REQUESTS_STREAM) if rng is None else rng
+        
+        # 30% szans na nowe zapotrzebowanie każdego dnia
+        if rng.random() > 0.3:
+            return None
+        
+        new_request = {
+            # Data symulacji w identyfikatorze - unikalny także przy wielu dniach w jednej sekundzie
+            'Request_ID': f"REQ-{self.current_date.strftime('%Y%m%d')}-{int(rng.integers(16 ** 6)):06X}",
+            'User_Text': self.SAMPLE_REQUESTS[int(rng.integers(len(self.SAMPLE_REQUESTS)))],
+            'Detected_Product': '',
+            'Detected_Category': '',
+            'Timestamp': self.current_date.strftime('%Y-%m-%d %H:%M')
+        }
+        
+        logger.info("📝 Wygenerowano nowe zapotrzebowanie: %s", new_request['User_Text'])
+        return new_request
+    
+    def _append_user_requests(self, new_requests):
+        """Dopisuje zapotrzebowania na koniec pliku (bez wczytywania całej historii)"""
+        if not new_requests:
+            return
+        
+        requests_file = f'{self.data_dir}/user_requests.csv'
+        new_df = pd.DataFrame(new_requests)
+        
+        if os.path.exists(requests_file) and os.path.getsize(requests_file) > 0:
+            columns = pd.read_csv(requests_file, nrows=0).columns
+            new_df.reindex(columns=columns).to_csv(requests_file, mode='a', header=False, index=False)
+        else:
+            new_df.to_csv(requests_file, index=False)
     
     def get_simulation_info(self):
         """Zwraca informacje o symulacji"""
@@ -183,4 +328,4 @@ class TimeSimulator:
         """Resetuje symulację do aktualnej daty"""
         self.current_date = datetime.now().date()
         self.save_simulation_state()
-        print("🔄 Zresetowano symulację do aktualnej daty")
\ No newline at end of file
+        logger.info("🔄 Zresetowano symulację do aktualnej daty")
\ No newline at end of file
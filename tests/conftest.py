@@ -0,0 +1,19 @@
+import os
+import shutil
+
+import pytest
+
+REPO_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Kopia danych referencyjnych - testy zapisujące pliki nie zmieniają data/"""
+    target = tmp_path / 'data'
+    shutil.copytree(REPO_DATA, target)
+    return str(target)
+
+
+@pytest.fixture
+def pdf_dir(tmp_path):
+    return str(tmp_path / 'orders')
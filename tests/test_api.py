@@ -0,0 +1,58 @@
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.request import urlopen
+
+import pandas as pd
+
+from api import APIContext, APIHandler
+from modules.data_loader import DataLoader
+
+
+def _orders_for_two_products(data_dir):
+    orders = pd.read_csv(f'{data_dir}/orders.csv')
+    inventory = pd.read_csv(f'{data_dir}/inventory.csv')
+    orders = orders[orders['product_name'].isin(inventory['Product_Name'])].drop_duplicates('product_name')
+    return orders.iloc[0], orders.iloc[1]
+
+
+def _stock(data_dir, product_name):
+    data_loader = DataLoader(data_dir)
+    data_loader.load_all_data()
+    return data_loader.inventory.loc[data_loader.inventory['Product_Name'] == product_name, 'Stock'].sum()
+
+
+def test_write_by_other_worker_is_not_lost(data_dir, pdf_dir):
+    first, second = _orders_for_two_products(data_dir)
+    stock_before = _stock(data_dir, first['product_name'])
+    worker_a = APIContext(data_dir, pdf_dir)
+    worker_b = APIContext(data_dir, pdf_dir)
+
+    worker_b.update_delivery(first['order_id'], {'status': 'delivered', 'delivered_quantity': 100})
+    # A ma w pamięci stan sprzed zapisu B - musi go doczytać przed własnym zapisem
+    worker_a.update_delivery(second['order_id'], {'status': 'delivered', 'delivered_quantity': 5})
+
+    assert _stock(data_dir, first['product_name']) == stock_before + 100
+    assert worker_a.data_loader.inventory.loc[
+        worker_a.data_loader.inventory['Product_Name'] == first['product_name'], 'Stock'].sum() == stock_before + 100
+
+
+def test_metrics_are_labelled_with_worker_pid(data_dir, pdf_dir):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), APIHandler)
+    server.context = APIContext(data_dir, pdf_dir)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        with urlopen(f'{base}/metrics?format=json&extra=1') as response:
+            snapshot = json.load(response)
+        with urlopen(f'{base}/metrics') as response:
+            text = response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert snapshot['worker'] == os.getpid()
+    assert 'operations' in snapshot
+    series = [line for line in text.splitlines() if line and not line.startswith('#')]
+    assert series and all(f'worker="{os.getpid()}"' in line for line in series)
@@ -0,0 +1,48 @@
+import threading
+import time
+from datetime import date
+
+from modules.auto_reorder import AutoReorderSystem
+from modules.data_loader import DataLoader
+from modules.time_simulator import TimeSimulator
+
+
+def test_forecast_uses_simulation_date(data_dir, pdf_dir):
+    data_loader = DataLoader(data_dir, pdf_dir)
+    data_loader.load_all_data()
+    simulator = TimeSimulator(data_dir, seed=0, current_date=date(2030, 8, 1))
+    auto_reorder = AutoReorderSystem(data_loader, None, None, simulator)
+
+    dates = []
+    get_forecast = auto_reorder.forecaster.get_forecast
+    auto_reorder.forecaster.get_forecast = lambda reference_date=None: dates.append(reference_date) or get_forecast(reference_date)
+    auto_reorder.check_production_needs()
+
+    assert dates == [date(2030, 8, 1)]
+    assert auto_reorder.forecaster._cache_key[-1] == 'Q3'
+
+
+def test_concurrent_forecasts_compute_once(data_dir, pdf_dir):
+    data_loader = DataLoader(data_dir, pdf_dir)
+    data_loader.load_all_data()
+    forecaster = AutoReorderSystem(data_loader, None, None).forecaster
+
+    computed = []
+    compute = forecaster._compute_forecast
+
+    def slow_compute(quarter):
+        computed.append(quarter)
+        time.sleep(0.05)
+        return compute(quarter)
+
+    forecaster._compute_forecast = slow_compute
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(forecaster.get_forecast(date(2030, 1, 1))))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert computed == ['Q1']
+    assert all(result is results[0] for result in results)
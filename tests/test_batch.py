@@ -0,0 +1,86 @@
+import json
+import sys
+
+import pandas as pd
+import pytest
+
+import batch
+from modules.data_loader import DataLoader
+
+REQUESTS = [
+    "I need 1 szt. of Helly Hansen Workwear Model 122 for production.",
+    "Potrzebuję 2 szt. IKEA Office chairs 451 do linii produkcyjnej.",
+    "Potrzebujemy materiały biurowe, nie wiem dokładnie jakie."
+]
+
+
+def run_main(monkeypatch, tmp_path, data_dir, *extra, texts=REQUESTS):
+    input_path = tmp_path / 'requests.jsonl'
+    input_path.write_text('\n'.join(json.dumps({'text': text}, ensure_ascii=False) for text in texts), encoding='utf-8')
+    monkeypatch.setattr(sys, 'argv', ['batch.py', str(input_path), '--data-dir', data_dir,
+                                      '--output', str(tmp_path / 'results.jsonl'), *extra])
+    batch.main()
+    return read_results(tmp_path)
+
+
+def read_results(tmp_path):
+    return [json.loads(line) for line in (tmp_path / 'results.jsonl').read_text(encoding='utf-8').splitlines()]
+
+
+def saved_ids(data_dir):
+    return set(pd.read_csv(f'{data_dir}/orders.csv')['order_id'])
+
+
+def test_ordered_results_are_saved_in_input_order(monkeypatch, tmp_path, data_dir):
+    results = run_main(monkeypatch, tmp_path, data_dir, '--save-batch', '1')
+
+    assert [result['line'] for result in results] == [1, 2, 3]
+    assert [result['status'] for result in results] == ['ordered', 'ordered', 'not_found']
+    assert {result['order_id'] for result in results[:2]} <= saved_ids(data_dir)
+
+
+def test_failed_save_is_not_reported_as_ordered(monkeypatch, tmp_path, data_dir):
+    monkeypatch.setattr(DataLoader, 'save_orders', lambda self, orders: 0)
+
+    results = run_main(monkeypatch, tmp_path, data_dir)
+
+    assert [result['status'] for result in results] == ['error', 'error', 'not_found']
+
+
+def test_interrupt_keeps_drafted_orders(monkeypatch, tmp_path, data_dir):
+    run_batch = batch.run_batch
+
+    def interrupted(*args):
+        results = run_batch(*args)
+        yield next(results)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(batch, 'run_batch', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        run_main(monkeypatch, tmp_path, data_dir)
+
+    results = read_results(tmp_path)
+    assert [result['status'] for result in results] == ['ordered']
+    assert results[0]['order_id'] in saved_ids(data_dir)
+
+
+def test_waiting_results_are_bounded_by_save_batch(monkeypatch, tmp_path, data_dir):
+    run_batch, write = batch.run_batch, batch.ResultWriter.write
+    yielded, written_after = [0], {}
+
+    def counted(*args):
+        for result in run_batch(*args):
+            yielded[0] += 1
+            yield result
+
+    def recorded(self, result):
+        written_after[result['line']] = yielded[0]
+        write(self, result)
+
+    monkeypatch.setattr(batch, 'run_batch', counted)
+    monkeypatch.setattr(batch.ResultWriter, 'write', recorded)
+    # Jedno zamówienie, potem same zapotrzebowania bez produktu
+    results = run_main(monkeypatch, tmp_path, data_dir, '--save-batch', '3', texts=[REQUESTS[0]] + [REQUESTS[2]] * 6)
+
+    assert [result['status'] for result in results] == ['ordered'] + ['not_found'] * 6
+    assert max(written_after[line] - line for line in written_after) < 3
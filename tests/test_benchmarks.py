@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks.suite import SCENARIOS, BenchContext, compare, measure
+
+
+@pytest.mark.parametrize('name', sorted(SCENARIOS))
+def test_scenario_runs_on_reference_data(name, data_dir, tmp_path):
+    ctx = BenchContext('ref', data_dir, str(tmp_path))
+    result = measure(SCENARIOS[name](ctx), budget_seconds=0, min_repeat=2, max_repeat=2)
+
+    assert result['repeat'] == 2
+    assert result['median_ms'] > 0
+
+
+def test_compare_reports_only_slower_scenarios():
+    baseline = {'results': {'a@ref': {'median_ms': 1.0}, 'b@ref': {'median_ms': 1.0}, 'c@ref': {'error': 'x'}}}
+    results = {'a@ref': {'median_ms': 1.2}, 'b@ref': {'median_ms': 2.0}, 'c@ref': {'median_ms': 5.0},
+               'd@ref': {'median_ms': 9.0}}
+
+    assert compare(results, baseline, threshold=1.3) == [('b@ref', 1.0, 2.0, 2.0)]
+    assert results['a@ref']['ratio'] == 1.2
@@ -0,0 +1,46 @@
+import threading
+from datetime import date
+
+import pandas as pd
+
+from modules.checkpoints import SimulationCheckpoints
+from modules.data_loader import DataLoader
+from modules.time_simulator import TimeSimulator
+
+
+def make_checkpoints(data_dir, pdf_dir):
+    data_loader = DataLoader(data_dir, pdf_dir)
+    data_loader.load_all_data()
+    simulator = TimeSimulator(data_dir, seed=0, current_date=date(2030, 1, 1))
+    return SimulationCheckpoints(data_loader, simulator)
+
+
+def test_restore_brings_back_inventory_orders_and_date(data_dir, pdf_dir):
+    checkpoints = make_checkpoints(data_dir, pdf_dir)
+    stock = checkpoints.data_loader.inventory['Stock'].copy()
+    orders = pd.read_csv(f'{data_dir}/orders.csv')
+    checkpoints.create('start')
+
+    checkpoints.data_loader.inventory['Stock'] = 0
+    checkpoints.data_loader.save_order({'order_id': 'AFTER-CHECKPOINT'})
+    checkpoints.time_simulator.current_date = date(2030, 2, 1)
+
+    assert checkpoints.restore('start')
+    assert checkpoints.data_loader.inventory['Stock'].tolist() == stock.tolist()
+    assert len(pd.read_csv(f'{data_dir}/orders.csv')) == len(orders)
+    assert checkpoints.time_simulator.current_date == date(2030, 1, 1)
+
+
+def test_restore_waits_for_write_lock(data_dir, pdf_dir):
+    checkpoints = make_checkpoints(data_dir, pdf_dir)
+    checkpoints.create('start')
+    checkpoints.time_simulator.current_date = date(2030, 2, 1)
+
+    with checkpoints.data_loader.write_lock:
+        thread = threading.Thread(target=checkpoints.restore, args=('start', False))
+        thread.start()
+        thread.join(0.2)
+        # Zapis w toku - stan nie może zostać podmieniony
+        assert checkpoints.time_simulator.current_date == date(2030, 2, 1)
+    thread.join(5)
+    assert checkpoints.time_simulator.current_date == date(2030, 1, 1)
@@ -0,0 +1,139 @@
+import threading
+
+import pandas as pd
+
+from modules.data_loader import DataLoader
+from modules.reorder_scheduler import AutoReorderScheduler
+
+
+def test_concurrent_saves_keep_every_order(data_dir, pdf_dir):
+    data_loader = DataLoader(data_dir, pdf_dir)
+    assert data_loader.load_all_data()
+    before = len(pd.read_csv(f'{data_dir}/orders.csv'))
+
+    def save(worker):
+        for i in range(25):
+            assert data_loader.save_order({'order_id': f'T{worker}-{i}', 'product_name': 'Test'})
+
+    threads = [threading.Thread(target=save, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(pd.read_csv(f'{data_dir}/orders.csv')) == before + 100
+
+
+def test_scheduler_waits_for_write_lock(data_dir, pdf_dir):
+    data_loader = DataLoader(data_dir, pdf_dir)
+    data_loader.load_all_data()
+    checked = threading.Event()
+
+    class AutoReorder:
+        def __init__(self):
+            self.data_loader = data_loader
+
+        def check_production_needs(self):
+            checked.set()
+            return []
+
+    scheduler = AutoReorderScheduler(AutoReorder())
+    with data_loader.write_lock:
+        thread = threading.Thread(target=scheduler.run_once)
+        thread.start()
+        assert not checked.wait(0.2)
+    thread.join(5)
+    assert checked.is_set()
+
+
+def test_scheduler_enabled_state_is_process_wide():
+    scheduler = AutoReorderScheduler(None, interval_seconds=3600)
+    scheduler.run_once = lambda stop_event=None: 0
+    assert scheduler.set_enabled(True)
+    assert not scheduler.set_enabled(True)
+    assert scheduler.is_running()
+    assert scheduler.set_enabled(False)
+    assert not scheduler.is_running()
+
+
+def test_restarted_scheduler_stops_previous_run(data_dir, pdf_dir):
+    data_loader = DataLoader(data_dir, pdf_dir)
+    in_order, release = threading.Event(), threading.Event()
+    created = []
+
+    class AutoReorder:
+        def __init__(self):
+            self.data_loader = data_loader
+
+        def check_production_needs(self):
+            return [{'product_id': f'P-{i}', 'supplier_found': True, 'suggested_quantity': 1} for i in range(5)]
+
+        def create_production_order(self, product_info, quantity):
+            created.append(product_info['product_id'])
+            in_order.set()
+            release.wait(5)
+            return True, None
+
+    scheduler = AutoReorderScheduler(AutoReorder(), interval_seconds=3600)
+    scheduler.start()
+    first_thread = scheduler._thread
+    assert in_order.wait(5)
+
+    # Szybkie wyłączenie i włączenie w trakcie przebiegu
+    scheduler.stop()
+    scheduler.start()
+    release.set()
+    first_thread.join(5)
+
+    assert created == ['P-0']
+    scheduler.stop()
+
+
+def test_fingerprint_follows_loader_and_external_writes(data_dir, pdf_dir):
+    data_loader = DataLoader(data_dir, pdf_dir)
+    data_loader.load_all_data()
+    initial = data_loader.fingerprint('orders.csv', 'inventory.csv')
+    assert data_loader.fingerprint('orders.csv', 'inventory.csv') == initial
+
+    assert data_loader.save_order({'order_id': 'FP-1', 'product_name': 'Test'})
+    saved = data_loader.fingerprint('orders.csv', 'inventory.csv')
+    assert saved != initial
+
+    # Zapis poza loaderem (np. symulator czasu) - zmienia się rozmiar pliku
+    with open(f'{data_dir}/inventory.csv', 'a', encoding='utf-8') as f:
+        f.write('\n')
+    assert data_loader.fingerprint('orders.csv', 'inventory.csv') != saved
+    assert data_loader.fingerprint('missing.csv')[1] is None
+
+
+def test_loaders_of_separate_processes_do_not_lose_stock_updates(data_dir, pdf_dir):
+    # Aplikacja i proces API - osobne loadery na tym samym katalogu danych
+    app_loader, api_loader = DataLoader(data_dir, pdf_dir), DataLoader(data_dir, pdf_dir)
+    app_loader.load_all_data()
+    api_loader.load_all_data()
+    product = app_loader.inventory['Product_Name'].iloc[0]
+    before = app_loader.inventory['Stock'].iloc[0]
+    assert app_loader.save_orders([{'order_id': f'D-{i}', 'product_name': product} for i in range(2)]) == 2
+
+    assert app_loader.update_delivery_status('D-0', 'delivered', delivered_quantity=5)
+    assert api_loader.update_delivery_status('D-1', 'delivered', delivered_quantity=7)
+
+    stock = pd.read_csv(f'{data_dir}/inventory.csv').set_index('Product_Name')['Stock']
+    assert stock[product] == before + 12
+
+
+def test_write_lock_is_shared_between_loaders(data_dir, pdf_dir):
+    app_loader, api_loader = DataLoader(data_dir, pdf_dir), DataLoader(data_dir, pdf_dir)
+    api_loader.load_all_data()
+    saved = threading.Event()
+
+    def save():
+        api_loader.save_order({'order_id': 'LOCK-1', 'product_name': 'Test'})
+        saved.set()
+
+    with app_loader.write_lock:
+        thread = threading.Thread(target=save)
+        thread.start()
+        assert not saved.wait(0.2)
+    thread.join(5)
+    assert saved.is_set()
@@ -0,0 +1,33 @@
+import filecmp
+import logging
+
+import pandas as pd
+
+from modules.dataset_generator import DatasetGenerator
+
+
+def test_generated_product_names_keep_reference_format(tmp_path):
+    DatasetGenerator(seed=1).generate(str(tmp_path), 2000)
+    names = pd.read_csv(tmp_path / 'products.csv')['Product_Name']
+
+    assert not names.str.startswith(' ').any()
+    assert not names.str.contains(r'\d(?:L|op\.)$').any()
+    assert names.str.match(r'^.+ \d+ L$').any()
+    assert names.str.match(r'^3M .+ \d+$').any()
+
+
+def test_same_seed_gives_same_files(tmp_path):
+    first, second = tmp_path / 'a', tmp_path / 'b'
+    DatasetGenerator(seed=3).generate(str(first), 300)
+    DatasetGenerator(seed=3).generate(str(second), 300)
+
+    for name in ('products.csv', 'inventory.csv', 'suppliers.csv', 'orders.csv', 'user_requests.csv'):
+        assert filecmp.cmp(first / name, second / name, shallow=False)
+
+
+def test_progress_goes_to_logger_not_stdout(tmp_path, capsys, caplog):
+    with caplog.at_level(logging.INFO, logger='modules.dataset_generator'):
+        DatasetGenerator(seed=2).generate(str(tmp_path), 100)
+
+    assert capsys.readouterr().out == ''
+    assert any('products.csv' in message for message in caplog.messages)
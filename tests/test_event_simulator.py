@@ -0,0 +1,76 @@
+import shutil
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from modules.data_loader import DataLoader
+from modules.event_simulator import EventDrivenSimulator
+from modules.time_simulator import TimeSimulator
+
+START = date(2030, 1, 1)
+
+
+def prepare(data_dir, empty_stock):
+    """Otwarte zamówienia z terminami w oknie symulacji (opcjonalnie bez stanu - skoki między zdarzeniami)"""
+    data_loader = DataLoader(data_dir)
+    data_loader.load_all_data()
+    products = data_loader.inventory['Product_Name'].drop_duplicates().head(6).tolist()
+    data_loader.save_orders([{
+        'order_id': f'SIM-{i}', 'product_name': name, 'quantity': 10 + i, 'price': 2.5,
+        'delivery_status': 'ordered' if i % 2 else 'in_transit',
+        'estimated_delivery': (START + timedelta(days=3 + 4 * i)).strftime('%Y-%m-%d')
+    } for i, name in enumerate(products)])
+    if empty_stock:
+        data_loader.inventory['Stock'] = 0
+        data_loader.inventory.to_csv(f'{data_dir}/inventory.csv', index=False)
+
+
+def state(data_dir):
+    return {name: pd.read_csv(f'{data_dir}/{name}.csv')
+            for name in ('inventory', 'orders', 'user_requests', 'simulation_state')}
+
+
+@pytest.mark.parametrize('empty_stock', [False, True])
+def test_event_run_matches_day_by_day(tmp_path, data_dir, empty_stock):
+    prepare(data_dir, empty_stock)
+    event_dir = str(tmp_path / 'event')
+    shutil.copytree(data_dir, event_dir)
+
+    day_loader = DataLoader(data_dir)
+    day_loader.load_all_data()
+    day_simulator = TimeSimulator(data_dir, seed=7, current_date=START)
+    day_simulator.advance_days(30, day_loader)
+
+    event_loader = DataLoader(event_dir)
+    event_loader.load_all_data()
+    event_simulator = TimeSimulator(event_dir, seed=7, current_date=START)
+    result = EventDrivenSimulator(event_simulator).run(30, event_loader, apply=True)
+
+    assert result['deliveries'] == 6
+    assert event_simulator.current_date == day_simulator.current_date == START + timedelta(days=30)
+    expected, actual = state(data_dir), state(event_dir)
+    for name in ('inventory', 'orders', 'user_requests'):
+        pd.testing.assert_frame_equal(actual[name], expected[name], check_dtype=False)
+    assert actual['simulation_state']['current_date'].tolist() == expected['simulation_state']['current_date'].tolist()
+
+
+def test_what_if_run_leaves_shared_date_alone(data_dir, monkeypatch):
+    prepare(data_dir, empty_stock=False)
+    data_loader = DataLoader(data_dir)
+    data_loader.load_all_data()
+    shared = TimeSimulator(data_dir, seed=7, current_date=START)
+    seen = []
+
+    def failing_request(simulator):
+        # Inne sesje czytają datę współdzielonego symulatora w trakcie przebiegu
+        seen.append(shared.current_date)
+        if len(seen) == 10:
+            raise RuntimeError('przerwany scenariusz')
+
+    monkeypatch.setattr(TimeSimulator, '_generate_user_request', failing_request)
+    with pytest.raises(RuntimeError):
+        EventDrivenSimulator(shared).run(30, data_loader)
+
+    assert set(seen) == {START}
+    assert shared.current_date == START
@@ -0,0 +1,29 @@
+import json
+
+from benchmarks.load_replay import ReplayPipeline, load_requests, replay, summarize
+from modules.data_loader import DataLoader
+
+
+def test_jsonl_input_accepts_all_line_formats(tmp_path):
+    path = tmp_path / 'zapytania.jsonl'
+    path.write_text('\n'.join(json.dumps(item) for item in
+                              [{'text': 'papier A4'}, {'User_Text': 'toner'}, 'rękawice', {'inne': 1}]) + '\n',
+                    encoding='utf-8')
+
+    assert load_requests(str(path)) == ['papier A4', 'toner', 'rękawice']
+    assert load_requests(str(path), limit=2) == ['papier A4', 'toner']
+
+
+def test_replay_processes_every_request(data_dir, tmp_path):
+    data_loader = DataLoader(data_dir)
+    data_loader.load_all_data()
+    pipeline = ReplayPipeline(data_loader, pdf_dir=str(tmp_path / 'pdf'))
+    texts = load_requests(f'{data_dir}/user_requests.csv', limit=20)
+
+    records, errors, elapsed = replay(pipeline, texts, rate=0, concurrency=4)
+    summary = summarize(records, errors, elapsed, 0, 4, pipeline.stages)
+
+    assert errors == []
+    assert summary['requests'] == len(texts) == 20
+    assert set(summary['stages']) == {'classify', 'match', 'draft', 'pdf', 'queue', 'total'}
+    assert all(stats['p50_ms'] <= stats['p99_ms'] <= stats['max_ms'] for stats in summary['stages'].values())
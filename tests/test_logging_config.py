@@ -0,0 +1,45 @@
+import io
+import json
+import logging
+
+import pytest
+
+from modules.logging_config import configure_logging
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    # Handler skonfigurowany przez wcześniejsze testy (api, batch) pisałby do innego strumienia
+    root.handlers[:] = [h for h in handlers if not getattr(h, '_zamowienia', False)]
+    yield
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_json_format_includes_extra_fields(restore_root_logger):
+    stream = io.StringIO()
+    configure_logging('INFO', 'json', stream)
+
+    logging.getLogger('modules.test').info("Zamówienie %s", 'ORD-1', extra={'order_id': 'ORD-1'})
+    entry = json.loads(stream.getvalue())
+
+    assert entry['level'] == 'INFO'
+    assert entry['logger'] == 'modules.test'
+    assert entry['message'] == 'Zamówienie ORD-1'
+    assert entry['order_id'] == 'ORD-1'
+
+
+def test_repeated_configuration_keeps_one_handler(restore_root_logger):
+    stream = io.StringIO()
+    root = configure_logging('INFO', 'text', stream)
+    handlers = len(root.handlers)
+    configure_logging('WARNING', 'text', stream)
+
+    logging.getLogger('modules.test').info("pominięty")
+    logging.getLogger('modules.test').warning("zapisany")
+
+    assert len(root.handlers) == handlers
+    assert 'pominięty' not in stream.getvalue()
+    assert stream.getvalue().count('zapisany') == 1
@@ -0,0 +1,36 @@
+import filecmp
+import shutil
+from datetime import date
+
+from modules.data_loader import DataLoader
+from modules.monte_carlo import MonteCarloRunner
+from modules.time_simulator import TimeSimulator
+
+
+def make_runner(data_dir, workers):
+    data_loader = DataLoader(data_dir)
+    data_loader.load_all_data()
+    return MonteCarloRunner(data_loader, TimeSimulator(data_dir, current_date=date(2030, 1, 1)), max_workers=workers)
+
+
+def test_replicas_do_not_depend_on_worker_count_or_touch_data(tmp_path, data_dir):
+    original = tmp_path / 'original'
+    shutil.copytree(data_dir, original)
+
+    serial = make_runner(data_dir, 1).run(6, 20, policy='min_stock', seed=3)
+    parallel = make_runner(data_dir, 2).run(6, 20, policy='min_stock', seed=3)
+
+    for key in ('stockout_days_total', 'spend', 'deliveries', 'policy_orders', 'requests'):
+        assert serial[key] == parallel[key]
+    assert serial['stockout_days_per_product'].equals(parallel['stockout_days_per_product'])
+    # Repliki to scenariusze "what-if" - pliki danych bez zmian
+    for name in ('inventory.csv', 'orders.csv', 'user_requests.csv'):
+        assert filecmp.cmp(original / name, f'{data_dir}/{name}', shallow=False)
+
+
+def test_different_seeds_give_different_replicas(data_dir):
+    runner = make_runner(data_dir, 1)
+    first = runner.run(4, 30, seed=1)
+    second = runner.run(4, 30, seed=2)
+
+    assert first['requests'] != second['requests'] or first['stockout_days_total'] != second['stockout_days_total']
@@ -0,0 +1,88 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import pytest
+from fpdf import FPDF
+
+from modules.offer_ingest import OfferIngestor
+
+
+def offer_pdf(lines):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font('Arial', '', 11)
+    for line in lines:
+        pdf.cell(0, 8, line, ln=1)
+    return pdf.output(dest='S').encode('latin-1')
+
+
+def products(data_dir):
+    return pd.read_csv(f'{data_dir}/products.csv')
+
+
+def test_line_items_are_matched_to_catalog(data_dir):
+    ingestor = OfferIngestor(products(data_dir), max_workers=1)
+    result, = ingestor.ingest([('oferta.pdf', offer_pdf([
+        'Dostawca: Hurtownia Techniczna',
+        '1. HP Laptops Model 298  4 szt  129,50 PLN',
+        '2. Navigator Paper 643  2 op  1 234,00 zl'
+    ]))])
+
+    assert result['supplier_name'] == 'Hurtownia Techniczna'
+    assert [(item['product_id'], item['quantity'], item['unit'], item['price']) for item in result['items']] == [
+        ('P-0001', 4, 'szt', 129.5), ('P-0002', 2, 'op', 1234.0)
+    ]
+
+    drafts = ingestor.draft_orders(result)
+    assert [draft['supplier_name'] for draft in drafts] == ['Hurtownia Techniczna'] * 2
+    assert drafts[0]['product_name'] == 'HP Laptops Model 298'
+
+
+def test_parallel_ingest_keeps_order_and_caches_by_content(data_dir):
+    files = [(f'oferta_{i}.pdf', offer_pdf([f'Dostawca: Firma {i}', f'HP Laptops Model 298  {i + 1} szt  10,00 PLN']))
+             for i in range(3)]
+    files.append(('uszkodzona.pdf', b'stream\nnie-pdf\nendstream'))
+    ingestor = OfferIngestor(products(data_dir), max_workers=2)
+    try:
+        first = ingestor.ingest(files)
+        again = ingestor.ingest(files[:1])
+    finally:
+        ingestor.shutdown()
+
+    assert [result['supplier_name'] for result in first] == ['Firma 0', 'Firma 1', 'Firma 2', None]
+    assert [result['items'][0]['quantity'] for result in first[:3]] == [1, 2, 3]
+    assert first[3]['items'] == []
+    assert not any(result['cached'] for result in first)
+    assert again[0]['cached'] and again[0]['items'] == first[0]['items']
+
+
+def test_failed_extraction_is_not_cached(data_dir, monkeypatch):
+    ingestor = OfferIngestor(products(data_dir), max_workers=1)
+    files = [('oferta.pdf', offer_pdf(['HP Laptops Model 298  4 szt  129,50 PLN']))]
+    extract_all = ingestor._extract_all
+    monkeypatch.setattr(ingestor, '_extract_all', lambda documents: [
+        {'text': '', 'supplier_name': None, 'items': [], 'error': 'awaria procesu'} for _ in documents])
+
+    assert ingestor.ingest(files)[0]['error'] == 'awaria procesu'
+
+    monkeypatch.setattr(ingestor, '_extract_all', extract_all)
+    result, = ingestor.ingest(files)
+    assert not result['cached'] and 'error' not in result
+    assert len(result['items']) == 1
+
+
+def test_broken_pool_is_replaced(data_dir):
+    ingestor = OfferIngestor(products(data_dir), max_workers=2)
+    broken = ingestor._get_executor()
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    files = [(f'oferta_{i}.pdf', offer_pdf([f'HP Laptops Model 298  {i + 1} szt  10,00 PLN'])) for i in range(2)]
+    try:
+        results = ingestor.ingest(files)
+    finally:
+        ingestor.shutdown()
+
+    assert ingestor._executor is None
+    assert [result['items'][0]['quantity'] for result in results] == [1, 2]
@@ -0,0 +1,58 @@
+import os
+
+from modules.pdf_archive import PDFArchiver
+from modules.pdf_manifest import PDFManifest
+
+
+def _write_pdfs(pdf_dir, count):
+    os.makedirs(pdf_dir, exist_ok=True)
+    manifest = PDFManifest(pdf_dir)
+    contents = {}
+    for i in range(count):
+        order_id = f'ORD-{i:05d}'
+        path = os.path.join(pdf_dir, f'Zamowienie_{order_id}_20260101.pdf')
+        contents[order_id] = b'%PDF-1.4\n' + os.urandom(500 + i)
+        with open(path, 'wb') as f:
+            f.write(contents[order_id])
+        manifest.add(order_id, path)
+    return contents
+
+
+def test_archive_reads_back_every_document(pdf_dir):
+    contents = _write_pdfs(pdf_dir, 60)
+    archiver = PDFArchiver(pdf_dir, max_age_days=0, segment_max_bytes=8 * 1024)
+
+    assert archiver.archive() == 60
+    assert len(archiver._segments()) > 1
+    manifest = PDFManifest(pdf_dir)
+    assert manifest.loose_files() == []
+    for order_id, data in contents.items():
+        assert manifest.read(order_id) == data
+
+    # Przebudowa manifestu z samych segmentów daje te same dane
+    os.remove(manifest.path)
+    rebuilt = PDFManifest(pdf_dir)
+    for order_id, data in contents.items():
+        assert rebuilt.read(order_id) == data
+
+
+def test_regenerated_pdf_supersedes_archived_copy(pdf_dir):
+    contents = _write_pdfs(pdf_dir, 3)
+    PDFArchiver(pdf_dir, max_age_days=0).archive()
+
+    path = os.path.join(pdf_dir, 'Zamowienie_ORD-00001_20260101.pdf')
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4\nnowa wersja')
+    PDFManifest(pdf_dir).add('ORD-00001', path)
+
+    manifest = PDFManifest(pdf_dir)
+    assert manifest.read('ORD-00001') == b'%PDF-1.4\nnowa wersja'
+    assert manifest.read('ORD-00000') == contents['ORD-00000']
+
+    # Ponowna archiwizacja dopisuje nową wersję zamiast wskazywać starą
+    PDFArchiver(pdf_dir, max_age_days=0).archive()
+    assert PDFManifest(pdf_dir).read('ORD-00001') == b'%PDF-1.4\nnowa wersja'
+    assert not os.path.exists(path)
+
+    os.remove(os.path.join(pdf_dir, PDFManifest.FILENAME))
+    assert PDFManifest(pdf_dir).read('ORD-00001') == b'%PDF-1.4\nnowa wersja'
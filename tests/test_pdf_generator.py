@@ -0,0 +1,67 @@
+import re
+import zlib
+
+import pandas as pd
+
+from modules.data_loader import DataLoader
+from modules.pdf_generator import PDFGenerator
+
+
+def page_texts(pdf_bytes):
+    """Treść stron PDF (strumienie FPDF są kompresowane zlib)"""
+    streams = re.findall(rb'stream\n(.*?)\nendstream', pdf_bytes, re.S)
+    return [zlib.decompress(stream).decode('latin-1') for stream in streams]
+
+
+def without_creation_date(pdf_bytes):
+    return re.sub(rb'/CreationDate \(D:\d+\)', b'', pdf_bytes)
+
+
+def test_document_contains_order_fields_and_static_texts(pdf_dir):
+    generator = PDFGenerator(pdf_dir)
+    pages = page_texts(generator.render_order_pdf({
+        'order_id': 'ORD-1', 'product_name': 'Olej silnikowy 5L', 'quantity': 3,
+        'price': '12,50', 'supplier_name': 'Łódzka Hurtownia', 'user_input': 'Pilne zamówienie'
+    }))
+
+    text = '\n'.join(pages)
+    for expected in ['ZAMOWIENIE', 'Numer: ORD-1', 'Olej silnikowy 5L', '37.50 PLN',
+                     'Lodzka Hurtownia', 'DODATKOWE INFORMACJE:', 'Pilne zamowienie',
+                     'Podpis Zamawiajacego']:
+        assert f'({expected})' in text
+
+
+def test_long_notes_continue_on_next_page(pdf_dir):
+    generator = PDFGenerator(pdf_dir)
+    pages = page_texts(generator.render_order_pdf({'order_id': 'ORD-2', 'user_input': ' '.join(['słowo'] * 2000)}))
+
+    assert len(pages) > 1
+    assert '(Podpis Dostawcy)' in pages[-1]
+
+
+def test_document_dates_come_from_order_timestamp(pdf_dir):
+    generator = PDFGenerator(pdf_dir)
+    text = '\n'.join(page_texts(generator.render_order_pdf({'order_id': 'ORD-3', 'timestamp': '2025-03-07 09:15:00'})))
+
+    assert '(Data: 07.03.2025)' in text
+    assert '(Wygenerowano: 07.03.2025 09:15)' in text
+
+
+def test_deferred_pdf_is_rebuilt_from_orders_csv_after_restart(data_dir, pdf_dir):
+    order_data = {
+        'order_id': 'ORD-DEFERRED', 'user_input': 'potrzebuję papieru', 'product_name': 'Papier A4',
+        'quantity': 5, 'unit': 'ryza', 'supplier_name': 'Biuro Plus', 'price': 19.99,
+        'contract_type': 'oferta', 'timestamp': '2025-01-02 10:00:00', 'estimated_delivery': '2025-01-09'
+    }
+    expected = PDFGenerator(pdf_dir).render_order_pdf(order_data)
+
+    generator = PDFGenerator(pdf_dir, deferred=True)
+    assert generator.generate_order_pdf(order_data) is None
+    assert DataLoader(data_dir, pdf_dir).save_order(order_data)
+
+    # Nowy proces: tylko wiersz z orders.csv
+    orders = pd.read_csv(f'{data_dir}/orders.csv')
+    row = orders[orders['order_id'] == 'ORD-DEFERRED'].iloc[0].to_dict()
+    restarted = PDFGenerator(pdf_dir, deferred=True)
+
+    assert without_creation_date(restarted.get_order_pdf(row)) == without_creation_date(expected)
@@ -0,0 +1,43 @@
+import os
+import shutil
+
+from modules.pdf_generator import PDFGenerator
+from modules.pdf_manifest import PDFManifest
+
+
+def test_rebuild_indexes_named_and_legacy_files(pdf_dir):
+    os.makedirs(pdf_dir)
+    legacy = os.path.join(pdf_dir, 'order_20251111_184703.pdf')
+    with open(legacy, 'wb') as f:
+        f.write(PDFGenerator(pdf_dir).render_order_pdf({'order_id': 'ORD-LEGACY'}))
+    named = os.path.join(pdf_dir, 'Zamowienie_ORD-NAMED_20251111.pdf')
+    shutil.copy(legacy, named)
+
+    manifest = PDFManifest(pdf_dir)
+
+    assert manifest.paths('ORD-LEGACY') == [legacy]
+    assert manifest.paths('ORD-NAMED') == [named]
+
+
+def test_other_instance_sees_additions_and_removals(pdf_dir):
+    writer = PDFManifest(pdf_dir)
+    reader = PDFManifest(pdf_dir)
+    path = os.path.join(pdf_dir, 'Zamowienie_ORD-1_20260101.pdf')
+
+    writer.add('ORD-1', path)
+    assert reader.paths('ORD-1') == [path]
+
+    assert reader.remove('ORD-1') == [path]
+    assert writer.paths('ORD-1') == []
+    assert reader.remove('ORD-1') == []
+
+
+def test_partial_line_is_read_once_complete(pdf_dir):
+    manifest = PDFManifest(pdf_dir)
+    with open(manifest.path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "add", "order_id": "ORD-2", ')
+    assert manifest.paths('ORD-2') == []
+
+    with open(manifest.path, 'a', encoding='utf-8') as f:
+        f.write('"file": "Zamowienie_ORD-2_20260101.pdf"}\n')
+    assert manifest.paths('ORD-2') == [os.path.join(pdf_dir, 'Zamowienie_ORD-2_20260101.pdf')]
@@ -0,0 +1,33 @@
+from modules.pdf_service import PDFRenderService
+
+
+def _order(i):
+    return {'order_id': f'ORD-T{i:03d}', 'user_input': f'Potrzebuję {i} szt.', 'product_name': 'Produkt testowy',
+            'quantity': i, 'unit': 'szt.', 'supplier_name': 'Dostawca', 'price': 1.5,
+            'contract_type': 'oferta', 'estimated_delivery': '2026-10-26', 'timestamp': '2026-10-19 10:00:00'}
+
+
+def test_render_many_returns_every_path_when_finished_jobs_are_trimmed(pdf_dir):
+    service = PDFRenderService(pdf_dir, max_workers=2, keep_finished=3)
+    try:
+        paths = service.render_many([_order(i) for i in range(12)], timeout=120)
+    finally:
+        service.shutdown()
+    assert len(paths) == 12
+    assert all(paths)
+    assert len(set(paths)) == 12
+
+
+def test_cancelled_job_is_recorded(pdf_dir):
+    service = PDFRenderService(pdf_dir, max_workers=1)
+    try:
+        job_ids = [service.submit(_order(i)) for i in range(10)]
+        # Ostatnie zadanie czeka jeszcze w kolejce - jak przy zamknięciu puli
+        assert service.future(job_ids[-1]).cancel()
+        assert service.result(job_ids[0], timeout=120)
+    finally:
+        service.shutdown()
+
+    assert service.status(job_ids[-1])['status'] == 'cancelled'
+    assert service.get_status()['cancelled'] == 1
+    assert service.get_status()['pending'] == 0
@@ -0,0 +1,9 @@
+from modules.profiling import _sample_rate
+
+
+def test_sample_rate_from_environment_is_validated():
+    assert _sample_rate('0.05') == 0.05
+    assert _sample_rate('5') == 1.0
+    assert _sample_rate('-1') == 0.0
+    assert _sample_rate('abc') == 1.0
+    assert _sample_rate('nan') == 1.0
@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.suite import STARTUP_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_startup_modules_do_not_import_sklearn_or_fpdf():
+    code = '; '.join(f'import {module}' for module in STARTUP_MODULES)
+    code += "; import sys; print(','.join(sorted({m.split('.')[0] for m in sys.modules} & {'sklearn', 'fpdf'})))"
+    process = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert process.stdout.strip() == ''
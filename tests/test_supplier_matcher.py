@@ -0,0 +1,31 @@
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from modules.supplier_matcher import SupplierMatcher
+
+
+def test_cached_index_matches_cosine_similarity(data_dir):
+    orders = pd.read_csv(f'{data_dir}/purchase_order_history.csv')
+    matcher = SupplierMatcher(pd.read_csv(f'{data_dir}/suppliers.csv'), orders)
+    all_products = orders['Product_Name'].dropna().unique()
+    vectorizer = TfidfVectorizer()
+    tfidf_matrix = vectorizer.fit_transform(all_products)
+
+    for query in ['papier', 'laptop model', 'olej silnikowy', all_products[0]]:
+        similarities = cosine_similarity(vectorizer.transform([query]), tfidf_matrix).flatten()
+        expected = [(all_products[idx], round(similarities[idx], 2))
+                    for idx in similarities.argsort()[-3:][::-1] if similarities[idx] > 0.1]
+        found = matcher.find_similar_products(query, None)
+
+        assert [(p['product_name'], p['similarity_score']) for p in found] == expected
+
+
+def test_index_is_rebuilt_after_data_swap(data_dir):
+    orders = pd.read_csv(f'{data_dir}/purchase_order_history.csv')
+    matcher = SupplierMatcher(pd.read_csv(f'{data_dir}/suppliers.csv'), orders)
+    matcher.prewarm()
+
+    matcher.purchase_orders_df = pd.DataFrame({'Product_Name': ['Zszywacz biurowy XL']})
+
+    assert [p['product_name'] for p in matcher.find_similar_products('zszywacz', None)] == ['Zszywacz biurowy XL']
@@ -0,0 +1,86 @@
+import shutil
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from modules.data_loader import DataLoader
+from modules.time_simulator import TimeSimulator
+
+START = date(2030, 1, 1)
+
+
+def test_daily_consumption_is_bounded_and_reproducible(data_dir):
+    simulator = TimeSimulator(data_dir, seed=11, current_date=START)
+    stock = np.array([0, 1, 5, 40, 1000, 250000], dtype=np.int64)
+
+    new_stock, factor = simulator._consume_stock(stock)
+
+    assert 0.01 <= factor <= 0.10
+    assert new_stock.dtype == stock.dtype
+    assert new_stock[0] == 0 and new_stock[1] == 0
+    assert (new_stock >= 0).all() and (new_stock[1:] < stock[1:]).all()
+    # Ten sam dzień i ziarno - to samo zużycie, niezależnie od kolejności wywołań
+    assert np.array_equal(TimeSimulator(data_dir, seed=11, current_date=START)._consume_stock(stock)[0], new_stock)
+
+
+def add_open_orders(data_dir, count=6):
+    """Otwarte zamówienia z terminami dostawy w pierwszych dniach symulacji"""
+    data_loader = DataLoader(data_dir)
+    data_loader.load_all_data()
+    products = data_loader.inventory['Product_Name'].drop_duplicates().head(count).tolist()
+    data_loader.save_orders([{
+        'order_id': f'SIM-{i}', 'product_name': name, 'quantity': 10 + i, 'delivery_status': 'ordered',
+        'estimated_delivery': (START + timedelta(days=1 + i)).strftime('%Y-%m-%d')
+    } for i, name in enumerate(products)])
+
+
+def simulation_files(data_dir):
+    return {name: pd.read_csv(f'{data_dir}/{name}.csv') for name in ('inventory', 'orders', 'user_requests')}
+
+
+def test_advance_days_matches_daily_operations(tmp_path, data_dir):
+    add_open_orders(data_dir)
+    daily_dir = str(tmp_path / 'daily')
+    shutil.copytree(data_dir, daily_dir)
+
+    data_loader = DataLoader(data_dir)
+    data_loader.load_all_data()
+    TimeSimulator(data_dir, seed=5, current_date=START).advance_days(10, data_loader)
+
+    daily_loader = DataLoader(daily_dir)
+    daily_loader.load_all_data()
+    daily = TimeSimulator(daily_dir, seed=5, current_date=START)
+    for _ in range(10):
+        daily.advance_time(1)
+        daily.simulate_daily_operations(daily_loader)
+
+    expected, actual = simulation_files(daily_dir), simulation_files(data_dir)
+    delivered = actual['orders'].set_index('order_id').loc[[f'SIM-{i}' for i in range(6)], 'delivery_status']
+    assert (delivered == 'delivered').all()
+    for name in expected:
+        pd.testing.assert_frame_equal(actual[name], expected[name], check_dtype=False)
+
+
+def test_delivery_queue_picks_up_orders_saved_by_other_writers(data_dir):
+    data_loader = DataLoader(data_dir)
+    data_loader.load_all_data()
+    simulator = TimeSimulator(data_dir, seed=5, current_date=START)
+    simulator.advance_days(1, data_loader)
+
+    product = data_loader.inventory['Product_Name'].iloc[0]
+    stock = lambda: data_loader.inventory.loc[data_loader.inventory['Product_Name'] == product, 'Stock'].sum()
+    before = stock()
+    # Zapis z zewnątrz (np. API) po zbudowaniu kolejki dostaw
+    DataLoader(data_dir).save_order({'order_id': 'LATE-1', 'product_name': product, 'quantity': 1000,
+                                     'delivery_status': 'ordered', 'estimated_delivery': '2030-01-03'})
+    simulator.advance_days(1, data_loader)
+    after_delivery = stock()
+    simulator.advance_days(3, data_loader)
+
+    orders = pd.read_csv(f'{data_dir}/orders.csv').set_index('order_id')
+    assert orders.loc['LATE-1', 'delivery_status'] == 'delivered'
+    assert orders.loc['LATE-1', 'delivery_date'] == '2030-01-03'
+    assert after_delivery > before
+    # Dostarczone zamówienie nie wraca do kolejki
+    assert stock() <= after_delivery